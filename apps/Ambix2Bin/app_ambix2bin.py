@@ -1,11 +1,12 @@
 import sys
 import os
+import json
 import subprocess
 import shlex
-import glob
-import qtawesome as qta
-from PyQt6.QtWidgets import QApplication, QPushButton, QHBoxLayout, QButtonGroup, QWidget, QMessageBox, QFrame, QLabel, QVBoxLayout, QCheckBox, QProgressBar, QListWidget, QListWidgetItem, QComboBox, QSizePolicy, QDialog
-from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal, QUrl, QProcess, QSettings
+import math
+from PyQt6.QtWidgets import QApplication, QPushButton, QHBoxLayout, QButtonGroup, QWidget, QMessageBox, QFrame, QLabel, QVBoxLayout, QCheckBox, QComboBox, QSizePolicy, QDialog
+from PyQt6.QtCore import Qt, QTimer, QThread, QObject, pyqtSignal, QUrl, QProcess, QSettings
+from PyQt6.QtNetwork import QLocalSocket, QTcpSocket
 from PyQt6.QtGui import QDesktopServices
 
 # Add 'src' to sys.path so we can import common_ui
@@ -14,132 +15,168 @@ src_dir = os.path.join(current_dir, "..", "..", "src")
 sys.path.append(src_dir)
 
 from common_ui import AmbiToolboxApp, AssetManager, SettingsOverlay
-try:
-    from saf_wrapper import SAFRenderer
-    SAF_AVAILABLE = True
-except ImportError as e:
-    print(f"SAF Import Error: {e}")
-    SAF_AVAILABLE = False
-except Exception as e:
-    print(f"SAF Init Error: {e}")
-    SAF_AVAILABLE = False
-
-class FileListWidget(QListWidget):
-    """Custom ListWidget that handles Delete/Backspace keys."""
-    def keyPressEvent(self, event):
-        if event.key() in (Qt.Key.Key_Delete, Qt.Key.Key_Backspace):
-            for item in self.selectedItems():
-                self.takeItem(self.row(item))
-                # Also need to remove from app.file_queue? 
-                # Ideally the app monitors the model or we treat the list as source of truth.
-                # For simplicity, we'll emit a signal or let app handle sync. 
-                # But here we just remove visual item. 
-                # The App needs to sync its queue in run_conversion or process logic.
-                pass
+import render_server
+from audio_files import unique_output_path
+import audio_probe
+from render_metrics import RenderMetrics, RUNNING as METRICS_RUNNING
+from preflight import PreflightWorker
+from folder_scan import FolderScanWorker
+from file_list_model import (FileJobModel, FileRowDelegate, FileListView, IDLE, QUEUED, RUNNING, DONE, ERROR,
+                             CANCELLED)
+
+# Renders run in render_server's process, so the window never needs the SciPy/SAF stack.
+# Modules that pull it in (scheduling) and qtawesome's icon fonts are imported on first
+# use; startup cost is tracked by tests/benchmark_startup.py.
+METRICS_REFRESH_MS = 100 # 10 Hz UI refresh, independent of worker count and block rate
+
+
+def mdi_icon(name, color):
+    """qtawesome icon, importing qtawesome (and loading its fonts) on first use."""
+    import qtawesome as qta
+    return qta.icon(name, color=color)
+
+class RenderServerConnection(QObject):
+    """Qt client for render_server.py (newline-delimited JSON).
+
+    Starts the server detached if nobody is listening yet, so renders survive the
+    GUI and later sessions reuse its warm filter banks. It is started with an idle
+    timeout: SERVER_IDLE_TIMEOUT_S after the last client disconnects and the last
+    job finishes, it exits.
+    """
+    connected = pyqtSignal()
+    event_received = pyqtSignal(dict)
+    failed = pyqtSignal(str)
+
+    CONNECT_ATTEMPTS = 40  # x 250 ms while a freshly spawned server loads
+    SERVER_IDLE_TIMEOUT_S = 300
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        if render_server.USE_TCP:
+            self.sock = QTcpSocket(self)
         else:
-            super().keyPressEvent(event)
+            self.sock = QLocalSocket(self)
+        self.sock.readyRead.connect(self._on_ready_read)
+        self.sock.connected.connect(self._on_connected)
+        self.sock.errorOccurred.connect(self._on_error)
+        self._buffer = b""
+        self._attempts = 0
+        self._spawned = False
+
+    def is_connected(self):
+        if render_server.USE_TCP:
+            return self.sock.state() == QTcpSocket.SocketState.ConnectedState
+        return self.sock.state() == QLocalSocket.LocalSocketState.ConnectedState
+
+    def ensure_connected(self):
+        if self.is_connected():
+            self.connected.emit()
+            return
+        self._attempts = 0
+        self._connect()
 
-class FileRowWidget(QWidget):
-    """Custom Row with Progress Bar."""
-    def __init__(self, text, parent=None):
-        super().__init__(parent)
-        layout = QHBoxLayout(self)
-        layout.setContentsMargins(5, 5, 5, 5)
-        layout.setSpacing(10)
-        
-        self.icon = QLabel()
-        pm = AssetManager.get_pixmap("ic_music.svg", color="#888888", size=24)
-        if pm.isNull(): # Fallback if ic_music.svg not in AssetManager set yet
-            self.icon.setPixmap(qta.icon('mdi.music-circle', color='#888').pixmap(24, 24))
+    def _connect(self):
+        self.sock.abort()
+        if render_server.USE_TCP:
+            self.sock.connectToHost("127.0.0.1", render_server.DEFAULT_PORT)
         else:
-            self.icon.setPixmap(pm)
-        layout.addWidget(self.icon)
-        
-        self.lbl_name = QLabel(text)
-        self.lbl_name.setStyleSheet("background: transparent; border: none; font-size: 13px; color: #DDD;")
-        layout.addWidget(self.lbl_name)
-        
-        layout.addStretch()
-        
-        self.progress = QProgressBar()
-        self.progress.setFixedSize(140, 10) # Wider
-        self.progress.setTextVisible(False)
-        # Ensure it's always visible on top
-        self.progress.raise_()
-        self.progress.setStyleSheet("""
-            QProgressBar {
-                border: 1px solid #666;
-                border-radius: 5px;
-                background-color: #222;
-                z-index: 10;
-            }
-            QProgressBar::chunk { background-color: #2ecc71; border-radius: 4px; }
-        """)
-        self.progress.hide()
-        layout.addWidget(self.progress)
-        
-    def set_progress(self, val):
-        self.progress.setValue(val)
-        if val >= 0 and not self.progress.isVisible():
-            self.progress.show()
-    
-    def set_icon(self, filename, color):
-        pm = AssetManager.get_pixmap(filename, color=color, size=24)
-        if not pm.isNull():
-            self.icon.setPixmap(pm)
+            self.sock.connectToServer(render_server.DEFAULT_SOCKET)
+
+    def _on_connected(self):
+        self._buffer = b""
+        self.connected.emit()
+
+    def _on_error(self, *args):
+        if self.is_connected():
+            return
+        if not self._spawned:
+            self._spawned = True
+            script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "render_server.py")
+            print(f"[RenderServer] Starting {script}")
+            QProcess.startDetached(sys.executable, [script, "--idle-timeout-s", str(self.SERVER_IDLE_TIMEOUT_S)])
+        self._attempts += 1
+        if self._attempts > self.CONNECT_ATTEMPTS:
+            self.failed.emit("Could not connect to the render server.")
+            return
+        QTimer.singleShot(250, self._connect)
+
+    def send(self, msg):
+        self.sock.write((json.dumps(msg) + "\n").encode("utf-8"))
+        self.sock.flush()
+
+    def _on_ready_read(self):
+        # Reads can end mid-line; keep the partial tail until its newline arrives
+        self._buffer += self.sock.readAll().data()
+        *lines, self._buffer = self._buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                try:
+                    self.event_received.emit(json.loads(line))
+                except ValueError:
+                    print(f"[RenderServer] Bad event: {line!r}")
 
 
 class Ambix2Bin(AmbiToolboxApp):
+    # Emitted once the background pre-flight checks have been applied (see on_preflight_done)
+    preflight_done = pyqtSignal(dict)
+
     def __init__(self):
         super().__init__(app_name="Ambix2Bin", accent_color="#2ecc71")
         
         self.ffmpeg_path = self.get_ffmpeg_path()
         print(f"Using FFmpeg: {self.ffmpeg_path}")
-
+        audio_probe.set_ffprobe(self.ffmpeg_path) # Header probes of non-WAV drops use the matching ffprobe
         # --- Pre-Flight Check ---
-        if not self.check_ffmpeg_capabilities():
-            # If check fails, we disable the main interface or warn
-            # The check itself shows the MessageBox.
-            self.status.setText("Critical: FFmpeg missing required libraries.")
-            self.btn_process.setEnabled(False)
+        # Runs in the background once the window is up (start_preflight); None = not done yet
+        self.ffmpeg_ok = None
+        self.preflight_thread = None
+        # Background folder scan of the current drop (see process_file)
+        self.scan_thread = None
+        self.scan_worker = None
+        self.scan_queue = []
         
         self.file_queue = [] # List of tuples: (input_path, item_widget)
+        self.jobs_by_ref = {} # Batch index -> (row, output_path) for jobs still in flight
+        self.rows_by_job = {} # Server job id -> row
+        self.refs_by_job = {} # Server job id -> batch index
+        self.server_slots = 2 # Concurrent renders on the server, from its metrics reply
+        self.eta = None # BatchETA of the running batch
+        self.cancel_pending = set() # Batch indices to cancel once the server acknowledges them
+        # Progress/metrics come from the server's shared-memory table, polled at UI rate
+        self.metrics = None
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.setInterval(METRICS_REFRESH_MS)
+        self.metrics_timer.timeout.connect(self.poll_metrics)
+        self.server = RenderServerConnection(self)
+        self.server.connected.connect(self.on_server_connected)
+        self.server.event_received.connect(self.on_server_event)
+        self.server.failed.connect(self.on_server_failed)
         self.is_processing = False
         self.mode = "Binaural" # Default
-        
-        self.saf_renderer = None
-        if SAF_AVAILABLE:
-            try:
-                self.saf_renderer = SAFRenderer()
-            except Exception as e:
-                print(f"Failed to load SAF library: {e}")
 
         # --- UI Construction ---
         self.settings = QSettings("AmbiToolbox", "Ambix2Bin") # Persistent Settings
         
-        # 0. List Widget for Files
-        self.file_list_widget = FileListWidget() # Custom subclass
-        self.file_list_widget.setSelectionMode(QListWidget.SelectionMode.ExtendedSelection)
-        self.file_list_widget.setStyleSheet("""
-            QListWidget {
+        # 0. File list: one model row per file, painted by the delegate (no widget per row)
+        self.file_model = FileJobModel(self)
+        self.row_icons = {} # Job state -> QPixmap, built on first paint
+        self.file_list_view = FileListView()
+        self.file_list_view.setModel(self.file_model)
+        self.file_delegate = FileRowDelegate(self.row_icon, lambda: self.row_icon("cancel"), self.accent_color,
+                                             self.file_list_view)
+        self.file_delegate.cancel_clicked.connect(self.cancel_file)
+        self.file_list_view.setItemDelegate(self.file_delegate)
+        self.file_list_view.setStyleSheet("""
+            QListView {
                 background-color: transparent;
                 border: none;
                 color: #DDD;
                 font-size: 13px;
                 outline: none;
             }
-            QListWidget::item {
-                padding: 0px;
-                border-bottom: 1px solid #444;
-            }
-            QListWidget::item:selected {
-                background-color: #333;
-                border: 1px solid #2ecc71;
-                border-radius: 4px;
-            }
         """)
-        self.drop_area.layout().addWidget(self.file_list_widget)
-        self.file_list_widget.hide()
+        self.drop_area.layout().addWidget(self.file_list_view)
+        self.file_list_view.hide()
         
         self.batch_complete = False # Flag for auto-clear behavior
         
@@ -152,10 +189,6 @@ class Ambix2Bin(AmbiToolboxApp):
         self.btn_binaural = QPushButton("Binaural (SOFA)")
         self.btn_stereo = QPushButton("Stereo (Matrix)")
         
-        # Icons
-        self.btn_binaural.setIcon(qta.icon('mdi.headphones', color='#E0E0E0'))
-        self.btn_stereo.setIcon(qta.icon('mdi.speaker', color='#E0E0E0'))
-        
         # Checkable behavior for toggle effect
         self.btn_binaural.setCheckable(True)
         self.btn_stereo.setCheckable(True)
@@ -210,7 +243,7 @@ class Ambix2Bin(AmbiToolboxApp):
         hrtf_layout.addWidget(self.lbl_hrtf)
 
         self.hrtf_combo = QComboBox()
-        self.hrtf_combo.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed) # Force Expand
+        self.hrtf_combo.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed) # Force Expand
         self.hrtf_combo.setMinimumContentsLength(20) # Ensure minimal width trigger
         self.hrtf_combo.setStyleSheet("""
             QComboBox {
@@ -232,8 +265,9 @@ class Ambix2Bin(AmbiToolboxApp):
         """)
         self.hrtf_combo.setSizeAdjustPolicy(QComboBox.SizeAdjustPolicy.AdjustToContents)
         
-        # Populate
-        self.populate_hrtf_combo()
+        # Populated by the pre-flight scan
+        self.hrtf_combo.addItem("Scanning HRTFs...")
+        self.hrtf_combo.setEnabled(False)
         
         hrtf_layout.addWidget(self.hrtf_combo)
         
@@ -252,7 +286,7 @@ class Ambix2Bin(AmbiToolboxApp):
         self.btn_process = QPushButton("CONVERT & LISTEN")
         self.btn_process.setFixedHeight(50)
         self.btn_process.setEnabled(False) # Start disabled
-        self.btn_process.clicked.connect(self.run_conversion_batch)
+        self.btn_process.clicked.connect(self.on_process_clicked)
         
         # Store default style for enable/disable updates
         self.process_btn_style = f"""
@@ -278,6 +312,50 @@ class Ambix2Bin(AmbiToolboxApp):
         self.update_process_button_text() # Init text
         self.update_hrtf_visibility() # Init state
 
+        self.startup_finished = False # Set by the first paint (see paintEvent)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.startup_finished:
+            # Everything not needed for the first frame runs right after it
+            self.startup_finished = True
+            QTimer.singleShot(0, self.finish_startup)
+
+    def finish_startup(self):
+        """Deferred startup: the background pre-flight checks, then the toolbar icons."""
+        self.start_preflight()
+        self.btn_binaural.setIcon(mdi_icon('mdi.headphones', '#E0E0E0'))
+        self.btn_stereo.setIcon(mdi_icon('mdi.speaker', '#E0E0E0'))
+
+    def start_preflight(self):
+        hrtf_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "hrtf")
+        self.preflight_thread = QThread(self)
+        self.preflight_worker = PreflightWorker(self.ffmpeg_path, hrtf_dir)
+        self.preflight_worker.moveToThread(self.preflight_thread)
+        self.preflight_thread.started.connect(self.preflight_worker.run)
+        self.preflight_worker.finished.connect(self.on_preflight_done)
+        self.preflight_worker.finished.connect(self.preflight_thread.quit)
+        self.preflight_thread.start()
+
+    def on_preflight_done(self, result):
+        self.populate_hrtf_combo(result['hrtfs'], result['hrtf_default'])
+        self.ffmpeg_ok = self.check_ffmpeg_capabilities(result['ffmpeg'], result['ffmpeg_cached'])
+        if not self.ffmpeg_ok:
+            # If check fails, we disable the main interface or warn
+            self.status.setText("Critical: FFmpeg missing required libraries.")
+            self.btn_process.setEnabled(False)
+        self.preflight_done.emit(result)
+
+    def closeEvent(self, event):
+        if self.scan_thread is not None:
+            self.cancel_scan()
+            self.scan_thread.quit()
+            self.scan_thread.wait()
+        if self.preflight_thread is not None:
+            self.preflight_thread.quit()
+            self.preflight_thread.wait()
+        super().closeEvent(event)
+
     # Settings Overlay Logic
     def open_settings(self):
          if not hasattr(self, 'settings_overlay'):
@@ -291,32 +369,41 @@ class Ambix2Bin(AmbiToolboxApp):
          self.settings_overlay.show()
          self.settings_overlay.raise_()
 
-    def populate_hrtf_combo(self):
+    def row_icon(self, state):
+        """File row icon for a job state (or "cancel" for the cancel button), cached."""
+        pm = self.row_icons.get(state)
+        if pm is None:
+            if state == DONE:
+                pm = AssetManager.get_pixmap('ic_check.svg', color='#2ecc71', size=24)
+            elif state == ERROR:
+                pm = AssetManager.get_pixmap('ic_error.svg', color='#e74c3c', size=24)
+            elif state == CANCELLED:
+                pm = mdi_icon('mdi.cancel', '#888').pixmap(24, 24)
+            elif state == "cancel":
+                pm = mdi_icon('mdi.close-circle', '#888').pixmap(24, 24)
+            else:
+                pm = AssetManager.get_pixmap("ic_music.svg", color="#888888", size=24)
+                if pm.isNull(): # Fallback if ic_music.svg not in AssetManager set yet
+                    pm = mdi_icon('mdi.music-circle', '#888').pixmap(24, 24)
+            self.row_icons[state] = pm
+        return pm
+
+    def populate_hrtf_combo(self, sofa_files, default_index=0):
+        """Fills the HRTF combo from preflight.scan_hrtf_dir() (None = no HRTF folder)."""
         self.hrtf_combo.clear()
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        hrtf_dir = os.path.join(base_dir, "assets", "hrtf")
-        
-        if not os.path.exists(hrtf_dir):
+        if sofa_files is None:
             self.hrtf_combo.addItem("No HRTF Folder Found")
             self.hrtf_combo.setEnabled(False)
             return
 
-        sofa_files = glob.glob(os.path.join(hrtf_dir, "*.sofa"))
         if not sofa_files:
             self.hrtf_combo.addItem("No .sofa files found")
             self.hrtf_combo.setEnabled(False)
             return
 
-        # Sort for consistency
-        sofa_files.sort()
-        
-        default_index = 0
-        for i, fpath in enumerate(sofa_files):
-            fname = os.path.basename(fpath)
-            self.hrtf_combo.addItem(fname, fpath) # Store full path in UserData
-            if fname == "HRIR_L2702.sofa":
-                default_index = i
-        
+        for fpath in sofa_files:
+            self.hrtf_combo.addItem(os.path.basename(fpath), fpath) # Store full path in UserData
+        self.hrtf_combo.setEnabled(True)
         self.hrtf_combo.setCurrentIndex(default_index)
 
     def update_hrtf_visibility(self):
@@ -351,33 +438,32 @@ class Ambix2Bin(AmbiToolboxApp):
 
         return "ffmpeg"
 
-    def check_ffmpeg_capabilities(self):
-        """Checks if installed FFmpeg has 'libmysofa' support via 'sofalizer' filter."""
-        print(f"Running Pre-Flight FFmpeg Check using: {self.ffmpeg_path}")
-        try:
-            # Run 'ffmpeg -filters'
-            result = subprocess.run([self.ffmpeg_path, '-filters'], capture_output=True, text=True)
-            if result.returncode != 0:
-                print("Error running ffmpeg -filters")
-                return False
-            
-            if "sofalizer" in result.stdout:
-                print("Success: 'sofalizer' filter found.")
-                return True
-            else:
-                print("Failure: 'sofalizer' filter NOT found.")
-                QMessageBox.critical(self, "Critical Error",
-                    "Your FFmpeg is missing the 'libmysofa' library required for HRTF.\n\n"
-                    "The text app tried to use a bundled version but it may be missing.\n"
-                    "Please install FFmpeg with libmysofa manualy if issues persist.")
-                return False
-                
-        except FileNotFoundError:
+    def check_ffmpeg_capabilities(self, probe, cached=False):
+        """Checks if installed FFmpeg has 'libmysofa' support via 'sofalizer' filter.
+
+        `probe` is the preflight.probe_ffmpeg() result from the background check.
+        """
+        print(f"Pre-Flight FFmpeg Check using: {self.ffmpeg_path}{' (cached)' if cached else ''}")
+        if not probe['found']:
             print("Error: FFmpeg binary not found.")
             QMessageBox.critical(self, "FFmpeg Not Found",
                 "FFmpeg is not installed or not in PATH.\n"
                 "Please install FFmpeg.")
             return False
+        if probe['error']:
+            print(probe['error'])
+            return False
+            
+        if probe['sofalizer']:
+            print("Success: 'sofalizer' filter found.")
+            return True
+        else:
+            print("Failure: 'sofalizer' filter NOT found.")
+            QMessageBox.critical(self, "Critical Error",
+                "Your FFmpeg is missing the 'libmysofa' library required for HRTF.\n\n"
+                "The text app tried to use a bundled version but it may be missing.\n"
+                "Please install FFmpeg with libmysofa manualy if issues persist.")
+            return False
 
     def on_mode_changed(self, btn):
         if self.btn_binaural.isChecked():
@@ -389,240 +475,283 @@ class Ambix2Bin(AmbiToolboxApp):
         self.update_hrtf_visibility()
 
     def process_file(self, dropped_files):
-        """Handle File Drop (List of files)"""
+        """Handle File Drop (List of files): scanned in the background, rows stream in."""
+        if self.scan_thread is not None:
+            # One scan at a time; this drop starts when the current one ends
+            self.scan_queue.append(list(dropped_files))
+            return
         # Auto-Clear logic if batch finished
         if self.batch_complete:
-            self.file_list_widget.clear()
+            self.file_model.clear()
             self.batch_complete = False
             # Restore dropzone instructions
             self.drop_area.icon_lbl.show()
             self.drop_area.label.show()
 
-        # 1. Recursive Scan
-        valid_extensions = {'.wav', '.amb', '.opus', '.caf'}
-        found_files = []
-        
-        for path in dropped_files:
-            if os.path.isdir(path):
-                # Recurse
-                for root, dirs, files in os.walk(path):
-                    for f in files:
-                        if os.path.splitext(f)[1].lower() in valid_extensions:
-                            found_files.append(os.path.join(root, f))
-            else:
-                if os.path.splitext(path)[1].lower() in valid_extensions:
-                    found_files.append(path)
-                    
-        if not found_files:
-            self.status.setText("No valid audio files found.")
-            return
+        # 1. Recursive Scan (+ header check: other channel counts are skipped, unreadable headers kept)
+        self.scan_thread = QThread(self)
+        self.scan_worker = FolderScanWorker(dropped_files, prefilter=True)
+        self.scan_worker.moveToThread(self.scan_thread)
+        self.scan_thread.started.connect(self.scan_worker.run)
+        self.scan_worker.chunk.connect(self.on_scan_chunk)
+        self.scan_worker.finished.connect(self.on_scan_finished)
+        self.scan_found = 0
+        self.status.setText("Scanning...")
+        self.btn_process.setText("STOP SCAN")
+        self.btn_process.setEnabled(True)
+        self.scan_thread.start()
 
+    def on_scan_chunk(self, paths):
         # 2. Update UI
-        self.drop_area.icon_lbl.hide()
-        self.drop_area.label.hide()
-        self.file_list_widget.show()
-        
-        for fpath in found_files:
-            # Check duplicates? Let's allow.
-            item = QListWidgetItem(self.file_list_widget)
-            # Use Custom Widget
-            row_widget = FileRowWidget(os.path.basename(fpath))
-            item.setSizeHint(row_widget.sizeHint())
-            
-            self.file_list_widget.addItem(item)
-            self.file_list_widget.setItemWidget(item, row_widget)
-            item.setData(Qt.ItemDataRole.UserRole, fpath)
-            # No queue append here. We build queue at runtime.
-            
-        self.status.setText(f"Ready to convert {self.file_list_widget.count()} files.")
-        self.btn_process.setEnabled(True)
-        self.btn_process.setStyleSheet(self.process_btn_style)
+        if self.file_model.rowCount() == 0:
+            self.drop_area.icon_lbl.hide()
+            self.drop_area.label.hide()
+            self.file_list_view.show()
+        # Duplicates are allowed. No queue append here. We build queue at runtime.
+        self.file_model.add_paths(paths)
+        self.scan_found += len(paths)
+        self.status.setText(f"Scanning... {self.scan_found} files found")
+
+    def on_scan_finished(self, summary):
+        self.scan_thread.quit()
+        self.scan_thread.wait()
+        self.scan_thread = None
+        self.scan_worker = None
+        self.update_process_button_text()
+        notes = []
+        if summary['skipped']:
+            notes.append(f"{summary['skipped']} non-Ambisonic skipped")
+        if summary.get('unverified'):
+            notes.append(f"{summary['unverified']} with unreadable header kept")
+        skipped = f" ({', '.join(notes)})" if notes else ""
+        if self.file_model.rowCount() == 0:
+            self.status.setText(f"No valid audio files found.{skipped}")
+            self.btn_process.setEnabled(False)
+        else:
+            stopped = "Scan stopped. " if summary['cancelled'] else ""
+            self.status.setText(f"{stopped}Ready to convert {self.file_model.rowCount()} files.{skipped}")
+            self.btn_process.setEnabled(self.ffmpeg_ok is not False)
+            self.btn_process.setStyleSheet(self.process_btn_style)
+        if self.scan_queue:
+            self.process_file(self.scan_queue.pop(0))
+
+    def cancel_scan(self):
+        self.scan_queue = []
+        if self.scan_worker is not None:
+            self.scan_worker.cancel()
+
+    def on_process_clicked(self):
+        if self.scan_thread is not None:
+            self.cancel_scan()
+        elif self.is_processing:
+            self.cancel_batch()
+        else:
+            self.run_conversion_batch()
+
+    def cancel_batch(self):
+        """Stops every queued and running file of the current batch."""
+        self.status.setText("Cancelling batch...")
+        self.btn_process.setEnabled(False)
+        if not self.jobs_by_ref:
+            return
+        if self.rows_by_job:
+            self.server.send({"op": "cancel", "jobs": list(self.rows_by_job)})
+        # Jobs not acknowledged yet get cancelled as their "queued" event arrives
+        self.cancel_pending = set(self.jobs_by_ref)
+
+    def cancel_file(self, row):
+        for job_id, job_row in self.rows_by_job.items():
+            if job_row == row:
+                self.server.send({"op": "cancel", "job": job_id})
+                break
+        else:
+            for ref, (ref_row, _) in self.jobs_by_ref.items():
+                if ref_row == row:
+                    self.cancel_pending.add(ref)
 
     def run_conversion_batch(self):
-        if self.is_processing: return
-        self.is_processing = True
+        if self.is_processing or self.scan_thread is not None: return
         
-        # Build Queue from List Items (handling deletions)
-        self.file_queue = []
-        count = self.file_list_widget.count()
-        if count == 0:
-            self.is_processing = False
+        # Build Queue from the list (handling deletions): everything not rendered yet
+        self.file_queue = [(self.file_model.path(row), row)
+                           for row in self.file_model.rows_in_state(IDLE, QUEUED, RUNNING, CANCELLED)]
+        if not self.file_queue:
             return
-            
-        for i in range(count):
-            item = self.file_list_widget.item(i)
-            fpath = item.data(Qt.ItemDataRole.UserRole)
-            self.file_queue.append((fpath, item))
-        
+
+        sofa_path = None
+        if self.mode == "Binaural":
+            sofa_path = self.hrtf_combo.currentData()
+            if not sofa_path or not os.path.exists(sofa_path):
+                QMessageBox.critical(self, "Missing HRTF File", f"Selected SOFA file not found or invalid.")
+                return
+
+        self.is_processing = True
+        self.cancel_pending = set()
         print(f"[DEBUG] Batch Start. Queue size: {len(self.file_queue)}")
-        self.btn_process.setEnabled(False)
+        self.btn_process.setText("CANCEL BATCH")
+        self.btn_process.setEnabled(True)
         self.drop_area.setEnabled(False) # Block drops
-        
-        self.process_next_in_queue()
-
-    def process_next_in_queue(self):
-        print("[DEBUG] process_next_in_queue started")
-        # Find next pending item
-        next_job = None
-        for fpath, item in self.file_queue:
-            status = item.data(Qt.ItemDataRole.UserRole + 1)
-            if status != "DONE": 
-                next_job = (fpath, item)
-                break
-        
-        if not next_job:
-            self.on_batch_finished()
+        self.file_list_view.locked = True # Rows are job handles until the batch ends
+        self.status.setText("Connecting to render server...")
+        self.pending_sofa = sofa_path
+        self.server.ensure_connected()
+
+    def on_server_connected(self):
+        if not self.is_processing:
             return
-            
-        fpath, item = next_job
-        self.current_job_item = item
-        self.current_row_widget = self.file_list_widget.itemWidget(item) # Store ref to widget
-        
-        self.run_conversion_single(fpath)
+        # Ask for the metrics table first; the batch is submitted when the reply arrives
+        self.server.send({"op": "metrics"})
+
+    def attach_metrics(self, name):
+        if self.metrics is not None and self.metrics.name == name:
+            return
+        if self.metrics is not None:
+            self.metrics.close()
+            self.metrics = None
+        try:
+            self.metrics = RenderMetrics(name=name)
+        except (OSError, ValueError) as e:
+            print(f"[Metrics] Falling back to progress events: {e}")
+
+    def poll_metrics(self):
+        """UI-rate refresh of every running job from the shared-memory metrics table."""
+        if self.metrics is None:
+            return
+        running = []
+        for rec in self.metrics.read_all():
+            row = self.rows_by_job.get(int(rec['job'])) if rec['state'] == METRICS_RUNNING else None
+            if row is None:
+                continue
+            running.append(rec)
+            self.file_model.set_progress(row, rec['progress'] * 100)
+            if self.eta is not None:
+                self.eta.update(self.refs_by_job.get(int(rec['job'])), float(rec['progress']))
+        if running:
+            peak = max(float(r['peak']) for r in running)
+            peak_db = f"{20 * math.log10(peak):.1f} dBFS" if peak > 0 else "-inf dBFS"
+            self.status.setText(f"Rendering {len(running)} file(s): "
+                                f"{sum(float(r['blocks_per_s']) for r in running):.0f} blocks/s, "
+                                f"peak {peak_db}, {max(int(r['rss']) for r in running) / 2**20:.0f} MB"
+                                f"{self.eta_text()}")
+
+    def eta_text(self):
+        from scheduling import format_eta
+        remaining = self.eta.remaining_s() if self.eta is not None else None
+        return f" - ETA {format_eta(remaining)}" if remaining is not None else ""
+
+    def submit_batch(self):
+        # Submit the whole batch at once; the server queues it and keeps filters warm between files.
+        # Header probes give each file a cost, and the submit priority sets the start order:
+        # small files come back first, big ones start early enough not to finish last alone.
+        from scheduling import estimate_job_costs, schedule_jobs, BatchETA
+        suffix = "_binaural.wav" if self.mode == "Binaural" else "_stereo.wav"
+        mode = self.mode.lower()
+        # No SOFA here: every job shares it, so its tap count only scales all costs alike
+        # (BatchETA measures the rate anyway), and reading it would load netCDF4 in the GUI
+        costs = estimate_job_costs([{"input": fpath, "mode": mode} for fpath, row in self.file_queue])
+        order = schedule_jobs(costs, self.server_slots)
+        self.eta = BatchETA(dict(enumerate(costs)), self.server_slots)
+        reserved = set()
+        self.jobs_by_ref = {}
+        self.rows_by_job = {}
+        self.refs_by_job = {}
+        self.file_model.set_states([row for fpath, row in self.file_queue], QUEUED)
+        for rank, ref in enumerate(order):
+            fpath, row = self.file_queue[ref]
+            base, ext = os.path.splitext(fpath)
+            output_path = self.get_unique_output_path(base, suffix, reserved)
+            reserved.add(output_path)
+            self.jobs_by_ref[ref] = (row, output_path)
+            self.server.send({"op": "submit", "input": fpath, "output": output_path,
+                              "sofa": self.pending_sofa, "mode": mode, "ref": ref, "priority": rank,
+                              "progress": self.metrics is None})
+        self.status.setText(f"Queued {len(self.file_queue)} files...")
+        self.metrics_timer.start()
+
+    def on_server_failed(self, message):
+        print(f"[RenderServer] {message}")
+        self.status.setText("Render server unavailable.")
+        for fpath, row in self.file_queue:
+            if self.file_model.state[row] in (QUEUED, RUNNING):
+                self.mark_row_finished(row, "error")
+        self.jobs_by_ref = {}
+        self.on_batch_finished()
+
+    def on_server_event(self, event):
+        kind = event.get("event")
+        if kind == "metrics":
+            self.attach_metrics(event["name"])
+            self.server_slots = event.get("slots") or self.server_slots
+            if self.is_processing and not self.jobs_by_ref:
+                self.submit_batch()
+            return
+        entry = self.jobs_by_ref.get(event.get("ref"))
+        if entry is None:
+            return
+        row, output_path = entry
+        name = os.path.basename(self.file_model.path(row))
+
+        if kind == "queued":
+            self.rows_by_job[event["job"]] = row
+            self.refs_by_job[event["job"]] = event["ref"]
+            if event["ref"] in self.cancel_pending:
+                self.server.send({"op": "cancel", "job": event["job"]})
+        elif kind == "started":
+            self.status.setText(f"Converting {name}...")
+            self.file_model.set_state(row, RUNNING)
+            self.file_list_view.scrollTo(self.file_model.index(row))
+        elif kind == "progress":
+            pct = int(event["value"] * 100)
+            if self.eta is not None:
+                self.eta.update(event["ref"], event["value"])
+            self.status.setText(f"Rendering {name}: {pct}%{self.eta_text()}")
+            self.file_model.set_progress(row, pct)
+        elif kind in ("done", "error", "cancelled"):
+            if kind == "error":
+                print(f"[Render Error] {name}: {event.get('message')}")
+            self.mark_row_finished(row, kind)
+            if self.eta is not None:
+                if kind == "cancelled":
+                    self.eta.discard(event["ref"])
+                else:
+                    self.eta.update(event["ref"], 1.0)
+            del self.jobs_by_ref[event["ref"]]
+            self.rows_by_job.pop(event["job"], None)
+            self.refs_by_job.pop(event["job"], None)
+            # Auto play only a single-file batch; playing 50 files is chaos
+            if kind == "done" and len(self.file_queue) == 1 and self.auto_play_cb.isChecked():
+                self.reset_and_play(output_path)
+            if not self.jobs_by_ref:
+                self.on_batch_finished()
+
+    def mark_row_finished(self, row, kind):
+        # Cancelled files stay eligible for the next run; errors are skipped
+        self.file_model.set_state(row, {"done": DONE, "cancelled": CANCELLED}.get(kind, ERROR))
 
     def on_batch_finished(self):
         self.is_processing = False
+        self.metrics_timer.stop()
+        self.eta = None
+        self.update_process_button_text()
+        self.drop_area.setEnabled(True)
+        self.file_list_view.locked = False
+        self.file_model.flush()
+        cancelled = self.file_model.rows_in_state(CANCELLED)
+        if cancelled:
+            # Leave the list so the cancelled files can be converted again
+            self.status.setText(f"Batch stopped: {len(cancelled)} file(s) cancelled.")
+            self.btn_process.setEnabled(True)
+            return
         self.status.setText("Batch Processing Complete!")
         self.btn_process.setEnabled(False) 
-        self.drop_area.setEnabled(True)
         self.batch_complete = True # Flag to clear list on next drop
-        
-        # Auto-play logic handled per-file or simplified to last file
-        # User requirement implies "Auto play result". Usually best to play LAST file if batch.
-        if self.auto_play_cb.isChecked() and self.file_queue:
-             # Just notification in status bar is enough if no popup desired for batch
-             pass
-
-    def get_unique_output_path(self, base_path, suffix):
-        """Appends _v2, _v3 etc if file exists."""
-        output_path = f"{base_path}{suffix}"
-        if not os.path.exists(output_path):
-            return output_path
-            
-        counter = 2
-        while True:
-            output_path = f"{base_path}{suffix[:-4]}_v{counter}{suffix[-4:]}" # Insert before extension
-            if not os.path.exists(output_path):
-                return output_path
-            counter += 1
-
-    def run_conversion_single(self, input_path):
-        base, ext = os.path.splitext(input_path)
-        
-        # NOTE: User requested NO spinner icon during processing. 
-        # Keeping existing 'music' icon (set during add) and only changing to checkmark on done.
-        
-        # Update Row Widget Icon (Optional: Could set to 'play' or something, but kept static per request)
-        if self.current_row_widget:
-            # self.current_row_widget.set_icon('mdi.loading', '#E67E22') # REMOVED SPINNER
-            self.file_list_widget.scrollToItem(self.current_job_item)
-        
-        # Determine Output Path with Versioning
-        if self.mode == "Binaural":
-            suffix = "_binaural.wav"
-            output_path = self.get_unique_output_path(base, suffix)
-            self.run_saf_process(input_path, output_path)
-        else:
-            suffix = "_stereo.wav"
-            output_path = self.get_unique_output_path(base, suffix)
-            
-            filter_str = "pan=stereo|c0=0.5*c0+0.5*c1|c1=0.5*c0-0.5*c1"
-            cmd = [self.ffmpeg_path, '-y', '-i', input_path, '-af', filter_str, output_path]
-            
-            self.status.setText(f"Converting {os.path.basename(input_path)}...")
-            QApplication.processEvents()
-            
-            try:
-                # Blocking call for Stereo (Fast enough usually)
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                if result.returncode == 0:
-                    self.on_worker_finished(0, QProcess.ExitStatus.NormalExit, output_path)
-                else:
-                    print(f"FFMPEG Error: {result.stderr}")
-                    self.on_worker_finished(1, QProcess.ExitStatus.NormalExit, output_path) 
-            except Exception as e:
-                print(e)
-                self.on_worker_finished(1, QProcess.ExitStatus.NormalExit, output_path)
+
+    def get_unique_output_path(self, base_path, suffix, reserved=()):
+        """Appends _v2, _v3 etc if file exists (or is already claimed by this batch)."""
+        return unique_output_path(base_path, suffix, reserved)
 
     def run_conversion(self):
         pass # Deprecated by batch
-    # --- ISOLATED PROCESS LOGIC ---
-    def run_saf_process(self, input_path, output_path):
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        # 1. Find SOFA
-        sofa_path = self.hrtf_combo.currentData()
-        
-        if not sofa_path or not os.path.exists(sofa_path):
-            QMessageBox.critical(self, "Missing HRTF File", f"Selected SOFA file not found or invalid.")
-            return
-        
-        # 2. Prepare Worker Process
-        self.saf_process = QProcess(self)
-        script_path = os.path.join(base_dir, "saf_wrapper.py")
-        
-        args = [
-            script_path,
-            "--input", input_path,
-            "--output", output_path,
-            "--sofa", sofa_path
-        ]
-        
-        print(f"Launching Worker: {sys.executable} {args}")
-        self.status.setText("Initializing SAF Worker...")
-        
-        self.saf_process.readyReadStandardOutput.connect(self.handle_worker_stdout)
-        self.saf_process.readyReadStandardError.connect(self.handle_worker_stderr)
-        self.saf_process.finished.connect(lambda code, stat: self.on_worker_finished(code, stat, output_path))
-        
-        print("[DEBUG] Calling saf_process.start()")
-        self.saf_process.start(sys.executable, args)
-        print("[DEBUG] saf_process.start() called")
-
-    def handle_worker_stdout(self):
-        data = self.saf_process.readAllStandardOutput().data().decode()
-        for line in data.splitlines():
-             # print(f"[Worker] {line}")
-             if line.startswith("PROGRESS:"):
-                 try:
-                     val = float(line.split(":")[1])
-                     pct = int(val * 100)
-                     self.status.setText(f"Rendering: {pct}%")
-                     # Update Row Widget Progress (Live)
-                     if self.current_row_widget:
-                         self.current_row_widget.set_progress(pct)
-                 except: pass
-
-    def handle_worker_stderr(self):
-        data = self.saf_process.readAllStandardError().data().decode()
-        if data.strip(): print(f"[Worker Debug] {data}")
-
-    def on_worker_finished(self, exit_code, exit_status, output_path):
-        # Update Item UI
-        if exit_code == 0 and exit_status == QProcess.ExitStatus.NormalExit:
-            if self.current_row_widget:
-                self.current_row_widget.set_icon('ic_check.svg', '#2ecc71')
-                self.current_row_widget.set_progress(100)
-            
-            self.current_job_item.setData(Qt.ItemDataRole.UserRole + 1, "DONE")
-            
-            # Auto play ONE file (if only one, or just the last one logic?)
-            # Logic: If AutoPlay is ON, we generally expect to hear the result.
-            # Implemented: Play each file as it finishes? Or wait? 
-            # User said "Auto-play result". For batch, playing 50 files is chaos.
-            # Safe bet: Play if it's the ONLY file. 
-            if len(self.file_queue) == 1 and self.auto_play_cb.isChecked():
-                self.reset_and_play(output_path)
-        else:
-            if self.current_row_widget:
-                self.current_row_widget.set_icon('ic_error.svg', '#e74c3c')
-                
-            self.current_job_item.setData(Qt.ItemDataRole.UserRole + 1, "DONE") # Skip retry
-            
-        # Trigger Next (No Popups!)
-        QTimer.singleShot(0, self.process_next_in_queue)
-        
- 
-
 
     def reset_and_play(self, output_path):
         self.status.setText(f"Done! Playing {os.path.basename(output_path)}")
@@ -643,6 +772,9 @@ class Ambix2Bin(AmbiToolboxApp):
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
+    app.setOrganizationName("AmbiToolbox")
+    app.setApplicationName("Ambix2Bin")
+    AssetManager.enable_disk_cache() # Icons rasterized once, reused by later launches
     
     # Load Font (Optional but good for completeness based on boilerplate)
     # Common UI handles basic styling, but specific fonts might be system dependent.
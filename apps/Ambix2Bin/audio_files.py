@@ -0,0 +1,135 @@
+import os
+import re
+import glob
+
+# Containers Ambix2Bin accepts (GUI drops, batch CLI, watch folders)
+VALID_EXTENSIONS = {'.wav', '.amb', '.opus', '.caf'}
+
+
+# Names our renders get: <stem>_binaural.wav, <stem>_stereo_v2.wav, ...
+_OUTPUT_NAME = re.compile(r"_(binaural|stereo)(_v\d+)?$")
+
+
+def is_audio_file(path):
+    return os.path.splitext(path)[1].lower() in VALID_EXTENSIONS
+
+
+def is_rendered_output(path):
+    """True for files named like Ambix2Bin outputs (<stem>_binaural.wav, <stem>_stereo_v2.wav, ...)."""
+    return rendered_output_source(path) is not None
+
+
+def rendered_output_source(path):
+    """Path (without extension) of the input an output-named file would come from, else None.
+
+    A name alone does not prove a file is ours: callers should also check that this
+    input exists or that the file is a recorded output.
+    """
+    stem, _ = os.path.splitext(path)
+    match = _OUTPUT_NAME.search(os.path.basename(stem))
+    return stem[:len(stem) - len(match.group(0))] if match else None
+
+
+def ambisonic_order(n_channels):
+    """N for a full-sphere (N+1)^2 channel count with N >= 1 (4, 9, 16, ... channels), else None."""
+    order = int(round(n_channels ** 0.5)) - 1
+    return order if order >= 1 and (order + 1) ** 2 == n_channels else None
+
+
+def ambisonic_header_ok(path):
+    """Header-only check that `path` has an (N+1)^2 channel count.
+
+    Returns None when no header reader could open the file (e.g. .opus without ffprobe),
+    so callers can keep it as unverified instead of dropping it. Goes through the shared
+    audio_probe cache, so the scheduler and the manifest reuse the header read instead
+    of opening the file again.
+    """
+    from audio_probe import probe  # Only needed when prefiltering
+    info = probe(path)
+    if info is None:
+        return None
+    return ambisonic_order(info['channels']) is not None
+
+
+def _walk_audio(directory, cancel):
+    """Audio files under `directory` with os.scandir: each folder's files (sorted), then its subfolders."""
+    try:
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda e: e.name)
+    except OSError:
+        return  # Unreadable folder (permissions, vanished share): skip it
+    subdirs = []
+    for entry in entries:
+        if cancel is not None and cancel.is_set():
+            return
+        try:
+            if entry.is_dir():
+                subdirs.append(entry.path)
+            elif is_audio_file(entry.name):
+                yield entry.path
+        except OSError:
+            continue
+    for sub in subdirs:
+        yield from _walk_audio(sub, cancel)
+
+
+def iter_audio_files(paths, cancel=None):
+    """Yields audio files from files, directories (recursively) and glob patterns as found.
+
+    Same order and de-duplication as scan_audio_files(); `cancel` is an optional
+    threading.Event checked between entries, so a scan of a slow share can be stopped.
+    """
+    seen = set()
+
+    def candidates():
+        for path in paths:
+            if os.path.isdir(path):
+                yield from _walk_audio(path, cancel)
+            elif glob.has_magic(path):
+                for match in sorted(glob.glob(path, recursive=True)):
+                    if os.path.isdir(match):
+                        yield from _walk_audio(match, cancel)
+                    elif os.path.isfile(match):
+                        yield match
+            else:
+                yield path
+
+    for path in candidates():
+        if cancel is not None and cancel.is_set():
+            return
+        key = os.path.abspath(path)
+        if key in seen or not is_audio_file(path):
+            continue
+        seen.add(key)
+        yield path
+
+
+def scan_audio_files(paths):
+    """Expands files, directories (recursively) and glob patterns into audio file paths.
+
+    Order follows `paths`, directory contents are sorted, and duplicates are dropped.
+    """
+    return list(iter_audio_files(paths))
+
+
+def unique_output_path(base_path, suffix, reserved=(), overwrite=False):
+    """`base_path + suffix`, or with _v2, _v3... inserted before the extension if taken.
+
+    Paths in `reserved` count as taken, so a batch never hands two jobs the same output.
+    With `overwrite`, existing files do not count, which keeps paths deterministic
+    across runs (incremental mode).
+    """
+    def taken(path):
+        return path in reserved or (not overwrite and os.path.exists(path))
+
+    output_path = f"{base_path}{suffix}"
+    if not taken(output_path):
+        return output_path
+
+    stem, ext = os.path.splitext(suffix)
+    counter = 2
+    while True:
+        output_path = f"{base_path}{stem}_v{counter}{ext}"
+        if not taken(output_path):
+            return output_path
+        counter += 1
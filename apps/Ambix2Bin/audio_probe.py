@@ -0,0 +1,335 @@
+import os
+import sys
+import json
+import struct
+import shutil
+import sqlite3
+import threading
+import subprocess
+
+from audio_files import ambisonic_order
+
+# Header-only metadata for input files: channel count, ambisonic order, convention hints,
+# rate, length and (when the file carries a PEAK chunk) channel peaks. WAV/RF64/BW64 are
+# parsed chunk by chunk without touching the sample data; other containers go through
+# ffprobe, then libsndfile. ProbeCache keeps results per (path, size, mtime) in sqlite so
+# the scan prefilter, the scheduler and the incremental manifest share one read per file.
+
+ENV_VAR = "AMBIX2BIN_PROBE_CACHE" # Cache file path, or "off" for a per-process cache only
+FFPROBE = "ffprobe"
+FFPROBE_TIMEOUT_S = 15
+TEXT_CHUNK_LIMIT = 64 * 1024 # Metadata chunks larger than this are not searched for hints
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+# KSDATAFORMAT_SUBTYPE_AMBISONIC_B_FORMAT_{PCM,IEEE_FLOAT}: the .amb (FuMa) format tags
+_BFORMAT_GUID_TAIL = bytes.fromhex("2107d3118644c8c1ca000000")
+_TEXT_CHUNKS = (b'LIST', b'bext', b'iXML', b'axml')
+
+
+def _convention_from_text(text):
+    """(ordering, normalization) named in free-form metadata, either may be None."""
+    text = text.lower()
+    if "ambix" in text:
+        return "ACN", "SN3D"
+    if "fuma" in text or "furse" in text:
+        return "FuMa", "FuMa"
+    ordering = "ACN" if "acn" in text else None
+    normalization = "SN3D" if "sn3d" in text else "N3D" if "n3d" in text else None
+    return ordering, normalization
+
+
+def _finish(info, path, hints=None):
+    """Fills order, duration, peak and the convention hints of a probe result."""
+    n_ch, fs = info['channels'], info['samplerate']
+    info['order'] = ambisonic_order(n_ch)
+    info['duration_s'] = info['frames'] / fs if fs else 0.0
+    peaks = info.get('peaks')
+    info['peaks'] = peaks if peaks and len(peaks) == n_ch else None
+    info['peak'] = max(info['peaks']) if info['peaks'] else None
+
+    ordering = normalization = None
+    source = None
+    if hints:
+        ordering, normalization, source = hints
+    if ordering is None and normalization is None and os.path.splitext(path)[1].lower() == '.amb':
+        ordering, normalization, source = "FuMa", "FuMa", "extension"
+    if ordering is None and normalization is None and info['order'] is not None:
+        ordering, normalization, source = "ACN", "SN3D", "default" # AmbiX, what the renderer expects
+    info['ordering'], info['normalization'], info['convention_source'] = ordering, normalization, source
+    return info
+
+
+def read_wav_header(path):
+    """Parses a RIFF/RF64/BW64 WAVE header; returns the probe dict, or None if not a WAVE file.
+
+    Only chunk headers, 'fmt ', 'ds64', 'PEAK' and small metadata chunks are read; the
+    data chunk is skipped by seeking. A data size past the end of the file (a recording
+    still in progress, or a truncated copy) is clamped to what is actually there.
+    """
+    file_size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        head = f.read(12)
+        if len(head) < 12 or head[8:12] != b'WAVE' or head[:4] not in (b'RIFF', b'RF64', b'BW64'):
+            return None
+        container = head[:4].decode('ascii').lower()
+        fmt = None
+        data_size = None
+        ds64_data_size = None
+        peaks = None
+        hints = None
+        pos = 12
+        while pos + 8 <= file_size:
+            f.seek(pos)
+            chunk_id, size = struct.unpack('<4sI', f.read(8))
+            body = pos + 8
+            if chunk_id == b'ds64' and size >= 24:
+                _, ds64_data_size, _ = struct.unpack('<QQQ', f.read(24))
+            elif chunk_id == b'fmt ' and size >= 16:
+                raw = f.read(min(size, 40))
+                tag, channels, rate, _, block_align, bits = struct.unpack('<HHIIHH', raw[:16])
+                fmt = {'tag': tag, 'channels': channels, 'samplerate': rate, 'block_align': block_align, 'bits': bits}
+                if tag == WAVE_FORMAT_EXTENSIBLE and len(raw) >= 40:
+                    fmt['channel_mask'] = struct.unpack('<I', raw[20:24])[0]
+                    fmt['subformat'] = struct.unpack('<H', raw[24:26])[0]
+                    fmt['bformat'] = raw[28:40] == _BFORMAT_GUID_TAIL
+            elif chunk_id == b'PEAK' and size >= 8:
+                raw = f.read(size)
+                n = (len(raw) - 8) // 8
+                peaks = [abs(struct.unpack_from('<f', raw, 8 + 8 * i)[0]) for i in range(n)]
+            elif chunk_id == b'data':
+                data_size = ds64_data_size if size == 0xFFFFFFFF and ds64_data_size is not None else size
+                data_size = max(0, min(data_size, file_size - body))
+                if container != 'riff' and size == 0xFFFFFFFF:
+                    size = data_size
+            elif chunk_id in _TEXT_CHUNKS and size <= TEXT_CHUNK_LIMIT and hints is None:
+                ordering, normalization = _convention_from_text(f.read(size).decode('latin-1'))
+                if ordering or normalization:
+                    hints = (ordering, normalization, "metadata")
+            pos = body + size + (size & 1)
+
+    if fmt is None or data_size is None or not fmt['channels'] or not fmt['block_align']:
+        return None
+    tag = fmt.get('subformat', fmt['tag'])
+    if fmt.get('bformat'):
+        hints = ("FuMa", "FuMa", "format")
+    info = {'container': container,
+            'codec': 'float' if tag == WAVE_FORMAT_IEEE_FLOAT else 'pcm' if tag == WAVE_FORMAT_PCM else f"0x{tag:04x}",
+            'channels': fmt['channels'], 'samplerate': fmt['samplerate'], 'bits': fmt['bits'],
+            'frames': data_size // fmt['block_align'], 'channel_mask': fmt.get('channel_mask'),
+            'peaks': peaks, 'source': 'header'}
+    return _finish(info, path, hints)
+
+
+def read_ffprobe(path, ffprobe=None, timeout=FFPROBE_TIMEOUT_S):
+    """First audio stream of any container FFmpeg reads, via ffprobe's JSON output; None if unavailable."""
+    try:
+        result = subprocess.run([ffprobe or FFPROBE, '-v', 'error', '-select_streams', 'a:0', '-show_streams',
+                                 '-show_format', '-of', 'json', path], capture_output=True, text=True, timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired):
+        return None # No ffprobe here, or it hung: fall back to libsndfile
+    if result.returncode != 0:
+        return None
+    try:
+        doc = json.loads(result.stdout)
+        stream = doc['streams'][0]
+        channels = int(stream['channels'])
+        rate = int(stream['sample_rate'])
+    except (ValueError, KeyError, IndexError, TypeError):
+        return None
+    frames = 0
+    if stream.get('duration_ts') is not None and stream.get('time_base') == f"1/{rate}":
+        frames = int(stream['duration_ts'])
+    else:
+        duration = stream.get('duration') or doc.get('format', {}).get('duration')
+        if duration is not None:
+            frames = int(round(float(duration) * rate))
+    hints = None
+    tags = dict(doc.get('format', {}).get('tags') or {}, **(stream.get('tags') or {}))
+    ordering, normalization = _convention_from_text(" ".join(f"{k} {v}" for k, v in tags.items()))
+    if ordering or normalization:
+        hints = (ordering, normalization, "metadata")
+    info = {'container': doc.get('format', {}).get('format_name', ''), 'codec': stream.get('codec_name', ''),
+            'channels': channels, 'samplerate': rate, 'bits': int(stream.get('bits_per_raw_sample') or 0) or None,
+            'frames': frames, 'channel_mask': None, 'peaks': None, 'source': 'ffprobe'}
+    return _finish(info, path, hints)
+
+
+def read_soundfile(path):
+    """libsndfile's header view (sf.info), the last resort; None if it cannot open the file."""
+    import soundfile as sf  # Only for files the parsers above could not handle
+    try:
+        info = sf.info(path)
+    except Exception:
+        return None
+    return _finish({'container': info.format.lower(), 'codec': info.subtype.lower(), 'channels': info.channels,
+                    'samplerate': info.samplerate, 'bits': None, 'frames': info.frames, 'channel_mask': None,
+                    'peaks': None, 'source': 'soundfile'}, path)
+
+
+def probe_file(path, ffprobe=None):
+    """Header metadata of one file, uncached; None if no reader understands it.
+
+    Returns {'container', 'codec', 'channels', 'samplerate', 'bits', 'frames',
+    'duration_s', 'order', 'ordering', 'normalization', 'convention_source',
+    'channel_mask', 'peaks', 'peak', 'source'}. `order` is None unless the channel
+    count is (N+1)^2. `ordering`/`normalization` are hints ("ACN"/"SN3D" for AmbiX,
+    "FuMa" for B-format): from the format GUID or metadata text if present, else
+    FuMa for .amb and AmbiX for any other (N+1)^2 file (convention_source says which).
+    `peaks` are the PEAK chunk's per-channel values, or None when the file has none.
+    """
+    try:
+        info = read_wav_header(path)
+    except (OSError, struct.error):
+        info = None
+    if info is None and os.path.splitext(path)[1].lower() not in ('.wav', '.amb'):
+        info = read_ffprobe(path, ffprobe)
+    if info is None:
+        info = read_soundfile(path)
+    return info
+
+
+def default_cache_path():
+    """$AMBIX2BIN_PROBE_CACHE, else probe-cache.sqlite in the user cache folder; None when disabled."""
+    path = os.environ.get(ENV_VAR)
+    if path:
+        return None if path.lower() == "off" else path
+    if sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches/Ambix2Bin")
+    elif sys.platform == "win32":
+        base = os.path.join(os.environ.get("LOCALAPPDATA", os.path.expanduser("~")), "Ambix2Bin", "cache")
+    else:
+        base = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "ambix2bin")
+    return os.path.join(base, "probe-cache.sqlite")
+
+
+class ProbeCache:
+    """probe_file() results kept in sqlite per (path, size, mtime_ns), plus an in-memory copy.
+
+    A file is only read again once its size or mtime changes; unreadable files are
+    cached too (as None), so re-scans do not retry them. Safe to share between threads;
+    several processes may use the same database file. Writes are committed in groups of
+    COMMIT_EVERY (and on flush()/close()), so a large scan is not one fsync per file.
+    """
+    COMMIT_EVERY = 256
+
+    def __init__(self, db_path=None, ffprobe=None):
+        self.db_path = db_path or ":memory:"
+        self.ffprobe = ffprobe
+        self.stats = {'hits': 0, 'misses': 0}
+        self._memory = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+        if self.db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS probes ("
+                          "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, info TEXT)")
+        self.conn.commit()
+
+    def flush(self):
+        with self._lock:
+            self.conn.commit()
+            self._pending = 0
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def peek(self, path):
+        """The in-memory result for `path` without any file access (may be stale); None if not probed."""
+        entry = self._memory.get(os.path.abspath(path))
+        return entry[2] if entry is not None else None
+
+    def get(self, path):
+        """probe_file(path) if size or mtime changed since the cached read, else the cached result."""
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = (st.st_size, st.st_mtime_ns)
+        entry = self._memory.get(path)
+        if entry is not None and entry[:2] == key:
+            self.stats['hits'] += 1
+            return entry[2]
+        with self._lock:
+            row = self.conn.execute("SELECT size, mtime_ns, info FROM probes WHERE path = ?", (path,)).fetchone()
+        if row is not None and tuple(row[:2]) == key:
+            info = json.loads(row[2])
+            self.stats['hits'] += 1
+        else:
+            info = probe_file(path, self.ffprobe)
+            self.stats['misses'] += 1
+            with self._lock:
+                self.conn.execute("INSERT OR REPLACE INTO probes VALUES (?, ?, ?, ?)",
+                                  (path, st.st_size, st.st_mtime_ns, json.dumps(info)))
+                self._pending += 1
+                if self._pending >= self.COMMIT_EVERY:
+                    self.conn.commit()
+                    self._pending = 0
+        self._memory[path] = key + (info,)
+        return info
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache():
+    """The process-wide ProbeCache at default_cache_path() (in memory if that is disabled or unwritable)."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            try:
+                _shared = ProbeCache(default_cache_path())
+            except (OSError, sqlite3.Error):
+                _shared = ProbeCache(None)
+            import atexit
+            atexit.register(_shared.flush)
+        return _shared
+
+
+def probe(path):
+    """probe_file() through the shared cache: what the scan, scheduler and manifest call."""
+    return shared_cache().get(path)
+
+
+def peek(path):
+    """The shared cache's in-memory result for `path`, with no file or database access; None if not probed."""
+    return _shared.peek(path) if _shared is not None else None
+
+
+def set_ffprobe(ffmpeg_path):
+    """Uses the ffprobe next to `ffmpeg_path` (a bundled build) if there is one."""
+    global FFPROBE
+    resolved = shutil.which(ffmpeg_path)
+    if resolved:
+        candidate = os.path.join(os.path.dirname(resolved), "ffprobe" + (".exe" if resolved.endswith(".exe") else ""))
+        if os.access(candidate, os.X_OK):
+            FFPROBE = candidate
+
+
+def describe(info):
+    """One-line summary for tooltips: '3rd order AmbiX (ACN/SN3D), 16 ch, 48 kHz, 1:23'."""
+    if info is None:
+        return "unreadable"
+    parts = []
+    order = info.get('order')
+    if order is not None:
+        suffix = {1: "st", 2: "nd", 3: "rd"}.get(order, "th")
+        name = "FuMa" if info.get('ordering') == "FuMa" else "AmbiX" if info.get('normalization') == "SN3D" else ""
+        parts.append(f"{order}{suffix} order {name} ({info.get('ordering')}/{info.get('normalization')})"
+                     .replace("  ", " "))
+    parts.append(f"{info['channels']} ch")
+    parts.append(f"{info['samplerate'] / 1000:g} kHz")
+    minutes, seconds = divmod(int(round(info.get('duration_s') or 0)), 60)
+    parts.append(f"{minutes}:{seconds:02d}")
+    return ", ".join(parts)
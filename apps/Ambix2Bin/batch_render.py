@@ -0,0 +1,334 @@
+import os
+import sys
+import csv
+import json
+import time
+import platform
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from audio_files import scan_audio_files, unique_output_path, rendered_output_source
+from incremental import RenderManifest, DEFAULT_DB_NAME
+from scheduling import estimate_job_costs, schedule_jobs, BatchETA, format_eta, probe_job, sofa_filter_length
+from render_memory import min_render_mb, jobs_within
+from saf_wrapper import SAFRenderer, render_stereo
+
+# Manifest columns/keys; anything missing falls back to the command-line defaults
+MANIFEST_FIELDS = ('input', 'output', 'sofa', 'order', 'mode', 'gain_db', 'gain_mode')
+GAIN_MODES = ('peak', 'bound', 'limit')
+MODE_SUFFIX = {'binaural': '_binaural.wav', 'stereo': '_stereo.wav'}
+
+_worker_renderer = None
+
+
+def load_manifest(path):
+    """Reads per-file jobs from a CSV (header row required) or JSON manifest.
+
+    JSON may be a list of objects or {"jobs": [...]}; `gain` is accepted for `gain_db`.
+    Relative paths are resolved against the manifest's directory.
+    """
+    if path.lower().endswith('.json'):
+        with open(path) as f:
+            rows = json.load(f)
+        if isinstance(rows, dict):
+            rows = rows.get('jobs', [])
+    else:
+        with open(path, newline='') as f:
+            rows = [r for r in csv.DictReader(f) if any((v or '').strip() for v in r.values())]
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    jobs = []
+    for row in rows:
+        row = {k.strip().lower(): v for k, v in row.items() if k}
+        if 'gain' in row and 'gain_db' not in row:
+            row['gain_db'] = row.pop('gain')
+        job = {}
+        for key in MANIFEST_FIELDS:
+            value = row.get(key)
+            if isinstance(value, str):
+                value = value.strip()
+            if value in (None, ''):
+                continue
+            if key in ('input', 'output', 'sofa'):
+                value = os.path.join(base_dir, os.path.expanduser(value))
+            elif key == 'order':
+                value = int(value)
+            elif key == 'gain_db':
+                value = float(value)
+            elif key in ('mode', 'gain_mode'):
+                value = value.lower()
+            job[key] = value
+        if 'input' not in job:
+            raise ValueError(f"Manifest row without an input: {row}")
+        jobs.append(job)
+    return jobs
+
+
+def _previous_outputs(paths, state=None):
+    """Scanned files that are our own earlier renders, so re-runs don't feed them back in.
+
+    A name like take_binaural.wav only counts when its input (take.*) is in the same
+    scan or `state` (a RenderManifest) recorded the file as an output; genuine inputs
+    that merely end in _binaural/_stereo are rendered as usual.
+    """
+    stems = {os.path.splitext(os.path.abspath(p))[0] for p in paths}
+    outputs = set()
+    for p in paths:
+        source = rendered_output_source(os.path.abspath(p))
+        if source is not None and (source in stems or (state is not None and state.is_recorded_output(p))):
+            outputs.add(p)
+    return outputs
+
+
+def build_jobs(inputs, manifest=None, sofa=None, order=None, mode='binaural', gain_db=None, output_dir=None,
+               deterministic=False, gain_mode='peak', state=None):
+    """Merges scanned inputs and manifest rows into complete job dicts with output paths.
+
+    With `deterministic`, outputs keep the same path across runs (overwriting) instead
+    of getting _v2, _v3... copies. Scanned files that are earlier outputs (see
+    _previous_outputs) are left out, each with a log line.
+    """
+    scanned = scan_audio_files(inputs)
+    outputs = _previous_outputs(scanned, state)
+    for p in scanned:
+        if p in outputs:
+            print(f"[Batch] SKIP  {os.path.basename(p)} (output of an earlier render)", file=sys.stderr)
+    jobs = [{'input': p} for p in scanned if p not in outputs]
+    if manifest:
+        jobs += load_manifest(manifest)
+
+    reserved = set()
+    for job in jobs:
+        job.setdefault('mode', mode)
+        job.setdefault('sofa', sofa)
+        job.setdefault('order', order)
+        job.setdefault('gain_db', gain_db)
+        job.setdefault('gain_mode', gain_mode)
+        if job['mode'] not in MODE_SUFFIX:
+            raise ValueError(f"Unknown mode '{job['mode']}' for {job['input']}")
+        if job['gain_mode'] not in GAIN_MODES:
+            raise ValueError(f"Unknown gain mode '{job['gain_mode']}' for {job['input']}")
+        if 'output' not in job:
+            base = os.path.splitext(job['input'])[0]
+            if output_dir:
+                base = os.path.join(output_dir, os.path.basename(base))
+            job['output'] = unique_output_path(base, MODE_SUFFIX[job['mode']], reserved, overwrite=deterministic)
+        reserved.add(job['output'])
+    return jobs
+
+
+def run_job(job, block_size=4096, memory_limit_mb=None):
+    """Renders one job and returns its report entry. Never raises.
+
+    With `memory_limit_mb` the renderer plans block size and SOFA residency to fit it.
+    """
+    global _worker_renderer
+    entry = dict(job)
+    t0 = time.perf_counter()
+    try:
+        if job['output'] and os.path.dirname(job['output']):
+            os.makedirs(os.path.dirname(job['output']), exist_ok=True)
+        if job['mode'] == 'stereo':
+            stats = render_stereo(job['input'], job['output'], gain_db=job['gain_db'])
+        else:
+            if not job['sofa']:
+                raise ValueError("No SOFA file given (use --sofa or a manifest 'sofa' column).")
+            # One warm renderer per worker process; repeated SOFA/order pairs skip prepare()
+            if _worker_renderer is None:
+                _worker_renderer = SAFRenderer()
+            _worker_renderer.progress_callback = lambda fraction: None
+            _worker_renderer.memory_limit_mb = memory_limit_mb
+            _worker_renderer.load_sofa(job['sofa'])
+            stats = _worker_renderer.render(job['input'], job['output'], block_size=block_size,
+                                            order=job['order'], gain_db=job['gain_db'],
+                                            gain_mode=job.get('gain_mode', 'peak'))
+        elapsed = time.perf_counter() - t0
+        duration = stats['samples'] / stats['fs'] if stats['fs'] else 0.0
+        entry.update({
+            'status': 'ok',
+            'error': None,
+            'order': stats['order'],
+            'duration_s': duration,
+            'elapsed_s': elapsed,
+            'rtf': elapsed / duration if duration else None,  # < 1.0 is faster than realtime
+            'peak': stats['peak'],
+            'peak_dbfs': float(20 * np.log10(stats['peak'])) if stats['peak'] > 0 else None,
+            'gain_db': stats['gain_db'],
+            'passes': stats['passes'],
+        })
+    except Exception as e:
+        entry.update({'status': 'error', 'error': f"{type(e).__name__}: {e}",
+                      'elapsed_s': time.perf_counter() - t0})
+    return entry
+
+
+def job_memory_mb(job):
+    """Smallest working set the job can render in (see render_memory.min_render_mb); 0.0 if unknown."""
+    if job.get('mode', 'binaural') == 'stereo' or not job.get('sofa'):
+        return 0.0
+    try:
+        taps = sofa_filter_length(job['sofa'])
+    except Exception:
+        return 0.0
+    probe = probe_job(job['input'], job.get('mode', 'binaural'), job.get('order'))
+    if probe is None:
+        return 0.0
+    order = job.get('order')
+    if order is None:
+        order = int(np.sqrt(probe['channels']) - 1)
+    return min_render_mb((order + 1)**2, taps)
+
+
+def run_batch(jobs, n_jobs=1, block_size=4096, on_result=None, state=None, memory_limit_mb=None):
+    """Runs jobs (in worker processes when n_jobs > 1) and returns the JSON report dict.
+
+    With a RenderManifest as `state`, jobs whose output is still valid are reported as
+    skipped, and every successful render is recorded. Jobs start in schedule_jobs()
+    order (small files first, large ones early enough to keep the makespan short);
+    results stay in input order. `on_result(entry, remaining_s)` also gets the batch ETA.
+    `memory_limit_mb` caps the whole batch: n_jobs drops until the largest job fits its
+    equal share at its smallest plan, and each job then renders within that share.
+    """
+    t0 = time.perf_counter()
+    results = [None] * len(jobs)
+    fingerprints = {}
+    pending = []
+    for i, job in enumerate(jobs):
+        if state is not None:
+            try:
+                fingerprints[i] = state.fingerprint(job, block_size)
+            except OSError:
+                pass  # Missing input/SOFA: let run_job report the error
+            if i in fingerprints and state.is_current(job, fingerprints[i]):
+                results[i] = dict(job, status='skipped', error=None)
+                if on_result:
+                    on_result(results[i], None)
+                continue
+        pending.append(i)
+
+    job_limit_mb = None
+    if memory_limit_mb:
+        need = max((job_memory_mb(jobs[i]) for i in pending), default=0.0)
+        n_jobs = jobs_within(memory_limit_mb, need, n_jobs)
+        job_limit_mb = memory_limit_mb / n_jobs
+    costs = dict(zip(pending, estimate_job_costs([jobs[i] for i in pending])))
+    order = schedule_jobs([costs[i] for i in pending], n_jobs)
+    pending = [pending[k] for k in order]
+    eta = BatchETA(costs, n_jobs)
+
+    def finish(i, entry):
+        results[i] = entry
+        eta.update(i, 1.0)
+        if state is not None and entry['status'] == 'ok' and i in fingerprints:
+            state.record(jobs[i], fingerprints[i])
+        if on_result:
+            on_result(entry, eta.remaining_s())
+
+    if n_jobs <= 1 or len(pending) <= 1:
+        for i in pending:
+            finish(i, run_job(jobs[i], block_size, job_limit_mb))
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            futures = {pool.submit(run_job, jobs[i], block_size, job_limit_mb): i for i in pending}
+            for fut in as_completed(futures):
+                finish(futures[fut], fut.result())
+
+    wall = time.perf_counter() - t0
+    ok = [r for r in results if r['status'] == 'ok']
+    audio = sum(r['duration_s'] for r in ok)
+    return {
+        'summary': {
+            'files': len(results),
+            'succeeded': len(ok),
+            'skipped': sum(r['status'] == 'skipped' for r in results),
+            'failed': sum(r['status'] == 'error' for r in results),
+            'jobs': n_jobs,
+            'block_size': block_size,
+            'memory_limit_mb': memory_limit_mb,
+            'wall_s': wall,
+            'audio_s': audio,
+            'rtf': wall / audio if audio else None,
+            'host': platform.node(),
+            'python': platform.python_version(),
+        },
+        'files': results,
+    }
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ambix2Bin headless batch renderer")
+    parser.add_argument("inputs", nargs="*", help="Files, directories (recursive) or glob patterns")
+    parser.add_argument("--manifest", help="CSV/JSON job list with input,output,sofa,order,mode,gain_db,gain_mode")
+    parser.add_argument("--sofa", help="Default SOFA Head Model file")
+    parser.add_argument("--order", type=int, help="Default decode order (default: from channel count)")
+    parser.add_argument("--mode", choices=sorted(MODE_SUFFIX), default="binaural")
+    parser.add_argument("--gain-db", type=float, help="Fixed gain instead of two-pass peak normalization")
+    parser.add_argument("--gain-mode", choices=GAIN_MODES, default="peak",
+                        help="peak: two-pass normalization; bound: one pass with a guaranteed no-clip gain; "
+                             "limit: one pass through a look-ahead true-peak limiter")
+    parser.add_argument("--output-dir", help="Write outputs here instead of next to the inputs")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Parallel worker processes")
+    parser.add_argument("--block-size", type=int, default=4096)
+    parser.add_argument("--memory-limit-mb", type=float,
+                        help="Memory ceiling for the whole batch; fewer jobs/smaller blocks as needed")
+    parser.add_argument("--report", help="Write the JSON report to this path ('-' for stdout)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Skip files whose output is still valid; overwrite stale outputs in place")
+    parser.add_argument("--state-db", help=f"Incremental manifest database (default: {DEFAULT_DB_NAME} "
+                                           "in --output-dir or the current directory)")
+    args = parser.parse_args(argv)
+
+    if not args.inputs and not args.manifest:
+        parser.error("give input paths/globs or --manifest")
+
+    state = None
+    if args.incremental:
+        db_path = args.state_db or os.path.join(args.output_dir or os.getcwd(), DEFAULT_DB_NAME)
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        state = RenderManifest(db_path)
+    jobs = build_jobs(args.inputs, args.manifest, args.sofa, args.order, args.mode, args.gain_db,
+                      args.output_dir, deterministic=args.incremental, gain_mode=args.gain_mode, state=state)
+    if not jobs:
+        print("[Batch] No valid audio files found.", file=sys.stderr)
+        if state is not None:
+            state.close()
+        return 1
+
+    def log(entry, remaining_s=None):
+        name = os.path.basename(entry['input'])
+        eta = f", ETA {format_eta(remaining_s)}" if remaining_s is not None else ""
+        if entry['status'] == 'skipped':
+            print(f"[Batch] SKIP  {name} (up to date)", file=sys.stderr)
+        elif entry['status'] == 'ok':
+            print(f"[Batch] OK    {name} ({entry['elapsed_s']:.2f}s, RTF {entry['rtf'] or 0:.3f}, "
+                  f"peak {entry['peak_dbfs'] or -np.inf:.2f} dBFS{eta})", file=sys.stderr)
+        else:
+            print(f"[Batch] ERROR {name}: {entry['error']}{eta}", file=sys.stderr)
+
+    print(f"[Batch] {len(jobs)} files, {args.jobs} job(s)", file=sys.stderr)
+    from contextlib import redirect_stdout
+    try:
+        with redirect_stdout(sys.stderr):  # Renderer chatter must not mix with a stdout report
+            report = run_batch(jobs, args.jobs, args.block_size, on_result=log, state=state,
+                               memory_limit_mb=args.memory_limit_mb)
+    finally:
+        if state is not None:
+            state.close()
+
+    if args.report == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+    s = report['summary']
+    print(f"[Batch] Done: {s['succeeded']} ok, {s['skipped']} skipped, {s['failed']} failed "
+          f"in {s['wall_s']:.2f}s", file=sys.stderr)
+    return 0 if s['failed'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+import os
+import numpy as np
+from PyQt6.QtWidgets import QListView, QStyledItemDelegate, QStyle, QAbstractItemView
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QRectF, QSize, QTimer, QEvent, pyqtSignal
+from PyQt6.QtGui import QColor, QPen
+
+import audio_probe
+
+# Job states, one uint8 per file
+IDLE, QUEUED, RUNNING, DONE, ERROR, CANCELLED = range(6)
+
+PATH_ROLE = Qt.ItemDataRole.UserRole
+STATE_ROLE = Qt.ItemDataRole.UserRole + 1
+PROGRESS_ROLE = Qt.ItemDataRole.UserRole + 2
+
+ROW_HEIGHT = 34
+FLUSH_MS = 50 # Progress repaints are coalesced to at most one per 50 ms
+
+
+class FileJobModel(QAbstractListModel):
+    """The file list of a batch: paths plus per-file state and progress in flat arrays.
+
+    Replaces one QListWidgetItem + row widget per file. Views paint only the visible
+    rows through FileRowDelegate. set_progress()/set_state() only mark rows dirty; one
+    dataChanged per FLUSH_MS covers everything that changed, so per-block progress of
+    many parallel jobs costs a single repaint of the visible range.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.paths = []
+        self.state = np.zeros(0, dtype=np.uint8)
+        self.progress = np.full(0, -1, dtype=np.int8) # -1 = no progress bar yet
+        self._dirty = None # [first, last] row changed since the last flush
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(FLUSH_MS)
+        self._flush_timer.timeout.connect(self.flush)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.paths)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        row = index.row()
+        if not index.isValid() or row >= len(self.paths):
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return os.path.basename(self.paths[row])
+        if role == PATH_ROLE:
+            return self.paths[row]
+        if role == Qt.ItemDataRole.ToolTipRole:
+            # Only what the folder scan already probed: hovering never touches the file
+            info = audio_probe.peek(self.paths[row])
+            return f"{self.paths[row]}\n{audio_probe.describe(info)}" if info is not None else self.paths[row]
+        if role == STATE_ROLE:
+            return int(self.state[row])
+        if role == PROGRESS_ROLE:
+            return int(self.progress[row])
+        if role == Qt.ItemDataRole.SizeHintRole:
+            return QSize(0, ROW_HEIGHT)
+        return None
+
+    def add_paths(self, paths):
+        """Appends files in one insert, however many there are."""
+        if not paths:
+            return
+        first = len(self.paths)
+        self.beginInsertRows(QModelIndex(), first, first + len(paths) - 1)
+        self.paths.extend(paths)
+        self.state = np.concatenate([self.state, np.zeros(len(paths), dtype=np.uint8)])
+        self.progress = np.concatenate([self.progress, np.full(len(paths), -1, dtype=np.int8)])
+        self.endInsertRows()
+
+    def remove_rows(self, rows):
+        """Removes rows, one beginRemoveRows per contiguous run (last run first)."""
+        rows = sorted(set(rows))
+        runs = []
+        for row in rows:
+            if runs and runs[-1][1] == row - 1:
+                runs[-1][1] = row
+            else:
+                runs.append([row, row])
+        for first, last in reversed(runs):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.paths[first:last + 1]
+            self.state = np.delete(self.state, np.s_[first:last + 1])
+            self.progress = np.delete(self.progress, np.s_[first:last + 1])
+            self.endRemoveRows()
+        self._dirty = None
+
+    def clear(self):
+        self.beginResetModel()
+        self.paths = []
+        self.state = np.zeros(0, dtype=np.uint8)
+        self.progress = np.full(0, -1, dtype=np.int8)
+        self._dirty = None
+        self.endResetModel()
+
+    def path(self, row):
+        return self.paths[row]
+
+    def rows_in_state(self, *states):
+        return np.flatnonzero(np.isin(self.state, states)).tolist()
+
+    def set_state(self, row, state):
+        self.state[row] = state
+        if state == DONE:
+            self.progress[row] = 100
+        elif state in (CANCELLED, IDLE):
+            self.progress[row] = -1
+        self._mark(row, row)
+
+    def set_states(self, rows, state):
+        """Same state for many rows (e.g. queueing a whole batch) with one change notification."""
+        if len(rows):
+            rows = np.asarray(rows)
+            self.state[rows] = state
+            self._mark(int(rows.min()), int(rows.max()))
+
+    def set_progress(self, row, percent):
+        percent = max(0, min(100, int(percent)))
+        if self.progress[row] != percent:
+            self.progress[row] = percent
+            self._mark(row, row)
+
+    def _mark(self, first, last):
+        if self._dirty is None:
+            self._dirty = [first, last]
+        else:
+            self._dirty = [min(self._dirty[0], first), max(self._dirty[1], last)]
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush(self):
+        """Emits the pending dataChanged now (the timer does this every FLUSH_MS)."""
+        self._flush_timer.stop()
+        if self._dirty is None:
+            return
+        first, last = self._dirty
+        self._dirty = None
+        last = min(last, len(self.paths) - 1)
+        if first <= last:
+            self.dataChanged.emit(self.index(first), self.index(last), [STATE_ROLE, PROGRESS_ROLE])
+
+
+class FileRowDelegate(QStyledItemDelegate):
+    """Paints a file row (icon, name, progress bar, cancel button) without a widget per row.
+
+    `icon_for(state)` returns the state's QPixmap and `cancel_icon()` the cancel button's;
+    both are asked per paint, so they should be cached. Clicks on the cancel button
+    emit cancel_clicked(row).
+    """
+    cancel_clicked = pyqtSignal(int)
+
+    BAR_WIDTH, BAR_HEIGHT = 140, 10
+    ICON = 24
+
+    def __init__(self, icon_for, cancel_icon, accent="#2ecc71", parent=None):
+        super().__init__(parent)
+        self.icon_for = icon_for
+        self.cancel_icon = cancel_icon
+        self.accent = QColor(accent)
+
+    def sizeHint(self, option, index):
+        return QSize(0, ROW_HEIGHT) # Rows span the viewport
+
+    def _cancel_rect(self, rect):
+        return QRect(rect.right() - 5 - self.ICON, rect.top() + (rect.height() - self.ICON) // 2, self.ICON, self.ICON)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        rect = option.rect
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.setPen(QPen(self.accent))
+            painter.setBrush(QColor("#333"))
+            painter.drawRoundedRect(QRectF(rect).adjusted(0.5, 0.5, -0.5, -0.5), 4, 4)
+        else:
+            painter.setPen(QColor("#444"))
+            painter.drawLine(rect.bottomLeft(), rect.bottomRight())
+
+        state = index.data(STATE_ROLE)
+        progress = index.data(PROGRESS_ROLE)
+        x = rect.left() + 5
+        y = rect.top() + (rect.height() - self.ICON) // 2
+        pm = self.icon_for(state)
+        if pm is not None and not pm.isNull():
+            painter.drawPixmap(QRect(x, y, self.ICON, self.ICON), pm)
+        x += self.ICON + 10
+
+        right = rect.right() - 5
+        if state in (QUEUED, RUNNING):
+            painter.drawPixmap(self._cancel_rect(rect), self.cancel_icon())
+            right -= self.ICON + 10
+        if progress >= 0:
+            bar = QRectF(right - self.BAR_WIDTH, rect.top() + (rect.height() - self.BAR_HEIGHT) / 2,
+                         self.BAR_WIDTH, self.BAR_HEIGHT)
+            painter.setPen(QColor("#666"))
+            painter.setBrush(QColor("#222"))
+            painter.drawRoundedRect(bar, 5, 5)
+            if progress > 0:
+                painter.setPen(Qt.PenStyle.NoPen)
+                painter.setBrush(self.accent)
+                chunk = bar.adjusted(1, 1, -1, -1)
+                chunk.setWidth(chunk.width() * progress / 100)
+                painter.drawRoundedRect(chunk, 4, 4)
+            right = int(bar.left()) - 10
+
+        painter.setPen(QColor("#DDD"))
+        text_rect = QRect(x, rect.top(), max(0, right - x), rect.height())
+        name = option.fontMetrics.elidedText(index.data(Qt.ItemDataRole.DisplayRole), Qt.TextElideMode.ElideMiddle,
+                                             text_rect.width())
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, name)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.Type.MouseButtonRelease and index.data(STATE_ROLE) in (QUEUED, RUNNING)
+                and self._cancel_rect(option.rect).contains(event.position().toPoint())):
+            self.cancel_clicked.emit(index.row())
+            return True
+        return super().editorEvent(event, model, option, index)
+
+
+class FileListView(QListView):
+    """List view for FileJobModel; Delete/Backspace removes the selected files unless locked."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.locked = False # Set while a batch runs: rows are the batch's job handles
+        self.setUniformItemSizes(True)
+        # Batched layout: otherwise every dataChanged relays out all rows, O(files) per repaint
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(1000)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+
+    def keyPressEvent(self, event):
+        if event.key() in (Qt.Key.Key_Delete, Qt.Key.Key_Backspace):
+            if not self.locked:
+                self.model().remove_rows([i.row() for i in self.selectionModel().selectedRows()])
+        else:
+            super().keyPressEvent(event)
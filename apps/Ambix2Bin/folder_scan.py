@@ -0,0 +1,60 @@
+import time
+import threading
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from audio_files import iter_audio_files, ambisonic_header_ok
+
+CHUNK_FILES = 500 # Files per chunk signal...
+CHUNK_INTERVAL_S = 0.1 # ...or whatever was found in this long, whichever comes first
+
+
+class FolderScanWorker(QObject):
+    """Scans dropped files/folders off the GUI thread and streams the results in chunks.
+
+    Run it on a QThread (thread.started -> run). `chunk(list)` delivers accepted paths
+    in scan order; `finished(dict)` ends the scan with {'found', 'skipped', 'unverified',
+    'cancelled', 'elapsed_s'}. With `prefilter`, each file's header is read and files
+    with another channel count are skipped; files whose header cannot be read are still
+    accepted and counted as unverified. cancel() is safe from any thread.
+    """
+    chunk = pyqtSignal(list)
+    finished = pyqtSignal(dict)
+
+    def __init__(self, paths, prefilter=True, chunk_files=CHUNK_FILES, chunk_interval_s=CHUNK_INTERVAL_S):
+        super().__init__()
+        self.paths = list(paths)
+        self.prefilter = prefilter
+        self.chunk_files = chunk_files
+        self.chunk_interval_s = chunk_interval_s
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self):
+        t0 = time.perf_counter()
+        found = skipped = unverified = 0
+        batch = []
+        batch_unverified = 0
+        last_emit = time.monotonic()
+        for path in iter_audio_files(self.paths, self._cancel):
+            ok = ambisonic_header_ok(path) if self.prefilter else True
+            if ok is False:
+                skipped += 1
+            else:
+                batch.append(path)
+                batch_unverified += ok is None
+            if batch and (len(batch) >= self.chunk_files or time.monotonic() - last_emit >= self.chunk_interval_s):
+                self.chunk.emit(batch)
+                found += len(batch)
+                unverified += batch_unverified
+                batch = []
+                batch_unverified = 0
+                last_emit = time.monotonic()
+        if batch and not self._cancel.is_set():
+            self.chunk.emit(batch)
+            found += len(batch)
+            unverified += batch_unverified
+        self.finished.emit({'found': found, 'skipped': skipped, 'unverified': unverified,
+                            'cancelled': self._cancel.is_set(), 'elapsed_s': time.perf_counter() - t0})
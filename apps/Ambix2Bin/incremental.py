@@ -0,0 +1,109 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+
+from audio_probe import probe
+
+# Bump when a renderer change alters output for identical inputs and settings
+RENDER_VERSION = 1
+DEFAULT_DB_NAME = ".ambix2bin-manifest.sqlite"
+
+
+def _effective_order(job):
+    """The decode order the render will use: job['order'], else the one the input's channels carry.
+
+    Read from the audio_probe cache, so `--order 3` and the default on a 16-channel file
+    count as the same settings without opening the file.
+    """
+    order = job.get('order')
+    if order is None and job['mode'] != 'stereo':
+        info = probe(job['input'])
+        if info is not None and info['order'] is not None:
+            order = info['order']
+    return order
+
+
+def _settings_key(job, block_size):
+    settings = {'version': RENDER_VERSION, 'mode': job['mode'], 'order': _effective_order(job),
+                'gain_db': job.get('gain_db'), 'gain_mode': job.get('gain_mode', 'peak'), 'block_size': block_size}
+    return json.dumps(settings, sort_keys=True)
+
+
+class RenderManifest:
+    """sqlite record of finished renders, used to skip jobs whose output is still valid.
+
+    Content hashes are cached per (path, size, mtime), so a re-run over an unchanged
+    library only stats files instead of reading them.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS file_hashes (
+                path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, hash TEXT);
+            CREATE TABLE IF NOT EXISTS renders (
+                output TEXT PRIMARY KEY, input TEXT, input_hash TEXT, sofa_hash TEXT,
+                settings TEXT, output_size INTEGER, output_mtime_ns INTEGER, rendered_at REAL);
+        """)
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def file_hash(self, path):
+        """BLAKE2b of the file contents, reusing the cached value while size and mtime match."""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        row = self.conn.execute("SELECT size, mtime_ns, hash FROM file_hashes WHERE path = ?", (path,)).fetchone()
+        if row is not None and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            return row[2]
+
+        h = hashlib.blake2b(digest_size=20)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        digest = h.hexdigest()
+        self.conn.execute("INSERT OR REPLACE INTO file_hashes VALUES (?, ?, ?, ?)",
+                          (path, st.st_size, st.st_mtime_ns, digest))
+        return digest
+
+    def fingerprint(self, job, block_size):
+        """(input hash, SOFA hash, settings) that an existing output must match."""
+        sofa_hash = self.file_hash(job['sofa']) if job['mode'] != 'stereo' and job.get('sofa') else None
+        return self.file_hash(job['input']), sofa_hash, _settings_key(job, block_size)
+
+    def is_current(self, job, fingerprint):
+        """True if job['output'] was rendered from the same input, SOFA and settings and is untouched."""
+        output = os.path.abspath(job['output'])
+        row = self.conn.execute(
+            "SELECT input_hash, sofa_hash, settings, output_size, output_mtime_ns FROM renders WHERE output = ?",
+            (output,)).fetchone()
+        if row is None or tuple(row[:3]) != tuple(fingerprint):
+            return False
+        try:
+            st = os.stat(output)
+        except OSError:
+            return False
+        return st.st_size == row[3] and st.st_mtime_ns == row[4]
+
+    def is_recorded_output(self, path):
+        """True if `path` was written as the output of a recorded render."""
+        row = self.conn.execute("SELECT 1 FROM renders WHERE output = ?", (os.path.abspath(path),)).fetchone()
+        return row is not None
+
+    def record(self, job, fingerprint):
+        output = os.path.abspath(job['output'])
+        st = os.stat(output)
+        self.conn.execute("INSERT OR REPLACE INTO renders VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                          (output, os.path.abspath(job['input'])) + tuple(fingerprint)
+                          + (st.st_size, st.st_mtime_ns, time.time()))
+        self.conn.commit()
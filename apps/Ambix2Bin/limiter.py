@@ -0,0 +1,118 @@
+import numpy as np
+from scipy.signal import firwin, lfilter
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class TruePeakLimiter:
+    """Streaming look-ahead limiter with oversampled (true-peak) detection.
+
+    Feed blocks of any size to process(); each call returns the same number of
+    frames, delayed by `latency` samples. flush() returns the final `latency`
+    frames, so dropping the first `latency` output frames and appending flush()
+    gives output sample-aligned with the input.
+
+    Per block, all vectorized:
+      1. Inter-sample peaks from a polyphase interpolation FIR (`oversample`x),
+         combined with the sample peaks and linked across channels. At 4x this
+         reads within about 0.2 dB of the true peak (the BS.1770 meter figure).
+      2. Required gain ceiling / peak, then a trailing minimum over the look-ahead
+         window, so gain reduction starts `lookahead` samples before a peak.
+      3. Release: a one-pole lowpass (lfilter) of that curve, taking the minimum
+         of both so reduction is instant and recovery is smooth.
+      4. A moving average over the look-ahead window to ramp the attack. Each
+         averaged value comes from a window that contains the peak, so the gain
+         at the peak is never above what it requires.
+    """
+
+    def __init__(self, fs, channels=2, ceiling_db=-1.0, lookahead_ms=1.5, release_ms=60.0, oversample=4,
+                 taps_per_phase=16):
+        self.fs = float(fs)
+        self.channels = channels
+        self.ceiling = 10.0 ** (ceiling_db / 20.0)
+        self.oversample = oversample
+        self.lookahead = max(1, int(round(lookahead_ms * 1e-3 * self.fs)))
+        self.release_coef = 1.0 - np.exp(-1.0 / max(1.0, release_ms * 1e-3 * self.fs))
+
+        # Polyphase interpolator: phase p of the upsampled signal is a K-tap FIR on the input
+        K = taps_per_phase
+        # Odd length, so the upsampled grid lands on the input samples instead of between them
+        h = firwin(K * oversample - 1, 1.0 / oversample, window=('kaiser', 8.0)) * oversample
+        h = np.append(h, 0.0)
+        self._phases = h.reshape(K, oversample).T[:, ::-1].astype(np.float32)  # (os, K), time-reversed
+        self._K = K
+        self._det_delay = K // 2  # Interpolated points lag the newest input sample by about K/2
+        self.latency = self.lookahead + self._det_delay
+        self.reset()
+
+    def reset(self):
+        L, K = self.lookahead, self._K
+        self._x_hist = np.zeros((K - 1, self.channels), dtype=np.float32)  # Interpolator input history
+        self._det_prev = np.zeros(1)                                         # Last detector value
+        self._g_hist = np.ones(L)       # Required gain, for the trailing minimum
+        self._lp_zi = np.array([1.0])   # Release filter state (unity gain at rest)
+        self._r_hist = np.ones(L)       # Released gain, for the moving average
+        self._delay = np.zeros((self.latency, self.channels), dtype=np.float32)
+        self.gain_reduction_db = 0.0    # Deepest reduction so far, for reporting
+
+    def state(self):
+        """Flat dict of arrays (checkpoint-friendly); restore with set_state()."""
+        return {'lim_x_hist': self._x_hist, 'lim_det_prev': self._det_prev, 'lim_g_hist': self._g_hist,
+                'lim_lp_zi': self._lp_zi, 'lim_r_hist': self._r_hist, 'lim_delay': self._delay,
+                'lim_gr_db': np.array([self.gain_reduction_db])}
+
+    def set_state(self, state):
+        self._x_hist = np.array(state['lim_x_hist'], dtype=np.float32)
+        self._det_prev = np.array(state['lim_det_prev'], dtype=np.float64)
+        self._g_hist = np.array(state['lim_g_hist'], dtype=np.float64)
+        self._lp_zi = np.array(state['lim_lp_zi'], dtype=np.float64)
+        self._r_hist = np.array(state['lim_r_hist'], dtype=np.float64)
+        self._delay = np.array(state['lim_delay'], dtype=np.float32)
+        self.gain_reduction_db = float(np.ravel(state['lim_gr_db'])[0])
+
+    def _detect(self, block):
+        """Per-frame peak (linked over channels) aligned to the input frame `latency - lookahead` back."""
+        ext = np.concatenate([self._x_hist, block])
+        self._x_hist = ext[-(self._K - 1):]
+        win = sliding_window_view(ext, self._K, axis=0)          # (n, ch, K)
+        inter = np.abs(win @ self._phases.T).max(axis=(1, 2))    # Max over channels and phases
+        # The frame at the centre of the window, exactly
+        centre = np.abs(ext[self._K - 1 - self._det_delay:ext.shape[0] - self._det_delay]).max(axis=1)
+        # An inter-sample peak may sit on either side of the centre frame
+        both = np.maximum(inter, np.concatenate([self._det_prev, inter[:-1]]))
+        self._det_prev = inter[-1:]
+        return np.maximum(both, centre)
+
+    def process(self, block):
+        """Limits one (n, channels) block; returns (n, channels), `latency` frames late."""
+        block = np.asarray(block, dtype=np.float32)
+        n = block.shape[0]
+        if n == 0:
+            return block
+        L = self.lookahead
+        peak = self._detect(block)
+        g_req = np.minimum(1.0, self.ceiling / np.maximum(peak, 1e-12))
+
+        g_ext = np.concatenate([self._g_hist, g_req])
+        self._g_hist = g_ext[-L:]
+        held = sliding_window_view(g_ext, L + 1).min(axis=1)
+
+        a = self.release_coef
+        smooth, self._lp_zi = lfilter([a], [1.0, a - 1.0], held, zi=self._lp_zi)
+        released = np.minimum(held, smooth)
+
+        r_ext = np.concatenate([self._r_hist, released])
+        self._r_hist = r_ext[-L:]
+        csum = np.concatenate([[0.0], np.cumsum(r_ext)])
+        gain = (csum[L + 1:] - csum[:-L - 1]) / (L + 1)
+
+        d_ext = np.concatenate([self._delay, block])
+        out = d_ext[:n]
+        self._delay = d_ext[n:]
+        g_min = float(gain.min())
+        if g_min < 1.0:
+            self.gain_reduction_db = min(self.gain_reduction_db, 20 * np.log10(g_min))
+        return (out * gain[:, None]).astype(np.float32)
+
+    def flush(self):
+        """Pushes silence through to return the last `latency` frames."""
+        return self.process(np.zeros((self.latency, self.channels), dtype=np.float32))
@@ -0,0 +1,98 @@
+import os
+import json
+import glob
+import time
+import shutil
+import subprocess
+
+from PyQt6.QtCore import QObject, QSettings, pyqtSignal
+
+# Startup checks that used to block the window: the FFmpeg capability probe and the HRTF
+# folder scan. PreflightWorker runs both on a QThread; the probe result is cached in
+# QSettings and only rerun when the FFmpeg binary (path or mtime) changes.
+FFMPEG_CACHE_KEY = "preflight/ffmpeg"
+PROBE_TIMEOUT_S = 15
+DEFAULT_HRTF = "HRIR_L2702.sofa"
+
+
+def resolve_ffmpeg(ffmpeg_path):
+    """Absolute path of the binary that `ffmpeg_path` runs, or None if there is none."""
+    found = shutil.which(ffmpeg_path)
+    return os.path.realpath(found) if found else None
+
+
+def ffmpeg_fingerprint(ffmpeg_path):
+    """'<resolved path>|<mtime_ns>' identifying one FFmpeg build, or None if missing."""
+    resolved = resolve_ffmpeg(ffmpeg_path)
+    if resolved is None:
+        return None
+    try:
+        return f"{resolved}|{os.stat(resolved).st_mtime_ns}"
+    except OSError:
+        return None
+
+
+def probe_ffmpeg(ffmpeg_path, timeout=PROBE_TIMEOUT_S):
+    """Runs `ffmpeg -filters`; returns {'found', 'sofalizer', 'error'}."""
+    try:
+        result = subprocess.run([ffmpeg_path, '-filters'], capture_output=True, text=True, timeout=timeout)
+    except FileNotFoundError:
+        return {'found': False, 'sofalizer': False, 'error': "FFmpeg binary not found."}
+    except (OSError, subprocess.TimeoutExpired) as e:
+        return {'found': True, 'sofalizer': False, 'error': f"{type(e).__name__}: {e}"}
+    if result.returncode != 0:
+        return {'found': True, 'sofalizer': False, 'error': "Error running ffmpeg -filters"}
+    return {'found': True, 'sofalizer': "sofalizer" in result.stdout, 'error': None}
+
+
+def cached_ffmpeg_probe(settings, ffmpeg_path):
+    """probe_ffmpeg() through the QSettings cache; returns (result, from_cache).
+
+    Only probes of an existing binary are cached, so installing FFmpeg later is
+    noticed on the next start.
+    """
+    key = ffmpeg_fingerprint(ffmpeg_path)
+    if key is not None:
+        try:
+            cached = json.loads(settings.value(FFMPEG_CACHE_KEY, "") or "{}")
+        except (TypeError, ValueError):
+            cached = {}
+        if cached.get('key') == key:
+            return cached['result'], True
+    result = probe_ffmpeg(ffmpeg_path)
+    if key is not None and result['found']:
+        settings.setValue(FFMPEG_CACHE_KEY, json.dumps({'key': key, 'result': result}))
+    return result, False
+
+
+def scan_hrtf_dir(hrtf_dir):
+    """Sorted .sofa paths in `hrtf_dir` (None if the folder is missing) and the default index."""
+    if not os.path.isdir(hrtf_dir):
+        return None, 0
+    sofa_files = sorted(glob.glob(os.path.join(hrtf_dir, "*.sofa")))
+    names = [os.path.basename(p) for p in sofa_files]
+    return sofa_files, names.index(DEFAULT_HRTF) if DEFAULT_HRTF in names else 0
+
+
+class PreflightWorker(QObject):
+    """Runs the startup checks off the GUI thread; emits one result dict.
+
+    {'ffmpeg': probe_ffmpeg() dict, 'ffmpeg_cached': bool, 'hrtfs': [paths] or None,
+     'hrtf_default': index, 'elapsed_s': float}
+    """
+    finished = pyqtSignal(dict)
+
+    def __init__(self, ffmpeg_path, hrtf_dir, settings_scope=("AmbiToolbox", "Ambix2Bin")):
+        super().__init__()
+        self.ffmpeg_path = ffmpeg_path
+        self.hrtf_dir = hrtf_dir
+        self.settings_scope = settings_scope
+
+    def run(self):
+        t0 = time.perf_counter()
+        hrtfs, default = scan_hrtf_dir(self.hrtf_dir)
+        settings = QSettings(*self.settings_scope)  # QSettings objects are per thread
+        ffmpeg, cached = cached_ffmpeg_probe(settings, self.ffmpeg_path)
+        settings.sync()
+        self.finished.emit({'ffmpeg': ffmpeg, 'ffmpeg_cached': cached, 'hrtfs': hrtfs, 'hrtf_default': default,
+                            'elapsed_s': time.perf_counter() - t0})
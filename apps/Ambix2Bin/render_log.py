@@ -0,0 +1,86 @@
+import os
+import sys
+import json
+import logging
+
+# Engine messages go through loggers under "ambix2bin" instead of print(). Nothing is
+# emitted below WARNING until logging is switched on, either at runtime with
+# configure() or with AMBIX2BIN_LOG=info|debug[,json] in the environment.
+ROOT = "ambix2bin"
+ENV_VAR = "AMBIX2BIN_LOG"
+
+_handler = None
+
+
+def get_logger(component):
+    """Logger for one engine component, e.g. get_logger("SAFRenderer")."""
+    return logging.getLogger(f"{ROOT}.{component}")
+
+
+def fields(**values):
+    """Structured fields for a record: log.info("msg", extra=fields(event="x", n=1))."""
+    return {'fields': values}
+
+
+class TextFormatter(logging.Formatter):
+    """The old print() shape: "[Component] message"."""
+
+    def format(self, record):
+        text = f"[{record.name.rsplit('.', 1)[-1]}] {record.getMessage()}"
+        if record.exc_info:
+            text += "\n" + self.formatException(record.exc_info)
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, component, message and the record's fields."""
+
+    def format(self, record):
+        entry = {'ts': round(record.created, 6), 'level': record.levelname.lower(),
+                 'component': record.name.rsplit('.', 1)[-1], 'msg': record.getMessage()}
+        entry.update(getattr(record, 'fields', None) or {})
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=_jsonable)
+
+
+def _jsonable(value):
+    if hasattr(value, 'tolist'):
+        return value.tolist()  # NumPy scalars and arrays
+    return str(value)
+
+
+def configure(level="info", fmt="text", stream=None):
+    """Switches engine logging on (or off with level="off"); safe to call again at runtime.
+
+    `fmt` is "text" (the familiar "[SAFRenderer] ..." lines) or "json". Output goes to
+    `stream`, default stdout, where the worker CLI always wrote its messages.
+    """
+    global _handler
+    root = logging.getLogger(ROOT)
+    if _handler is not None:
+        root.removeHandler(_handler)
+        _handler = None
+    if level is None or str(level).lower() == "off":
+        root.setLevel(logging.WARNING)
+        root.propagate = True
+        return
+    _handler = logging.StreamHandler(stream or sys.stdout)
+    _handler.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+    root.addHandler(_handler)
+    root.setLevel(getattr(logging, str(level).upper()) if isinstance(level, str) else level)
+    root.propagate = False
+
+
+def configure_from_env(default=None):
+    """Applies AMBIX2BIN_LOG ("info", "debug,json", "off"), else `default` if given."""
+    spec = os.environ.get(ENV_VAR, default)
+    if not spec:
+        return
+    parts = [p.strip().lower() for p in spec.split(',')]
+    fmt = "json" if "json" in parts else "text"
+    levels = [p for p in parts if p not in ("json", "text")]
+    configure(levels[0] if levels else "info", fmt)
+
+
+configure_from_env()
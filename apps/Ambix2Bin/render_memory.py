@@ -0,0 +1,201 @@
+import os
+import sys
+import tracemalloc
+from contextlib import nullcontext
+
+from render_metrics import current_rss
+
+MB = 2**20
+_NULL_STAGE = nullcontext()
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+TRACE_FRAMES = 16  # Deep enough to get from NumPy/SciPy internals back to our own line
+
+
+def _peak_rss():
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+    except ImportError:
+        return current_rss()
+
+
+class MemoryAccountant:
+    """Memory-accounting mode: per-stage Python heap high-water marks and largest allocations.
+
+    `with accountant.stage("pass2"):` records, for that stage, the tracemalloc peak
+    above the stage's starting heap (transient per-block arrays included), what the
+    stage left allocated, the RSS at its end and the `top` source lines that allocated
+    the most, attributed to the innermost frame in this app (the library line that did
+    the allocating is noted in brackets). Lines are sampled once per stage at the first
+    sample() call (from inside the block loop, where per-block buffers are alive) or at
+    the stage's end.
+    Disabled (the default), stage() is a shared no-op and tracemalloc is never started.
+    """
+
+    def __init__(self, enabled=False, top=5):
+        self.enabled = enabled
+        self.top = top
+        self.stages = {}
+        self._current = None
+        self._started_tracing = False
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def sample(self):
+        """Records the largest live allocations of the current stage, once per stage."""
+        stage = self._current
+        if stage is not None and stage.snapshot is None:
+            stage.snapshot = tracemalloc.take_snapshot()
+
+    def stop(self):
+        """Stops tracemalloc if this accountant started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def report(self):
+        """{'peak_rss_mb', 'stages': {name: {'peak_mb', 'retained_mb', 'rss_mb', 'top'}}}."""
+        return {'peak_rss_mb': _peak_rss() / MB, 'stages': dict(self.stages)}
+
+    def format(self):
+        lines = []
+        for name, s in self.stages.items():
+            lines.append(f"{name:12s} peak +{s['peak_mb']:7.2f} MB  retained {s['retained_mb']:+7.2f} MB  "
+                         f"RSS {s['rss_mb']:7.1f} MB")
+            for entry in s['top']:
+                lines.append(f"    {entry['mb']:7.2f} MB in {entry['count']:4d} block(s)  {entry['where']}")
+        return "\n".join(lines)
+
+
+class _Stage:
+    def __init__(self, accountant, name):
+        self.accountant = accountant
+        self.name = name
+        self.snapshot = None
+
+    def __enter__(self):
+        acc = self.accountant
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+            acc._started_tracing = True
+        self.parent = acc._current
+        acc._current = self
+        self.start_snapshot = tracemalloc.take_snapshot()
+        self.start_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        return self
+
+    def __exit__(self, *exc):
+        acc = self.accountant
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = self.snapshot or tracemalloc.take_snapshot()
+        acc.stages[self.name] = {'peak_mb': (peak - self.start_bytes) / MB,
+                                 'retained_mb': (current - self.start_bytes) / MB,
+                                 'rss_mb': current_rss() / MB,
+                                 'top': _top_allocations(snapshot, self.start_snapshot, acc.top)}
+        acc._current = self.parent
+        return False
+
+
+def _where(traceback):
+    """'saf_wrapper.py:312 [_basic.py:61]': first app frame, plus the allocating library line."""
+    frames = list(reversed(traceback))  # Most recent call first
+    inner = f"{os.path.basename(frames[0].filename)}:{frames[0].lineno}"
+    for frame in frames:
+        if os.path.dirname(os.path.abspath(frame.filename)) == _APP_DIR:
+            own = f"{os.path.basename(frame.filename)}:{frame.lineno}"
+            return own if frame is frames[0] else f"{own} [{inner}]"
+    return inner
+
+
+def _top_allocations(snapshot, start_snapshot, n):
+    """The `n` largest allocation sites that grew since `start_snapshot`."""
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    diff = snapshot.filter_traces(ignore).compare_to(start_snapshot.filter_traces(ignore), 'traceback')
+    sites = {}
+    for d in diff:
+        if d.size_diff > 0:
+            where = _where(d.traceback)
+            size, count = sites.get(where, (0, 0))
+            sites[where] = (size + d.size_diff, count + d.count_diff)
+    ranked = sorted(sites.items(), key=lambda kv: -kv[1][0])[:n]
+    return [{'where': where, 'mb': size / MB, 'count': count} for where, (size, count) in ranked]
+
+
+def _fft_len(block_size, taps):
+    return 2**int((block_size + taps - 2).bit_length())
+
+
+def estimate_render_bytes(n_sh, taps, block_size, n_dirs=0, ir_taps=None, fft_workers=1, keep_sofa=True):
+    """Working-set estimate of one render above the interpreter baseline, in bytes.
+
+    Counts the resident SOFA arrays (when kept), the modal filters and their spectra,
+    and the per-block buffers of the overlap-add loop: the read block, the padded FFT
+    input, block and mix spectra, the inverse FFT, the overlap tail and the scaled and
+    converted output block. Each extra FFT worker adds one row of FFT scratch.
+    """
+    fft_len = _fft_len(block_size, taps)
+    bins = fft_len // 2 + 1
+    sofa = n_dirs * (2 * (ir_taps or taps) + 3) * 4 if keep_sofa else 0
+    filters = n_sh * 2 * taps * 4 + n_sh * 2 * bins * 8
+    per_block = (block_size * n_sh * 4 * 2        # Read block + transposed/padded copy
+                 + n_sh * fft_len * 4             # FFT input
+                 + n_sh * bins * 8                # Block spectra
+                 + 2 * bins * 8 * 2               # Mixed spectra + inverse FFT scratch
+                 + fft_len * 2 * 4 * 2            # Inverse FFT output + overlap tail
+                 + block_size * 2 * 4 * 2)        # Scaled and converted output block
+    workers = max(0, fft_workers - 1) * fft_len * 16
+    return sofa + filters + per_block + workers
+
+
+def min_block_size(taps):
+    """Smallest block size a plan will go down to: FFT cost per sample rises steeply below it."""
+    return max(256, 1 << (max(taps, 1) - 1).bit_length())
+
+
+def plan_memory(limit_mb, n_sh, taps, block_size=4096, n_dirs=0, ir_taps=None, fft_workers=1):
+    """Picks render settings that fit `limit_mb`; returns a dict describing the plan.
+
+    Steps, cheapest first: free the raw SOFA IRs once filters are built (they are only
+    needed to prepare another order, which then reloads them), drop FFT worker threads,
+    then halve the block size down to min_block_size(). `fits` is False when even the
+    smallest configuration is over the limit; the plan is still the smallest one.
+    """
+    limit = limit_mb * MB
+    plan = {'block_size': block_size, 'fft_workers': max(1, fft_workers), 'keep_sofa': True}
+
+    def estimate():
+        return estimate_render_bytes(n_sh, taps, plan['block_size'], n_dirs, ir_taps, plan['fft_workers'],
+                                     plan['keep_sofa'])
+
+    if estimate() > limit:
+        plan['keep_sofa'] = False
+    while estimate() > limit and plan['fft_workers'] > 1:
+        plan['fft_workers'] -= 1
+    while estimate() > limit and plan['block_size'] // 2 >= min_block_size(taps):
+        plan['block_size'] //= 2
+    plan['estimate_mb'] = estimate() / MB
+    plan['fits'] = estimate() <= limit
+    return plan
+
+
+def jobs_within(limit_mb, per_job_mb, max_jobs):
+    """How many jobs of `per_job_mb` can run side by side under `limit_mb` (at least one)."""
+    if not limit_mb or per_job_mb <= 0:
+        return max_jobs
+    return max(1, min(max_jobs, int(limit_mb // per_job_mb)))
+
+
+def min_render_mb(n_sh, taps):
+    """Footprint of the smallest plan: minimum block size, one FFT worker, SOFA released."""
+    return estimate_render_bytes(n_sh, taps, min_block_size(taps), keep_sofa=False) / MB
+
+
+def split_budget(limit_mb, n_slots, cache_share=0.25):
+    """Divides a service-wide ceiling into (per-job MB, shared filter cache MB)."""
+    cache_mb = limit_mb * cache_share
+    return (limit_mb - cache_mb) / max(1, n_slots), cache_mb
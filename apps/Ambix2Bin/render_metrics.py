@@ -0,0 +1,146 @@
+import os
+import sys
+import time
+import numpy as np
+from multiprocessing import shared_memory
+
+# One fixed-size record per worker slot. `seq` is a seqlock: odd while the writer is
+# mid-update, so readers retry instead of seeing a torn record.
+METRICS_DTYPE = np.dtype([
+    ('seq', '<u8'),
+    ('job', '<i8'),           # Server job id, 0 when the slot is idle
+    ('state', '<u4'),         # IDLE / RUNNING
+    ('_pad', '<u4'),
+    ('progress', '<f8'),      # 0..1
+    ('blocks_per_s', '<f8'),
+    ('peak', '<f8'),          # Linear peak so far in the current pass
+    ('rss', '<u8'),           # Worker resident memory in bytes
+    ('updated', '<f8'),       # time.time() of the last update
+])
+IDLE, RUNNING = 0, 1
+
+RSS_INTERVAL_S = 0.25
+
+
+def _attach(name, creator_tracker=False):
+    """Opens an existing segment without letting this process's resource tracker own it.
+
+    Before Python 3.13 every attach registers the segment, and a tracker of our own
+    would unlink the creator's segment when this process exits, so the registration
+    is undone. With `creator_tracker` (the creator's own process, or its pool workers,
+    which report to the creator's tracker) the registration is a duplicate of the
+    creator's entry and is left alone: an unregister would remove that entry.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        pass
+    shm = shared_memory.SharedMemory(name=name)
+    if not creator_tracker:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+def current_rss():
+    """Resident set size of this process in bytes (peak RSS where /proc is missing)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+    except ImportError:
+        return 0
+
+
+class RenderMetrics:
+    """Shared-memory table of per-worker render metrics.
+
+    The render service creates it with one slot per worker; workers write their slot
+    on every block, and the GUI attaches by name and reads all slots on a timer.
+    Nothing is sent through the event loop or a pipe.
+    """
+
+    def __init__(self, n_slots=None, name=None, create=False, creator_tracker=False):
+        if create:
+            self.shm = shared_memory.SharedMemory(create=True, size=n_slots * METRICS_DTYPE.itemsize)
+        else:
+            self.shm = _attach(name, creator_tracker)
+        self.owner = create
+        self.name = self.shm.name
+        self.slots = np.ndarray((self.shm.size // METRICS_DTYPE.itemsize,), dtype=METRICS_DTYPE, buffer=self.shm.buf)
+        if create:
+            self.slots[:] = np.zeros(1, dtype=METRICS_DTYPE)
+
+    def __len__(self):
+        return len(self.slots)
+
+    def read(self, slot):
+        """Consistent copy of one slot (retries while a write is in progress)."""
+        rec = self.slots[slot]
+        for _ in range(100):
+            seq = int(rec['seq'])
+            if seq % 2 == 0:
+                snapshot = rec.copy()
+                if int(rec['seq']) == seq:
+                    return snapshot
+        return rec.copy()
+
+    def read_all(self):
+        return [self.read(i) for i in range(len(self.slots))]
+
+    def writer(self, slot, job_id):
+        return MetricsWriter(self.name, slot, job_id, metrics=self)
+
+    def close(self):
+        del self.slots  # Release the buffer export before closing
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class MetricsWriter:
+    """Worker side of one slot. Cheap enough to call once per block."""
+
+    def __init__(self, name, slot, job_id, metrics=None):
+        # Writers run in the creator's pool workers, which share its resource tracker
+        self._metrics = metrics or RenderMetrics(name=name, creator_tracker=True)
+        self._own = metrics is None
+        self._rec = self._metrics.slots[slot:slot + 1]  # View, so field writes land in shared memory
+        self.job_id = job_id
+        self._t0 = time.monotonic()
+        self._rss_time = 0.0
+        self._write(state=RUNNING, job=job_id, progress=0.0, blocks_per_s=0.0, peak=0.0, rss=current_rss())
+
+    def _write(self, **fields):
+        rec = self._rec
+        rec['seq'] += 1
+        for key, value in fields.items():
+            rec[key] = value
+        rec['updated'] = time.time()
+        rec['seq'] += 1
+
+    def update(self, progress=None, blocks=None, peak=None):
+        fields = {}
+        if progress is not None:
+            fields['progress'] = progress
+        if blocks is not None:
+            elapsed = time.monotonic() - self._t0
+            fields['blocks_per_s'] = blocks / elapsed if elapsed > 0 else 0.0
+        if peak is not None:
+            fields['peak'] = peak
+        now = time.monotonic()
+        if now - self._rss_time >= RSS_INTERVAL_S:
+            self._rss_time = now
+            fields['rss'] = current_rss()
+        self._write(**fields)
+
+    def close(self):
+        self._write(state=IDLE, job=0)
+        self._rec = None
+        if self._own:
+            self._metrics.close()
@@ -0,0 +1,266 @@
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import tempfile
+
+# Newline-delimited JSON protocol.
+#
+# Requests (client -> server), one object per line:
+#   {"op": "submit", "input": ..., "output": ..., "sofa": ..., "order": 3, "mode": "binaural",
+#    "gain_db": null, "gain_mode": "peak", "priority": 0, "ref": <anything>, "progress": true}
+#   {"op": "metrics"}   -> name of the shared-memory metrics table (render_metrics.RenderMetrics)
+#   {"op": "cancel", "job": <id>}  or  {"op": "cancel", "jobs": [<id>, ...]}
+#   {"op": "cancel", "all": true}   (every unfinished job this connection submitted)
+#   {"op": "status"}   (unfinished jobs)
+#   {"op": "ping"}
+#
+# Events (server -> client). Every job event carries "job" and the client's "ref":
+#   queued, started ("slot"), progress ("value" 0..1), done ("output"), error ("message"), cancelled
+# plus "status"/"pong"/"metrics" replies and "error" for malformed requests.
+# Clients that poll the metrics table submit with "progress": false to skip progress lines.
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), "ambix2bin-render.sock")
+DEFAULT_PORT = 47820
+USE_TCP = not hasattr(socket, "AF_UNIX")
+
+
+def _socket_in_use(path):
+    """True if a server accepts connections on the Unix socket at `path`."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        return True
+    except (ConnectionRefusedError, FileNotFoundError):
+        return False
+    finally:
+        sock.close()
+
+
+class RenderServer:
+    """Local render daemon: one AsyncRenderService shared by every connected client.
+
+    Workers keep their filter banks warm across jobs and clients, so a GUI session
+    only pays for load_sofa()/prepare() once per SOFA/order pair. With
+    `idle_timeout_s`, serve_forever() returns once no client has been connected and
+    no job has been unfinished for that long (the GUI starts it that way, so a closed
+    session does not leave the server running).
+    """
+
+    def __init__(self, socket_path=DEFAULT_SOCKET, port=None, workers=2, executor="thread", memory_limit_mb=None,
+                 idle_timeout_s=None):
+        # Imported here: clients (the GUI) import this module only for the protocol constants
+        from saf_async import AsyncRenderService
+        self.socket_path = socket_path
+        self.port = port
+        self.service = AsyncRenderService(max_concurrency=workers, executor=executor, metrics=True,
+                                          memory_limit_mb=memory_limit_mb)
+        self.idle_timeout_s = idle_timeout_s
+        self._server = None
+        self._owners = {}  # job id -> writer of the client that submitted it
+        self._clients = 0
+
+    async def start(self):
+        if self.port is not None or USE_TCP:
+            self._server = await asyncio.start_server(self._handle_client, "127.0.0.1", self.port or DEFAULT_PORT)
+            self.port = self._server.sockets[0].getsockname()[1]
+            print(f"[RenderServer] Listening on 127.0.0.1:{self.port}", flush=True)
+        else:
+            if os.path.exists(self.socket_path):
+                if _socket_in_use(self.socket_path):
+                    # Unlinking it would orphan that server and its running jobs
+                    await self.service.close()
+                    raise RuntimeError(f"A render server is already running on {self.socket_path}")
+                os.unlink(self.socket_path)  # Stale socket from a previous run
+            self._server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path)
+            print(f"[RenderServer] Listening on {self.socket_path}", flush=True)
+        return self
+
+    async def serve_forever(self):
+        async with self._server:
+            if self.idle_timeout_s:
+                await self._wait_idle()
+            else:
+                await self._server.serve_forever()
+
+    def is_idle(self):
+        return self._clients == 0 and all(job.done() for job in self.service.jobs.values())
+
+    async def _wait_idle(self):
+        """Returns after idle_timeout_s without clients or unfinished jobs."""
+        idle_since = time.monotonic()
+        while True:
+            await asyncio.sleep(min(1.0, self.idle_timeout_s / 4))
+            if not self.is_idle():
+                idle_since = time.monotonic()
+            elif time.monotonic() - idle_since >= self.idle_timeout_s:
+                print(f"[RenderServer] Idle for {self.idle_timeout_s:g} s, shutting down", flush=True)
+                return
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.service.close()
+        if self.port is None and not USE_TCP and os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    async def _handle_client(self, reader, writer):
+        self._clients += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    msg = json.loads(line)
+                    if not isinstance(msg, dict):
+                        raise TypeError(f"expected a JSON object, got {type(msg).__name__}")
+                    await self._dispatch(msg, writer)
+                except (ValueError, KeyError, TypeError) as e:
+                    self._send(writer, {"event": "error", "message": f"Bad request: {e}"})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            # Jobs outlive the client connection; their events are simply dropped
+            for job_id, owner in list(self._owners.items()):
+                if owner is writer:
+                    self._owners[job_id] = None
+            self._clients -= 1
+            writer.close()
+
+    @staticmethod
+    def _send(writer, event):
+        if writer is None or writer.is_closing():
+            return
+        writer.write((json.dumps(event) + "\n").encode("utf-8"))
+
+    async def _dispatch(self, msg, writer):
+        op = msg.get("op")
+        if op == "submit":
+            options = {}
+            if msg.get("order") is not None:
+                options["order"] = int(msg["order"])
+            if msg.get("mode"):
+                options["mode"] = msg["mode"]
+            if msg.get("gain_db") is not None:
+                options["gain_db"] = float(msg["gain_db"])
+            if msg.get("gain_mode"):
+                options["gain_mode"] = msg["gain_mode"]
+            if msg.get("block_size"):
+                options["block_size"] = int(msg["block_size"])
+            job = self.service.submit(msg["input"], msg["output"], msg.get("sofa"),
+                                      priority=int(msg.get("priority", 0)), **options)
+            self._owners[job.id] = writer
+            ref = msg.get("ref")
+            self._send(writer, {"event": "queued", "job": job.id, "ref": ref})
+            asyncio.get_running_loop().create_task(self._forward(job, ref, msg.get("progress", True)))
+        elif op == "cancel":
+            # Running jobs stop at their next block and free their worker; queued ones never start
+            if msg.get("all"):
+                ids = [job_id for job_id, owner in self._owners.items() if owner is writer]
+            else:
+                ids = msg["jobs"] if "jobs" in msg else [msg["job"]]
+            for job_id in ids:
+                job = self.service.jobs.get(int(job_id))
+                if job is not None and not job.done():
+                    job.cancel()
+        elif op == "status":
+            jobs = [{"job": j.id, "status": j.status, "progress": j.last_progress,
+                     "input": j.input_path, "output": j.output_path}
+                    for j in self.service.jobs.values()]
+            self._send(writer, {"event": "status", "jobs": jobs})
+        elif op == "metrics":
+            metrics = self.service.metrics
+            self._send(writer, {"event": "metrics", "name": metrics.name, "slots": len(metrics)})
+        elif op == "ping":
+            self._send(writer, {"event": "pong"})
+        else:
+            raise ValueError(f"unknown op {op!r}")
+        await writer.drain()
+
+    async def _forward(self, job, ref, send_progress=True):
+        """Streams one job's lifecycle to the client that submitted it."""
+        started = False
+        async for value in job.progress():
+            if not started:
+                started = True
+                self._send(self._owners.get(job.id), {"event": "started", "job": job.id, "ref": ref, "slot": job.slot})
+            if send_progress:
+                self._send(self._owners.get(job.id), {"event": "progress", "job": job.id, "ref": ref, "value": value})
+        try:
+            output = await job
+            event = {"event": "done", "job": job.id, "ref": ref, "output": output}
+        except asyncio.CancelledError:
+            event = {"event": "cancelled", "job": job.id, "ref": ref}
+        except Exception as e:
+            event = {"event": "error", "job": job.id, "ref": ref, "message": str(e)}
+        self._send(self._owners.pop(job.id, None), event)
+
+
+class RenderClient:
+    """Blocking client for scripts and tests."""
+
+    def __init__(self, socket_path=DEFAULT_SOCKET, port=None, timeout=None):
+        if port is not None or USE_TCP:
+            self.sock = socket.create_connection(("127.0.0.1", port or DEFAULT_PORT), timeout=timeout)
+        else:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            self.sock.connect(socket_path)
+        self._file = self.sock.makefile("rb")
+
+    def send(self, **msg):
+        self.sock.sendall((json.dumps(msg) + "\n").encode("utf-8"))
+
+    def submit(self, input_path, output_path, sofa_path, **fields):
+        self.send(op="submit", input=input_path, output=output_path, sofa=sofa_path, **fields)
+
+    def cancel(self, job_id=None):
+        """Cancels one job, or every job this client submitted when no id is given."""
+        if job_id is None:
+            self.send(op="cancel", all=True)
+        else:
+            self.send(op="cancel", job=job_id)
+
+    def events(self):
+        """Yields server events until the connection closes."""
+        for line in self._file:
+            yield json.loads(line)
+
+    def close(self):
+        self._file.close()
+        self.sock.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ambix2Bin local render server")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket path")
+    parser.add_argument("--port", type=int, help="Listen on 127.0.0.1:PORT instead of a Unix socket")
+    parser.add_argument("--workers", type=int, default=2, help="Concurrent render jobs")
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    parser.add_argument("--memory-limit-mb", type=float,
+                        help="Ceiling for all render jobs together (each worker plans within its share)")
+    parser.add_argument("--idle-timeout-s", type=float,
+                        help="Exit after this long without clients or unfinished jobs (default: run until killed)")
+    args = parser.parse_args()
+
+    async def main():
+        try:
+            server = await RenderServer(args.socket, args.port, args.workers, args.executor,
+                                        args.memory_limit_mb, args.idle_timeout_s).start()
+        except RuntimeError as e:
+            sys.exit(f"[RenderServer] {e}")  # Already running
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        sys.exit(0)
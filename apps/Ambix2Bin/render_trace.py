@@ -0,0 +1,149 @@
+import os
+import json
+import time
+import threading
+from contextlib import nullcontext
+
+_NULL_SPAN = nullcontext()
+
+
+class Tracer:
+    """Low-overhead timing spans for the render hot path, off by default.
+
+    `with tracer.span("rfft"):` times a stage. Disabled, span() returns a shared
+    no-op context, so instrumented code costs one call per span. Enabled, every span
+    lands in a per-name log2 histogram (summary()) and, up to `max_events`, in an
+    event list for write_chrome_trace() (chrome://tracing or ui.perfetto.dev).
+    """
+
+    def __init__(self, enabled=False, max_events=500000):
+        self.enabled = enabled
+        self.max_events = max_events
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}  # name -> [count, total_ns, max_ns, {bucket: count}]
+            self._events = []
+            self.dropped_events = 0
+            self._origin_ns = time.perf_counter_ns()
+
+    def span(self, name, **args):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def iter(self, name, iterable):
+        """Times each next() of `iterable` as a span (e.g. reading file blocks)."""
+        if not self.enabled:
+            return iterable
+        return self._timed_iter(name, iterable)
+
+    def _timed_iter(self, name, iterable):
+        it = iter(iterable)
+        while True:
+            start = time.perf_counter_ns()
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            self.add(name, start, time.perf_counter_ns() - start)
+            yield item
+
+    def add(self, name, start_ns, dur_ns, args=None):
+        with self._lock:
+            stat = self._stats.get(name)
+            if stat is None:
+                stat = self._stats[name] = [0, 0, 0, {}]
+            stat[0] += 1
+            stat[1] += dur_ns
+            stat[2] = max(stat[2], dur_ns)
+            bucket = (dur_ns // 1000).bit_length()  # [2^(b-1), 2^b) microseconds
+            stat[3][bucket] = stat[3].get(bucket, 0) + 1
+            if len(self._events) < self.max_events:
+                self._events.append((name, start_ns, dur_ns, threading.get_ident(), args))
+            else:
+                self.dropped_events += 1
+
+    def summary(self):
+        """{name: count, total/mean/max ms, p50/p95 ms (histogram upper edges), histogram}."""
+        with self._lock:
+            stats = {name: (s[0], s[1], s[2], dict(s[3])) for name, s in self._stats.items()}
+        out = {}
+        for name, (count, total, peak, buckets) in sorted(stats.items()):
+            hist = sorted(buckets.items())
+            out[name] = {
+                'count': count,
+                'total_ms': total / 1e6,
+                'mean_ms': total / count / 1e6,
+                'max_ms': peak / 1e6,
+                'p50_ms': min(_percentile(hist, count, 0.50), peak / 1e6),
+                'p95_ms': min(_percentile(hist, count, 0.95), peak / 1e6),
+                'histogram_us': [[_upper_us(b), n] for b, n in hist],  # [upper edge in us, count]
+            }
+        return out
+
+    def chrome_trace(self):
+        """Trace Event Format dict: one complete ("X") event per span, times in us."""
+        with self._lock:
+            events = list(self._events)
+            origin = self._origin_ns
+        pid = os.getpid()
+        trace = [{'name': name, 'ph': 'X', 'pid': pid, 'tid': tid, 'ts': (start - origin) / 1e3,
+                  'dur': dur / 1e3, **({'args': args} if args else {})}
+                 for name, start, dur, tid, args in events]
+        return {'traceEvents': trace, 'displayTimeUnit': 'ms',
+                'otherData': {'dropped_events': self.dropped_events}}
+
+    def write_chrome_trace(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+        return path
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'args', 'start')
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.add(self.name, self.start, time.perf_counter_ns() - self.start, self.args or None)
+        return False
+
+
+def _upper_us(bucket):
+    return 1 << bucket if bucket else 1
+
+
+def _percentile(hist, count, q):
+    target = q * count
+    seen = 0
+    for bucket, n in hist:
+        seen += n
+        if seen >= target:
+            return _upper_us(bucket) / 1e3
+    return _upper_us(hist[-1][0]) / 1e3 if hist else 0.0
+
+
+def format_summary(summary):
+    """One line per span name, largest total first: "block.rfft  72 x 0.41 ms = 29.4 ms (35%)".
+
+    Shares are of all traced time; spans do not nest, so they add up to 100%.
+    """
+    if not summary:
+        return ""
+    total_ms = sum(s['total_ms'] for s in summary.values())
+    lines = []
+    for name, s in sorted(summary.items(), key=lambda kv: -kv[1]['total_ms']):
+        share = f" ({s['total_ms'] / total_ms:.0%})" if total_ms else ""
+        lines.append(f"{name:20s} {s['count']:7d} x {s['mean_ms']:8.3f} ms = {s['total_ms']:9.1f} ms{share}"
+                     f"  p95 {s['p95_ms']:.3f} max {s['max_ms']:.3f}")
+    return "\n".join(lines)
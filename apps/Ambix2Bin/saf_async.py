@@ -0,0 +1,276 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from saf_wrapper import SAFRenderer, RenderCancelled, FilterBankCache, render_stereo
+from render_metrics import RenderMetrics, MetricsWriter
+from render_memory import split_budget, MB
+
+_thread_state = threading.local()
+# Loaded SOFA data and modal filters shared by every renderer in this process
+_filter_cache = FilterBankCache()
+
+
+def _run_render_job(input_path, output_path, sofa_path, options, progress, cancel_event, metrics_ref=None):
+    """Executor entry point (module level so process pools can pickle it).
+
+    `metrics_ref` is (RenderMetrics or its shared-memory name, slot, job id).
+    """
+    writer = None
+    if metrics_ref is not None:
+        table, slot, job_id = metrics_ref
+        writer = table.writer(slot, job_id) if isinstance(table, RenderMetrics) else MetricsWriter(table, slot, job_id)
+    try:
+        options = dict(options)
+        memory_limit_mb = options.pop('memory_limit_mb', None)
+        cache_limit_mb = options.pop('cache_limit_mb', None)
+        if cache_limit_mb is not None:
+            _filter_cache.max_bytes = int(cache_limit_mb * MB)
+        if options.pop('mode', 'binaural') == 'stereo':
+            # W +/- Y at half scale cannot clip, so there is no gain mode to apply
+            def on_progress(value):
+                if writer is not None:
+                    writer.update(value)
+                progress.put(value)
+            render_stereo(input_path, output_path, progress_callback=on_progress,
+                          cancel_event=cancel_event, gain_db=options.get('gain_db'))
+            return output_path
+
+        # Keep one warm renderer per worker thread/process so repeated SOFA/order pairs skip prepare()
+        renderer = getattr(_thread_state, 'renderer', None)
+        if renderer is None:
+            renderer = _thread_state.renderer = SAFRenderer(filter_cache=_filter_cache)
+        renderer.progress_callback = progress.put
+        renderer.cancel_event = cancel_event
+        renderer.metrics = writer
+        renderer.memory_limit_mb = memory_limit_mb
+        try:
+            renderer.load_sofa(sofa_path)
+            renderer.render(input_path, output_path, **options)
+        finally:
+            renderer.progress_callback = None
+            renderer.cancel_event = None
+            renderer.metrics = None
+        return output_path
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+class _LoopQueue:
+    """Thread-side `put` that hands progress values to a job on its event loop."""
+
+    def __init__(self, loop, job):
+        self.loop = loop
+        self.job = job
+
+    def put(self, value):
+        self.loop.call_soon_threadsafe(self.job._push, value)
+
+
+class RenderJob:
+    """Handle for a submitted render. Await it for the output path."""
+
+    def __init__(self, job_id, input_path, output_path, sofa_path, options, priority=0):
+        self.id = job_id
+        self.priority = priority
+        self.input_path = input_path
+        self.output_path = output_path
+        self.sofa_path = sofa_path
+        self.options = options
+        self.status = "queued"
+        self.slot = None  # Worker slot (metrics table row) while running
+        self.last_progress = 0.0
+        self._progress = asyncio.Queue()
+        self._cancel_event = None
+        self._cancel_requested = False  # Remembered until the cancel event exists
+        self._task = None
+
+    def __await__(self):
+        return self._task.__await__()
+
+    def done(self):
+        return self._task.done()
+
+    def _push(self, value):
+        if value is not None:
+            self.last_progress = value
+        self._progress.put_nowait(value)
+
+    def cancel(self):
+        """Cancels a queued job, or asks a running one to stop at the next block."""
+        self._cancel_requested = True
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+        if self.status == "queued":
+            self._task.cancel()
+
+    async def progress(self):
+        """Async iterator of progress fractions (0..1) until the job finishes."""
+        while True:
+            value = await self._progress.get()
+            if value is None:
+                return
+            yield value
+
+
+class AsyncRenderService:
+    """asyncio facade that runs SAFRenderer jobs on a thread or process pool.
+
+    All FFT work and soundfile I/O happen in the pool; the event loop only moves
+    progress values and results. At most `max_concurrency` jobs run at once; queued
+    jobs start in priority order (lower first), then in submission order.
+    With `memory_limit_mb`, a quarter of the ceiling bounds the shared filter cache
+    and every slot renders within an equal share of the rest, so the service as a
+    whole stays under the ceiling however many high-order jobs run at once.
+    """
+
+    def __init__(self, max_concurrency=2, executor="thread", metrics=False, memory_limit_mb=None):
+        self.max_concurrency = max_concurrency
+        self.memory_limit_mb = memory_limit_mb
+        self.job_memory_mb, self.cache_memory_mb = (split_budget(memory_limit_mb, max_concurrency)
+                                                    if memory_limit_mb else (None, None))
+        self.use_processes = executor == "process"
+        if self.use_processes:
+            self._pool = ProcessPoolExecutor(max_workers=max_concurrency)
+            self._manager = multiprocessing.Manager()
+            # Blocking reads of cross-process progress queues happen here, never on the loop
+            self._pump_pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="saf-progress")
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="saf-render")
+            self._manager = None
+            self._pump_pool = None
+        self._free_slots = list(range(max_concurrency))
+        self._waiters = []  # Heap of (priority, job id, future)
+        # Optional shared-memory table with one metrics row per slot (see render_metrics)
+        self.metrics = RenderMetrics(max_concurrency, create=True) if metrics else None
+        self._ids = itertools.count(1)
+        self.jobs = {}  # Unfinished jobs by id; each leaves once it is done, failed or cancelled
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def submit(self, input_path, output_path, sofa_path, priority=0, **options):
+        """Schedules a render and returns its RenderJob immediately.
+
+        `options` go to SAFRenderer.render(); `mode="stereo"` runs the stereo preview instead.
+        Under a service memory ceiling, `memory_limit_mb` defaults to the slot's share.
+        """
+        if self.memory_limit_mb:
+            options.setdefault('memory_limit_mb', self.job_memory_mb)
+            options.setdefault('cache_limit_mb', self.cache_memory_mb)
+        job = RenderJob(next(self._ids), input_path, output_path, sofa_path, options, priority)
+        job._task = asyncio.get_running_loop().create_task(self._run(job))
+        job._task.add_done_callback(lambda _: self._forget(job))
+        self.jobs[job.id] = job
+        return job
+
+    def _forget(self, job):
+        """Drops a finished job: a long-lived service (render_server) must not keep every job it ran."""
+        self.jobs.pop(job.id, None)
+        if job.status == "queued":
+            # Cancelled before _run() ever started: finish what it would have
+            job.status = "cancelled"
+            job._push(None)
+
+    async def _acquire(self, job):
+        """Waits for a free worker slot and returns its index."""
+        if self._free_slots and not self._waiters:
+            return self._free_slots.pop()
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (job.priority, job.id, fut))
+        try:
+            return await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self._release(fut.result())  # Slot was handed over just as we were cancelled
+            raise
+
+    def _release(self, slot):
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(slot)  # Hand the slot straight to the next job
+                return
+        self._free_slots.append(slot)
+
+    async def _run(self, job):
+        loop = asyncio.get_running_loop()
+        try:
+            job.slot = await self._acquire(job)
+            try:
+                job.status = "running"
+                if self.use_processes:
+                    # Manager proxies talk over IPC, so create them off the loop
+                    job._cancel_event = await loop.run_in_executor(None, self._manager.Event)
+                    progress = await loop.run_in_executor(None, self._manager.Queue)
+                    pump = loop.run_in_executor(self._pump_pool, self._pump, loop, job, progress)
+                else:
+                    job._cancel_event = threading.Event()
+                    progress = _LoopQueue(loop, job)
+                    pump = None
+                if job._cancel_requested:
+                    job._cancel_event.set()  # cancel() came while the event was being created
+                metrics_ref = None
+                if self.metrics is not None:
+                    table = self.metrics.name if self.use_processes else self.metrics
+                    metrics_ref = (table, job.slot, job.id)
+                future = loop.run_in_executor(self._pool, _run_render_job, job.input_path,
+                                              job.output_path, job.sofa_path, job.options,
+                                              progress, job._cancel_event, metrics_ref)
+                try:
+                    # shield: if our task is cancelled, the worker still needs to see the flag and exit
+                    result = await asyncio.shield(future)
+                except asyncio.CancelledError:
+                    job._cancel_event.set()
+                    await asyncio.wait([future])
+                    raise
+                finally:
+                    if pump is not None:
+                        await loop.run_in_executor(None, progress.put, None)
+                        await pump
+            finally:
+                self._release(job.slot)
+            job.status = "done"
+            return result
+        except (asyncio.CancelledError, RenderCancelled):
+            job.status = "cancelled"
+            raise asyncio.CancelledError()
+        except Exception:
+            job.status = "failed"
+            raise
+        finally:
+            job._push(None)
+
+    @staticmethod
+    def _pump(loop, job, queue):
+        """Forwards values from a manager queue to the job's asyncio.Queue."""
+        while True:
+            value = queue.get()
+            if value is None:
+                return
+            loop.call_soon_threadsafe(job._push, value)
+
+    async def close(self):
+        """Cancels outstanding jobs and shuts the pools down without blocking the loop."""
+        for job in self.jobs.values():
+            if not job.done():
+                job.cancel()
+        pending = [j._task for j in self.jobs.values() if not j.done()]
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._pool.shutdown)
+        if self._pump_pool is not None:
+            await loop.run_in_executor(None, self._pump_pool.shutdown)
+        if self._manager is not None:
+            await loop.run_in_executor(None, self._manager.shutdown)
+        if self.metrics is not None:
+            self.metrics.close()
+            self.metrics = None
@@ -0,0 +1,241 @@
+import sys
+import json
+import time
+import threading
+import numpy as np
+
+from saf_wrapper import SAFRenderer
+from sh_rotation import SHRotator
+
+# numpy.fft gained `out=` in NumPy 2.0; older versions allocate the FFT results instead
+try:
+    np.fft.rfft(np.zeros(2, dtype=np.float32), out=np.zeros(2, dtype=np.complex64))
+    FFT_OUT = True
+except TypeError:
+    FFT_OUT = False
+
+
+class StreamingBinauralRenderer:
+    """Block-callback binaural renderer for audio hosts and pipes.
+
+    Feed `process()` any number of (n_frames, n_sh) float32 frames and it returns the
+    same number of (n_frames, 2) frames, delayed by a fixed `latency` of one internal
+    block. All state and work buffers are allocated up front; on NumPy >= 2.0 the FFTs
+    write into preallocated arrays too, so the callback path does not allocate.
+    Filters and orientation may be swapped from another thread between callbacks.
+    """
+
+    def __init__(self, sh_hrtfs, block_size=512, max_frames=8192):
+        n_sh, _, hrir_len = sh_hrtfs.shape
+        self.n_sh = n_sh
+        self.order = int(np.sqrt(n_sh) - 1)
+        self.block_size = block_size
+        self.max_frames = max_frames
+        self.fft_len = 2**int(np.ceil(np.log2(block_size + hrir_len - 1)))
+        n_bins = self.fft_len // 2 + 1
+
+        self._lock = threading.Lock()
+        self._H = self._spectrum(sh_hrtfs)
+        self._pending_H = None
+
+        self._rotator = SHRotator(self.order, resolution_deg=0.1)
+        self._rotator_lock = threading.Lock()  # SHRotator's cache is shared by all tracker threads
+        self._identity = [np.eye(2 * l + 1, dtype=np.float32) for l in range(self.order + 1)]
+        self._rot = None          # Active per-degree blocks (None = no rotation)
+        self._target_rot = None
+        self._ramp = ((np.arange(block_size, dtype=np.float32) + 1.0) / block_size)
+
+        # Preallocated state
+        self._in_fifo = np.zeros((block_size, n_sh), dtype=np.float32)
+        self._out_fifo = np.zeros((block_size, 2), dtype=np.float32)
+        self._fill = 0
+        self._x = np.zeros((n_sh, block_size), dtype=np.float32)
+        self._x_rot = np.zeros((n_sh, block_size), dtype=np.float32)
+        self._work = np.zeros((n_sh, block_size), dtype=np.float32)
+        self._X = np.zeros((n_sh, n_bins), dtype=np.complex64)
+        self._Y = np.zeros((2, n_bins), dtype=np.complex64)
+        self._y = np.zeros((2, self.fft_len), dtype=np.float32)
+        self._acc = np.zeros((2, self.fft_len), dtype=np.float32)
+        self._acc_next = np.zeros((2, self.fft_len), dtype=np.float32)
+        self._out = np.zeros((max_frames, 2), dtype=np.float32)
+
+    @classmethod
+    def from_sofa(cls, sofa_path, order, block_size=512, max_frames=8192, renderer=None):
+        """Builds the modal filters for `order` with a SAFRenderer and wraps them."""
+        renderer = renderer or SAFRenderer()
+        renderer.load_sofa(sofa_path)
+        renderer.prepare(order)
+        return cls(renderer.sh_hrtfs, block_size=block_size, max_frames=max_frames)
+
+    @property
+    def latency(self):
+        """Fixed input-to-output delay in frames."""
+        return self.block_size
+
+    def _spectrum(self, sh_hrtfs):
+        if sh_hrtfs.shape[0] != getattr(self, 'n_sh', sh_hrtfs.shape[0]):
+            raise ValueError("Filter bank channel count does not match the stream.")
+        if sh_hrtfs.shape[2] > self.fft_len - self.block_size + 1:
+            raise ValueError("Filter bank is too long for the preallocated FFT size.")
+        return np.fft.rfft(sh_hrtfs.astype(np.float32), n=self.fft_len, axis=2).astype(np.complex64)
+
+    def set_filters(self, sh_hrtfs):
+        """Queues a new (n_sh, 2, taps) filter bank; it takes effect at the next block."""
+        H = self._spectrum(sh_hrtfs)  # Heavy work stays on the caller's thread
+        with self._lock:
+            self._pending_H = H
+
+    def set_orientation(self, yaw, pitch=0.0, roll=0.0):
+        """Queues a listener orientation (degrees); the next block crossfades to it.
+
+        Safe to call from several threads. The rotation matrices are built under the
+        rotator's own lock, so the audio callback never waits for them.
+        """
+        with self._rotator_lock:
+            blocks = self._rotator.blocks(yaw, pitch, roll)
+        with self._lock:
+            self._target_rot = blocks
+
+    def reset(self):
+        """Clears the stream history (FIFOs, overlap-add tail and orientation).
+
+        The next set_orientation() fades in from the unrotated scene, as on a new stream.
+        """
+        with self._lock:
+            self._in_fifo.fill(0.0)
+            self._out_fifo.fill(0.0)
+            self._acc.fill(0.0)
+            self._fill = 0
+            self._rot = None
+            self._target_rot = None
+
+    def process(self, x, out=None):
+        """Audio callback: (n_frames, n_sh) float32 in, (n_frames, 2) float32 out.
+
+        Without `out`, the result is a view of an internal buffer that the next call
+        overwrites (the callback path does not allocate); copy it to keep it.
+        """
+        n = x.shape[0]
+        if out is None:
+            if n > self.max_frames:
+                raise ValueError(f"Callback of {n} frames exceeds max_frames={self.max_frames}.")
+            out = self._out[:n]
+        B = self.block_size
+        i = 0
+        while i < n:
+            take = min(n - i, B - self._fill)
+            f0 = self._fill
+            self._in_fifo[f0:f0 + take] = x[i:i + take]
+            out[i:i + take] = self._out_fifo[f0:f0 + take]
+            self._fill += take
+            i += take
+            if self._fill == B:
+                self._process_block()
+                self._fill = 0
+        return out
+
+    def _process_block(self):
+        with self._lock:
+            if self._pending_H is not None:
+                self._H, self._pending_H = self._pending_H, None
+            target = self._target_rot
+
+        np.copyto(self._x, self._in_fifo.T)
+        x = self._x
+        if target is not None or self._rot is not None:
+            # The first orientation fades in from the unrotated scene instead of snapping to it
+            current = self._rot if self._rot is not None else self._identity
+            if target is current:
+                SHRotator.apply(x, current, out=self._x_rot)
+            else:
+                SHRotator.apply(x, current, target, self._ramp, out=self._x_rot, work=self._work)
+            self._rot = target
+            x = self._x_rot
+
+        if FFT_OUT:
+            np.fft.rfft(x, n=self.fft_len, axis=1, out=self._X)
+        else:
+            self._X[:] = np.fft.rfft(x, n=self.fft_len, axis=1)
+        np.einsum('sk, srk -> rk', self._X, self._H, out=self._Y)
+        if FFT_OUT:
+            np.fft.irfft(self._Y, n=self.fft_len, axis=1, out=self._y)
+        else:
+            self._y[:] = np.fft.irfft(self._Y, n=self.fft_len, axis=1)
+
+        B = self.block_size
+        self._acc += self._y
+        self._out_fifo[:] = self._acc[:, :B].T
+        self._acc_next[:, :self.fft_len - B] = self._acc[:, B:]
+        self._acc_next[:, self.fft_len - B:] = 0.0
+        self._acc, self._acc_next = self._acc_next, self._acc
+
+
+def run_offline_harness(stream, x, host_block=256, fs=48000):
+    """Drives `stream` with host-sized callbacks over a whole (n, n_sh) signal.
+
+    Returns the latency-compensated (n, 2) output and callback timing stats, so the
+    result can be compared sample-for-sample with SAFRenderer.render().
+    """
+    n = x.shape[0]
+    lat = stream.latency
+    padded = np.zeros((n + lat, x.shape[1]), dtype=np.float32)
+    padded[:n] = x
+    y = np.zeros((n + lat, 2), dtype=np.float32)
+
+    times = []
+    for start in range(0, n + lat, host_block):
+        chunk = padded[start:start + host_block]
+        t0 = time.perf_counter()
+        res = stream.process(chunk)
+        times.append(time.perf_counter() - t0)
+        y[start:start + chunk.shape[0]] = res
+
+    times = np.array(times)
+    budget = host_block / fs
+    stats = {
+        'latency_frames': lat,
+        'host_block': host_block,
+        'callbacks': int(times.size),
+        'worst_ms': float(times.max() * 1e3),
+        'mean_ms': float(times.mean() * 1e3),
+        'budget_ms': float(budget * 1e3),
+        'worst_load': float(times.max() / budget),
+    }
+    return y[lat:], stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Streaming binaural renderer (raw float32 pipe)")
+    parser.add_argument("--sofa", required=True, help="SOFA Head Model file")
+    parser.add_argument("--order", type=int, required=True, help="Ambisonic order of the stream")
+    parser.add_argument("--block-size", type=int, default=512, help="Internal block (= latency) in frames")
+    parser.add_argument("--host-block", type=int, default=256, help="Frames read per callback")
+    parser.add_argument("--harness", help="Render this WAV offline and report callback timing as JSON")
+    args = parser.parse_args()
+
+    from contextlib import redirect_stdout
+    with redirect_stdout(sys.stderr):  # Keep stdout clean for audio
+        stream = StreamingBinauralRenderer.from_sofa(args.sofa, args.order, block_size=args.block_size)
+
+    if args.harness:
+        import soundfile as sf
+        data, fs = sf.read(args.harness, dtype='float32', always_2d=True)
+        data = np.ascontiguousarray(np.pad(data, ((0, 0), (0, max(0, stream.n_sh - data.shape[1]))))[:, :stream.n_sh])
+        _, stats = run_offline_harness(stream, data, host_block=args.host_block, fs=fs)
+        print(json.dumps(stats, indent=2))
+    else:
+        # Interleaved float32 frames on stdin -> interleaved stereo float32 on stdout
+        print(f"[Stream] Latency: {stream.latency} frames", file=sys.stderr)
+        frame_bytes = 4 * stream.n_sh
+        stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+        out = np.zeros((args.host_block, 2), dtype=np.float32)
+        while True:
+            raw = stdin.read(frame_bytes * args.host_block)
+            if not raw:
+                break
+            n = len(raw) // frame_bytes
+            chunk = np.frombuffer(raw[:n * frame_bytes], dtype=np.float32).reshape(n, stream.n_sh)
+            stdout.write(stream.process(chunk, out=out[:n]).tobytes())
+        stdout.flush()
@@ -1,14 +1,83 @@
 import os
 import sys
+import json
+import time
+import struct
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import ExitStack
 import numpy as np
 import soundfile as sf
 import netCDF4
 from scipy.fft import rfft, irfft
 from scipy.special import sph_harm
 from scipy.ndimage import shift as nd_shift
+from sh_rotation import HeadTracker, HeadTrajectory, SHRotator
+from limiter import TruePeakLimiter
+import render_log
+from render_log import get_logger, fields
+from render_trace import Tracer, format_summary
+from render_memory import MemoryAccountant, plan_memory, MB
+from audio_probe import read_wav_header
+from sofa_io import NETCDF_LOCK as _NETCDF_LOCK
+
+log = get_logger("SAFRenderer")
+
+# Worker exit code after a cooperative cancel (partial outputs already removed)
+CANCELLED_EXIT_CODE = 3
+
+
+class RenderCancelled(Exception):
+    """Raised between blocks when a render's cancel_event is set."""
+
+
+class FilterBankCache:
+    """Thread-safe LRU of loaded SOFA data and prepared modal filters.
+
+    Renderers sharing one cache skip load_sofa()/prepare() for SOFA/order pairs that
+    another worker already built. Cached arrays are read-only.
+    """
+
+    def __init__(self, max_entries=16, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes  # Optional residency budget; least recently used go first
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def sofa_key(sofa_path):
+        try:
+            return (os.path.abspath(sofa_path), os.path.getmtime(sofa_path))
+        except OSError:
+            return (os.path.abspath(sofa_path), None)
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries or (
+                    self.max_bytes is not None and len(self._entries) > 1 and self.nbytes() > self.max_bytes):
+                self._entries.popitem(last=False)
+
+    def nbytes(self):
+        """Bytes held by cached arrays (entries are arrays or dicts of arrays)."""
+        total = 0
+        for value in self._entries.values():
+            for arr in (value.values() if isinstance(value, dict) else (value,)):
+                total += getattr(arr, 'nbytes', 0)
+        return total
+
 
 class SAFRenderer:
-    def __init__(self):
+    def __init__(self, filter_cache=None):
         self.sh_hrtfs = None  # Prepared filters: (n_sh, 2, n_samples)
         self.sofa_data = {
             'ir': None,
@@ -18,31 +87,56 @@ class SAFRenderer:
         }
         self.current_order = -1
         self.current_sofa_path = None
+        self.progress_callback = None  # Optional callable(fraction); replaces PROGRESS: lines
+        self.cancel_event = None  # Optional threading/multiprocessing Event checked per block
+        self.filter_cache = filter_cache  # Optional FilterBankCache shared between renderers
+        self.metrics = None  # Optional render_metrics.MetricsWriter updated every block
+        self.tracer = Tracer()  # Per-stage timing spans; off until tracer.enabled = True
+        self.memory = MemoryAccountant()  # Per-stage heap accounting; off until memory.enabled = True
+        self.memory_limit_mb = None  # Optional ceiling for one render: see render_memory.plan_memory()
+        self.fft_workers = 1  # scipy.fft threads per render (lowered by the memory plan if needed)
+        self.memory_plan = None  # Plan chosen by the last render() under memory_limit_mb
 
     def load_sofa(self, sofa_path):
         """Loads a SOFA file and extracts Impulse Responses and metadata."""
         if self.current_sofa_path == sofa_path:
             return
 
-        print(f"[SAFRenderer] Loading SOFA: {sofa_path}")
+        if self.filter_cache is not None:
+            cached = self.filter_cache.get(('sofa',) + FilterBankCache.sofa_key(sofa_path))
+            if cached is not None:
+                self.sofa_data = dict(cached)
+                self.current_sofa_path = sofa_path
+                self.current_order = -1
+                return
+
+        log.info(f"Loading SOFA: {sofa_path}", extra=fields(event="load_sofa", sofa=sofa_path))
         try:
-            ds = netCDF4.Dataset(sofa_path, 'r')
-            self.sofa_data['ir'] = np.array(ds.variables['Data.IR'][:], dtype=np.float32)
-            self.sofa_data['pos'] = np.array(ds.variables['SourcePosition'][:], dtype=np.float32)
-            
-            sr = ds.variables['Data.SamplingRate'][:]
-            self.sofa_data['fs'] = float(sr.flat[0]) if isinstance(sr, np.ndarray) else float(sr)
-
-            if 'Data.Delay' in ds.variables:
-                d = np.array(ds.variables['Data.Delay'][:], dtype=np.float32)
-                self.sofa_data['delay'] = d if np.max(np.abs(d)) > 1e-9 else None
-            
-            ds.close()
+            with _NETCDF_LOCK, self.tracer.span("load_sofa.read"), self.memory.stage("load_sofa"):
+                ds = netCDF4.Dataset(sofa_path, 'r')
+                ir_var = ds.variables['Data.IR']
+                ir_var.set_auto_mask(False)  # Plain ndarray: no masked-array copy of the largest variable
+                self.sofa_data['ir'] = np.asarray(ir_var[:], dtype=np.float32)
+                self.sofa_data['pos'] = np.array(ds.variables['SourcePosition'][:], dtype=np.float32)
+                
+                sr = ds.variables['Data.SamplingRate'][:]
+                self.sofa_data['fs'] = float(sr.flat[0]) if isinstance(sr, np.ndarray) else float(sr)
+
+                if 'Data.Delay' in ds.variables:
+                    d = np.array(ds.variables['Data.Delay'][:], dtype=np.float32)
+                    self.sofa_data['delay'] = d if np.max(np.abs(d)) > 1e-9 else None
+                
+                ds.close()
             self.current_sofa_path = sofa_path
             self.current_order = -1 
-            print(f"[SAFRenderer] SOFA Loaded. FS: {self.sofa_data['fs']} Hz")
+            if self.filter_cache is not None:
+                for arr in (self.sofa_data['ir'], self.sofa_data['pos'], self.sofa_data['delay']):
+                    if arr is not None: arr.flags.writeable = False
+                self.filter_cache.put(('sofa',) + FilterBankCache.sofa_key(sofa_path), dict(self.sofa_data))
+            log.info(f"SOFA Loaded. FS: {self.sofa_data['fs']} Hz",
+                     extra=fields(event="sofa_loaded", fs=self.sofa_data['fs'], shape=self.sofa_data['ir'].shape))
         except Exception as e:
-            print(f"[SAFRenderer] Critical Error loading SOFA: {e}")
+            log.error(f"Critical Error loading SOFA: {e}", extra=fields(event="load_sofa_failed", sofa=sofa_path))
             raise
 
     def _compute_sn3d_sh(self, order, azi_rad, ele_rad):
@@ -87,122 +181,762 @@ class SAFRenderer:
         if self.current_order == order:
             return
 
-        print(f"[SAFRenderer] Preparing {order}th-Order Modal Filters...")
+        cache_key = None
+        if self.filter_cache is not None:
+            cache_key = ('filters',) + FilterBankCache.sofa_key(self.current_sofa_path) + (order,)
+            cached = self.filter_cache.get(cache_key)
+            if cached is not None:
+                self.sh_hrtfs = cached
+                self.current_order = order
+                return
+
+        if self.sofa_data['ir'] is None and self.current_sofa_path:
+            # IRs were released under a memory ceiling; another order needs them again
+            path, self.current_sofa_path = self.current_sofa_path, None
+            self.load_sofa(path)
+
+        log.info(f"Preparing {order}th-Order Modal Filters...", extra=fields(event="prepare", order=order))
+        span = self.tracer.span
         hrirs = self.sofa_data['ir']
         sofa_pos = self.sofa_data['pos']
         fs = self.sofa_data['fs']
 
-        # 1. Coordinate Normalization
-        azi = np.deg2rad(sofa_pos[:, 0]) if np.max(np.abs(sofa_pos[:, 0])) > 2*np.pi else sofa_pos[:, 0]
-        ele = np.deg2rad(sofa_pos[:, 1]) if np.max(np.abs(sofa_pos[:, 1])) > 2*np.pi else sofa_pos[:, 1]
-        
-        # 2. Virtual Speaker Grid (Fibonacci Sphere)
-        n_sh = (order + 1)**2
-        n_virt = n_sh * 2 + 8 
-        indices = np.arange(0, n_virt, dtype=float) + 0.5
-        phi_v = np.arccos(1 - 2*indices/n_virt)
-        theta_v = (np.pi * (1 + 5**0.5) * indices % (2*np.pi)) - np.pi
-        
-        # 3. Virtual Speaker Mapping (Nearest Neighbor from SOFA)
-        sofa_cart = np.vstack([np.cos(ele)*np.cos(azi), np.cos(ele)*np.sin(azi), np.sin(ele)]).T
-        virt_cart = np.vstack([np.sin(phi_v)*np.cos(theta_v), np.sin(phi_v)*np.sin(theta_v), np.cos(phi_v)]).T
-        
-        hrir_len = hrirs.shape[2]
-        virt_hrirs = np.zeros((n_virt, 2, hrir_len), dtype=np.float32)
-        
-        for v in range(n_virt):
-            idx_nearest = np.argmax(sofa_cart @ virt_cart[v])
-            virt_hrirs[v] = hrirs[idx_nearest]
-
-        # 4. Least-Squares Modal Projection
-        v_ele = np.pi/2 - phi_v
-        Y_virt = self._compute_sn3d_sh(order, theta_v, v_ele)
-        D_dec = np.linalg.pinv(Y_virt.T) # (N_virt, N_sh)
-        
-        # Final SH-Domain Filters
-        self.sh_hrtfs = np.einsum('vs, vrl -> srl', D_dec, virt_hrirs)
-        
-        # Apply Max-rE weights
-        weights = self._get_max_re_weights(order)
-        for s in range(n_sh):
-            self.sh_hrtfs[s] *= weights[s]
+        with span("prepare.grid"):
+            # 1. Coordinate Normalization
+            azi = np.deg2rad(sofa_pos[:, 0]) if np.max(np.abs(sofa_pos[:, 0])) > 2*np.pi else sofa_pos[:, 0]
+            ele = np.deg2rad(sofa_pos[:, 1]) if np.max(np.abs(sofa_pos[:, 1])) > 2*np.pi else sofa_pos[:, 1]
+
+            # 2. Virtual Speaker Grid (Fibonacci Sphere)
+            n_sh = (order + 1)**2
+            n_virt = n_sh * 2 + 8
+            indices = np.arange(0, n_virt, dtype=float) + 0.5
+            phi_v = np.arccos(1 - 2*indices/n_virt)
+            theta_v = (np.pi * (1 + 5**0.5) * indices % (2*np.pi)) - np.pi
+
+        with span("prepare.nn_map"):
+            # 3. Virtual Speaker Mapping (Nearest Neighbor from SOFA)
+            sofa_cart = np.vstack([np.cos(ele)*np.cos(azi), np.cos(ele)*np.sin(azi), np.sin(ele)]).T
+            virt_cart = np.vstack([np.sin(phi_v)*np.cos(theta_v), np.sin(phi_v)*np.sin(theta_v), np.cos(phi_v)]).T
+
+            hrir_len = hrirs.shape[2]
+            virt_hrirs = np.zeros((n_virt, 2, hrir_len), dtype=np.float32)
+
+            for v in range(n_virt):
+                idx_nearest = np.argmax(sofa_cart @ virt_cart[v])
+                virt_hrirs[v] = hrirs[idx_nearest]
+
+        with span("prepare.pinv"):
+            # 4. Least-Squares Modal Projection
+            v_ele = np.pi/2 - phi_v
+            Y_virt = self._compute_sn3d_sh(order, theta_v, v_ele)
+            D_dec = np.linalg.pinv(Y_virt.T) # (N_virt, N_sh)
+
+        with span("prepare.einsum"):
+            # Final SH-Domain Filters
+            self.sh_hrtfs = np.einsum('vs, vrl -> srl', D_dec, virt_hrirs)
+
+            # Apply Max-rE weights
+            weights = self._get_max_re_weights(order)
+            for s in range(n_sh):
+                self.sh_hrtfs[s] *= weights[s]
 
         self.current_order = order
+        if cache_key is not None:
+            self.sh_hrtfs.flags.writeable = False
+            self.filter_cache.put(cache_key, self.sh_hrtfs)
+
+    def _report_progress(self, fraction):
+        if self.progress_callback is not None:
+            self.progress_callback(fraction)
+        else:
+            print(f"PROGRESS:{fraction:.2f}")
+            sys.stdout.flush()
+
+    def _emit_progress(self, current_batch, total_batches, peak=None):
+        """Reports progress whenever the integer percentage advances (metrics: every block)."""
+        if self.metrics is not None:
+            self.metrics.update(current_batch / total_batches, current_batch, peak)
+        prog = int(current_batch / total_batches * 100)
+        if prog > self._last_progress_int:
+            self._report_progress(prog / 100)
+            self._last_progress_int = prog
+
+    def _check_cancel(self):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise RenderCancelled()
+
+    def _prepare_convolution(self, order, block_size):
+        """Prepares filters for `order`; returns (n_sh, fft_len, H_sh_freq)."""
+        with self.memory.stage("prepare"):
+            self.prepare(order)
+            n_sh = (order + 1)**2
+            hrir_len = self.sh_hrtfs.shape[2]
+            fft_len = 2**int(np.ceil(np.log2(block_size + hrir_len - 1)))
+            with self.tracer.span("prepare.filter_fft"):
+                H_sh_freq = rfft(self.sh_hrtfs, n=fft_len, axis=2)
+        return n_sh, fft_len, H_sh_freq
+
+    def _apply_memory_plan(self, order, block_size):
+        """Fits this render under memory_limit_mb; returns the block size to use."""
+        ir = self.sofa_data['ir']
+        n_dirs, ir_taps = (ir.shape[0], ir.shape[2]) if ir is not None else (0, None)
+        taps = self.sh_hrtfs.shape[2] if self.sh_hrtfs is not None else ir_taps
+        plan = plan_memory(self.memory_limit_mb, (order + 1)**2, taps, block_size, n_dirs, ir_taps, self.fft_workers)
+        self.memory_plan = plan
+        message = (f"Memory plan: block {plan['block_size']}, {plan['fft_workers']} FFT worker(s), SOFA IRs "
+                   f"{'kept' if plan['keep_sofa'] else 'released after prepare'} "
+                   f"(~{plan['estimate_mb']:.1f} of {self.memory_limit_mb:g} MB)")
+        if plan['fits']:
+            log.info(message, extra=fields(event="memory_plan", limit_mb=self.memory_limit_mb, **plan))
+        else:
+            log.warning(message + " - over the limit even at the smallest block size",
+                        extra=fields(event="memory_plan", limit_mb=self.memory_limit_mb, **plan))
+        return plan['block_size']
+
+    def _release_sofa_irs(self):
+        """Drops the raw IRs (filters are built); prepare() reloads them when needed."""
+        if self.sofa_data['ir'] is not None:
+            self.sofa_data = dict(self.sofa_data, ir=None)
+
+    def no_clip_bound(self, channel_peaks, order, rotating=False):
+        """Upper bound on each ear's output peak, from the filters and input channel peaks.
+
+        Each ear is a sum of SH channels convolved with FIR filters, so |y| can never
+        exceed sum_s peak_s * ||h_s||_1. A rotation only mixes channels of the same
+        degree and keeps their vector norm, so with `rotating` the bound uses, per degree
+        l, sqrt(sum of that degree's squared peaks) times sum_k ||h_l[k]||_2 (Cauchy-Schwarz
+        per tap). Without rotation the smaller of both bounds is returned. `channel_peaks`
+        is per file channel, or a scalar for "every channel at most this". Returns (2,).
+        """
+        self.prepare(order)
+        h = np.asarray(self.sh_hrtfs, dtype=np.float64)  # (n_sh, 2, taps)
+        n_sh = h.shape[0]
+        peaks = np.abs(np.asarray(channel_peaks, dtype=np.float64))
+        if peaks.ndim == 0:
+            peaks = np.full(n_sh, float(peaks))
+        peaks = np.pad(peaks, (0, max(0, n_sh - peaks.size)))[:n_sh]  # Same truncation/padding as the render
+
+        per_degree = np.zeros(2)
+        for l in range(order + 1):
+            deg = slice(l * l, (l + 1)**2)
+            per_degree += np.sqrt(np.sum(peaks[deg]**2)) * np.sum(np.sqrt(np.sum(h[deg]**2, axis=0)), axis=-1)
+        if rotating:
+            return per_degree
+        return np.minimum(per_degree, peaks @ np.sum(np.abs(h), axis=2))
+
+    def _convolve_blocks(self, blocks, n_sh, H_sh_freq, fft_len, head_tracker=None, state=None, workers=None):
+        """Overlap-add convolution of SH blocks with the modal filters.
+
+        Yields one (n_frames, 2) binaural block per input block. `state` is an optional
+        dict holding the overlap-add tail ('ola') and input position ('pos'); it is read
+        to resume a stream and updated after every block, so it can be checkpointed.
+        The overlap tail is one buffer updated in place; yielded blocks are fresh arrays
+        the caller may scale in place. `workers` defaults to self.fft_workers.
+        """
+        if state is None:
+            state = {}
+        workers = workers or self.fft_workers
+        ola_buf = state.get('ola')
+        if ola_buf is None:
+            ola_buf = np.zeros((fft_len, 2), dtype=np.float32)
+        else:
+            ola_buf = np.array(ola_buf, dtype=np.float32)  # Own copy: updated in place below
+        pos = state.get('pos', 0)
+        span = self.tracer.span
+        for block in self.tracer.iter("block.read", blocks):
+            self._check_cancel()
+            n_blk = block.shape[0]
+            if block.shape[1] != n_sh: block = np.pad(block, ((0,0),(0, n_sh-block.shape[1])))[:,:n_sh]
+            block_t = block.T
+            if head_tracker is not None:
+                with span("block.rotate"):
+                    block_t = head_tracker.process(np.ascontiguousarray(block_t), pos)
+            pos += n_blk
+
+            with span("block.rfft"):
+                block_f = rfft(block_t, n=fft_len, axis=1, workers=workers)
+            with span("block.mix"):
+                out_f = np.einsum('sk, srk -> rk', block_f, H_sh_freq)
+                block_f = None  # Largest per-block array: free it before the next block's FFT
+            with span("block.irfft"):
+                out_t = irfft(out_f, n=fft_len, axis=1, workers=workers).T
+            self.memory.sample()  # Per-block buffers are all alive here
+            with span("block.ola"):
+                out_t += ola_buf
+                ola_buf[:fft_len - n_blk, :] = out_t[n_blk:, :]
+                ola_buf[fft_len - n_blk:, :] = 0.0
+            state['ola'] = ola_buf
+            state['pos'] = pos
+
+            yield out_t[:n_blk, :]
+
+    def render(self, input_path, output_path, block_size=4096, trajectory=None, order=None, gain_db=None,
+               checkpoint_path=None, checkpoint_interval=30.0, gain_mode="peak", input_peaks=None, ceiling_db=-1.0):
+        """Two-Pass Transparent Render.
+
+        `trajectory` is an optional HeadTrajectory (or path to a CSV/JSON file) giving
+        the listener orientation over time; the scene is counter-rotated per block.
+        `order` decodes at a lower (or padded higher) order than the file carries.
+        A fixed `gain_db` replaces peak normalization, so only one pass is needed.
+        gain_mode="bound" also renders in one pass, with a gain from no_clip_bound()
+        that guarantees no clipping (usually a few dB quieter than measured peaks).
+        Its channel peaks come from `input_peaks` if given (a scalar 1.0 means "at or
+        below full scale"), else from the file's PEAK chunk, else from a max-abs scan of
+        the input without convolution.
+        gain_mode="limit" renders in one pass at unchanged loudness (or at `gain_db`)
+        through a look-ahead TruePeakLimiter with a `ceiling_db` true-peak ceiling;
+        its latency is compensated, so the output stays sample-aligned.
+        With `checkpoint_path`, the pass, block index, overlap-add tail, peak and
+        frames written are saved there every `checkpoint_interval` seconds and on
+        cancellation. Calling render() again with the same arguments resumes from the
+        checkpoint and produces bit-identical output.
+        With self.memory_limit_mb set, block size, FFT workers and SOFA residency are
+        chosen by render_memory.plan_memory() to fit that ceiling (self.memory_plan).
+        Returns a dict with the sample rate, length, order, output peak, gain applied and
+        wall time; with self.tracer enabled it also holds the per-stage 'timings' summary,
+        with self.memory enabled the per-stage 'memory' report. The same dict is logged
+        as a structured "render_stats" record.
+        """
+        t_start = time.perf_counter()
+        with sf.SoundFile(input_path) as f:
+            fs = f.samplerate
+            n_ch = f.channels
+            n_samples = len(f)
+            if order is None:
+                order = int(np.sqrt(n_ch) - 1)
+
+        workers = self.fft_workers
+        if self.memory_limit_mb:
+            block_size = self._apply_memory_plan(order, block_size)
+            workers = self.memory_plan['fft_workers']
+        n_sh, fft_len, H_sh_freq = self._prepare_convolution(order, block_size)
+        if self.memory_plan is not None and self.memory_limit_mb and not self.memory_plan['keep_sofa']:
+            self._release_sofa_irs()
+
+        if isinstance(trajectory, str):
+            trajectory = HeadTrajectory.load(trajectory)
+
+        if gain_mode not in ("peak", "bound", "limit"):
+            raise ValueError(f"Unknown gain mode '{gain_mode}' (use 'peak', 'bound' or 'limit').")
+        limiter = TruePeakLimiter(fs, ceiling_db=ceiling_db) if gain_mode == "limit" else None
+        if gain_db is not None or limiter is not None:
+            gain_mode = "fixed"
+
+        ckpt = None
+        fingerprint = None
+        if checkpoint_path:
+            fingerprint = _render_fingerprint(input_path, self.current_sofa_path, order, block_size, gain_db, trajectory,
+                                              gain_mode, input_peaks, ceiling_db if limiter is not None else None)
+            ckpt = _load_checkpoint(checkpoint_path, fingerprint)
+            if ckpt is not None:
+                log.info(f"Resuming pass {ckpt['pass']} at block {ckpt['block']}.",
+                         extra=fields(event="resume", pass_no=ckpt['pass'], block=ckpt['block']))
+        last_save = time.monotonic()
+
+        def save(pass_no, block, conv, **extra):
+            nonlocal last_save
+            _save_checkpoint(checkpoint_path, fingerprint, {'pass': pass_no, 'block': block, 'ola': conv.get('ola'),
+                                                            'global_peak': global_peak, **extra})
+            last_save = time.monotonic()
+
+        def due():
+            return checkpoint_path and time.monotonic() - last_save >= checkpoint_interval
+
+        n_passes = 2 if gain_mode == "peak" else 1
+        self._last_progress_int = 0
+        n_batches = n_samples // block_size + 1
+        total_batches = n_passes * n_batches
+        current_batch = 0
+
+        global_peak = 0.0
+        if ckpt is not None:
+            global_peak = ckpt['global_peak']
+        if gain_mode == "peak" and (ckpt is None or ckpt['pass'] == 1):
+            # PASS 1: Peak Detection
+            log.info("Pass 1: Analyzing peaks...", extra=fields(event="pass", pass_no=1))
+            done = ckpt['block'] if ckpt is not None else 0
+            conv = {'ola': ckpt['ola'], 'pos': done * block_size} if ckpt is not None else {}
+            current_batch = done
+            with sf.SoundFile(input_path) as f_in, self.memory.stage("pass1"):
+                f_in.seek(done * block_size)
+                tracker = HeadTracker(trajectory, order, fs) if trajectory is not None else None
+                blocks = f_in.blocks(blocksize=block_size, dtype='float32')
+                try:
+                    for out_blk in self._convolve_blocks(blocks, n_sh, H_sh_freq, fft_len, tracker, conv, workers):
+                        done += 1
+                        current_batch += 1
+                        global_peak = max(global_peak, np.max(np.abs(out_blk)))
+                        self._emit_progress(current_batch, total_batches, global_peak)
+                        if due():
+                            save(1, done, conv)
+                except (RenderCancelled, KeyboardInterrupt):
+                    if checkpoint_path:
+                        save(1, done, conv)
+                    raise
+            ckpt = None
+
+        if gain_mode == "peak":
+            gain = 0.98 / global_peak if global_peak > 0.98 else 1.0
+            log.info(f"Pass 2: Rendering with {20*np.log10(gain):.2f}dB adjustment.",
+                     extra=fields(event="pass", pass_no=2, gain_mode=gain_mode, gain_db=20*np.log10(gain)))
+        elif gain_mode == "bound":
+            if input_peaks is None:
+                input_peaks = header_channel_peaks(input_path)
+            if input_peaks is None:
+                input_peaks = scan_channel_peaks(input_path, cancel_event=self.cancel_event)
+            bound = float(np.max(self.no_clip_bound(input_peaks, order, rotating=trajectory is not None)))
+            gain = 0.98 / bound if bound > 0.98 else 1.0
+            log.info(f"Rendering with {20*np.log10(gain):.2f}dB no-clip bound gain.",
+                     extra=fields(event="pass", pass_no=1, gain_mode=gain_mode, gain_db=20*np.log10(gain)))
+        else:
+            gain = 10.0 ** ((gain_db or 0.0) / 20.0)
+            log.info(f"Rendering with fixed {gain_db or 0.0:.2f}dB gain"
+                     f"{f' into a {ceiling_db:.1f} dBTP limiter' if limiter is not None else ''}.",
+                     extra=fields(event="pass", pass_no=1, gain_mode="limit" if limiter is not None else gain_mode,
+                                  gain_db=gain_db or 0.0))
+
+        # PASS 2: Final Write
+        if ckpt is not None and not (os.path.exists(output_path) and sf.info(output_path).frames >= ckpt['frames']):
+            log.warning("Partial output missing; restarting the write pass.", extra=fields(event="resume_restart"))
+            ckpt = None
+        out_peak = 0.0
+        done = 0
+        frames = 0
+        conv = {}
+        to_drop = limiter.latency if limiter is not None else 0  # Leading limiter delay, not written
+        if ckpt is not None:
+            out_peak, done, frames = ckpt['out_peak'], ckpt['block'], ckpt['frames']
+            conv = {'ola': ckpt['ola'], 'pos': done * block_size}
+            if limiter is not None:
+                limiter.set_state(ckpt)
+                to_drop = ckpt['lim_drop']
+
+        def limiter_state():
+            return dict(limiter.state(), lim_drop=to_drop) if limiter is not None else {}
+        current_batch = (n_passes - 1) * n_batches + done
+        f_out = None
+        try:
+            with sf.SoundFile(input_path) as f_in, self.memory.stage("pass2"):
+                if ckpt is not None:
+                    # Continue the partial output exactly where the checkpoint left it
+                    f_out = sf.SoundFile(output_path, 'r+')
+                    f_out.seek(frames)
+                    f_out.truncate(frames)
+                else:
+                    f_out = sf.SoundFile(output_path, 'w', samplerate=fs, channels=2)
+                with f_out:
+                    f_in.seek(done * block_size)
+                    tracker = HeadTracker(trajectory, order, fs) if trajectory is not None else None
+                    blocks = f_in.blocks(blocksize=block_size, dtype='float32')
+                    try:
+                        for out_blk in self._convolve_blocks(blocks, n_sh, H_sh_freq, fft_len, tracker, conv,
+                                                             workers):
+                            current_batch += 1
+                            out_blk *= gain
+                            if limiter is not None:
+                                with self.tracer.span("block.limiter"):
+                                    out_blk = limiter.process(out_blk)
+                                if to_drop:
+                                    k = min(to_drop, out_blk.shape[0])
+                                    out_blk, to_drop = out_blk[k:], to_drop - k
+                            if out_blk.size:
+                                out_peak = max(out_peak, float(np.max(np.abs(out_blk))))
+                            self._emit_progress(current_batch, total_batches, out_peak)
+                            with self.tracer.span("block.write"):
+                                f_out.write(out_blk)
+                            done += 1
+                            frames += out_blk.shape[0]
+                            if due():
+                                f_out.flush()  # Header and data on disk before the checkpoint points at them
+                                save(2, done, conv, out_peak=out_peak, frames=frames, **limiter_state())
+                    except (RenderCancelled, KeyboardInterrupt):
+                        if checkpoint_path:
+                            f_out.flush()
+                            save(2, done, conv, out_peak=out_peak, frames=frames, **limiter_state())
+                        raise
+                    if limiter is not None:
+                        tail = limiter.flush()[to_drop:]
+                        if tail.size:
+                            out_peak = max(out_peak, float(np.max(np.abs(tail))))
+                        f_out.write(tail)
+        except BaseException:
+            if f_out is not None and not checkpoint_path:
+                _remove_partial(output_path)  # Checkpointed partials stay for resume
+            raise
+
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+        # Force 100%
+        self._report_progress(1.0)
+        stats = {'fs': fs, 'samples': n_samples, 'order': order, 'passes': n_passes,
+                 'peak': out_peak, 'gain_db': float(20 * np.log10(gain)),
+                 'limiter_db': limiter.gain_reduction_db if limiter is not None else None,
+                 'wall_s': time.perf_counter() - t_start}
+        self._log_done(stats, input=input_path, output=output_path, block_size=block_size,
+                       gain_mode="limit" if limiter is not None else gain_mode)
+        return stats
+
+    def _log_done(self, stats, **context):
+        """Adds the tracer summary to `stats` and logs the structured end-of-render record."""
+        message = "Done."
+        if self.tracer.enabled:
+            stats['timings'] = self.tracer.summary()
+            message += f" Stage timings:\n{format_summary(stats['timings'])}"
+        if self.memory.enabled:
+            stats['memory'] = self.memory.report()
+            message += f"\nMemory (peak RSS {stats['memory']['peak_rss_mb']:.1f} MB):\n{self.memory.format()}"
+        log.info(message, extra=fields(event="render_stats", **context, **stats))
+
+    def render_array(self, x, fs=48000, block_size=4096, trajectory=None, normalize=True):
+        """Renders an in-memory (n_frames, n_ch) Ambisonic array to (n_frames, 2).
+
+        Blocks are read as views of `x` (float32 input is never copied) and written
+        straight into the result. Because the whole output is in memory, peak
+        normalization is a single in-place scale instead of a second convolution pass.
+        """
+        x = np.asarray(x, dtype=np.float32)
+        if x.ndim != 2:
+            raise ValueError("Expected an (n_frames, n_channels) array.")
+        n_samples, n_ch = x.shape
+        order = int(np.sqrt(n_ch) - 1)
+        n_sh, fft_len, H_sh_freq = self._prepare_convolution(order, block_size)
+
+        if isinstance(trajectory, str):
+            trajectory = HeadTrajectory.load(trajectory)
+        tracker = HeadTracker(trajectory, order, fs) if trajectory is not None else None
+
+        out = np.empty((n_samples, 2), dtype=np.float32)
+        blocks = (x[i:i + block_size] for i in range(0, n_samples, block_size))
+        pos = 0
+        for out_blk in self._convolve_blocks(blocks, n_sh, H_sh_freq, fft_len, tracker):
+            out[pos:pos + out_blk.shape[0]] = out_blk
+            pos += out_blk.shape[0]
+
+        if normalize:
+            peak = float(np.max(np.abs(out))) if n_samples else 0.0
+            if peak > 0.98:
+                out *= 0.98 / peak
+        return out
+
+    def render_blocks(self, blocks, fs=48000, block_size=4096, trajectory=None, gain=1.0):
+        """Generator: renders an iterable of (n_frames, n_ch) arrays block by block.
+
+        Yields one (n_frames, 2) array per input block as soon as it is convolved.
+        Blocks may vary in length; ones longer than `block_size` are processed as
+        views. There is no look-ahead, so no automatic normalization: scale with `gain`.
+        """
+        blocks = iter(blocks)
+        first = next(blocks, None)
+        if first is None:
+            return
+        order = int(np.sqrt(np.shape(first)[1]) - 1)
+        n_sh, fft_len, H_sh_freq = self._prepare_convolution(order, block_size)
+
+        if isinstance(trajectory, str):
+            trajectory = HeadTrajectory.load(trajectory)
+        tracker = HeadTracker(trajectory, order, fs) if trajectory is not None else None
+
+        # A single persistent convolution stream, fed one input block at a time
+        feed = []
+        stream = self._convolve_blocks(_drain(feed), n_sh, H_sh_freq, fft_len, tracker)
+        for blk in _chain_first(first, blocks):
+            blk = np.asarray(blk, dtype=np.float32)
+            n_blk = blk.shape[0]
+            if n_blk <= block_size:
+                feed.append(blk)
+                res = next(stream)
+            else:
+                res = np.empty((n_blk, 2), dtype=np.float32)
+                for i in range(0, n_blk, block_size):
+                    feed.append(blk[i:i + block_size])
+                    sub = next(stream)
+                    res[i:i + sub.shape[0]] = sub
+            yield res * gain if gain != 1.0 else res
+
+    def _rotated_filter_stack(self, H_sh_freq, orientations, order):
+        """Folds each listener orientation into the filters: (n_bins, n_orient*2, n_sh).
+
+        Rotating the input (x -> Rx) before mixing equals mixing with R^T H, so every
+        orientation becomes two extra rows of one stacked mixing matrix per bin.
+        """
+        n_sh, _, n_bins = H_sh_freq.shape
+        rotator = SHRotator(order, resolution_deg=0.01)
+        H_rot = np.empty((len(orientations), n_sh, 2, n_bins), dtype=H_sh_freq.dtype)
+        for o, (yaw, pitch, roll) in enumerate(orientations):
+            blocks = rotator.blocks(yaw, pitch, roll)
+            for l in range(order + 1):
+                sl = slice(l * l, (l + 1) * (l + 1))
+                H_rot[o, sl] = np.einsum('ab, brk -> ark', blocks[l].T, H_sh_freq[sl])
+        return np.ascontiguousarray(H_rot.transpose(3, 0, 2, 1).reshape(n_bins, -1, n_sh))
+
+    def _convolve_blocks_multi(self, blocks, n_sh, H_stack, fft_len, group=8):
+        """Overlap-add convolution against a stacked multi-orientation filter bank.
+
+        Each input block is transformed once. Spectra of `group` consecutive blocks are
+        mixed together as a batched matrix-matrix product, which amortizes reading the
+        (large) stacked filters. Yields (n_orient, n_frames, 2) blocks.
+        """
+        n_bins, n_rows, _ = H_stack.shape
+        n_orient = n_rows // 2
+        X = np.empty((n_bins, n_sh, group), dtype=H_stack.dtype)
+        ola_buf = np.zeros((n_orient, 2, fft_len), dtype=np.float32)
+        pending = []
+
+        def flush():
+            Y = np.matmul(H_stack, X[:, :, :len(pending)])
+            for g, n_blk in enumerate(pending):
+                out_f = Y[:, :, g].T.reshape(n_orient, 2, n_bins)
+                out_t = irfft(out_f, n=fft_len, axis=-1)
+                out_t += ola_buf
+                ola_buf[..., :fft_len - n_blk] = out_t[..., n_blk:]
+                ola_buf[..., fft_len - n_blk:] = 0.0
+                yield out_t[..., :n_blk].transpose(0, 2, 1)
+            pending.clear()
+
+        for block in blocks:
+            self._check_cancel()
+            if block.shape[1] != n_sh: block = np.pad(block, ((0,0),(0, n_sh-block.shape[1])))[:,:n_sh]
+            X[:, :, len(pending)] = rfft(block.T, n=fft_len, axis=1).T
+            pending.append(block.shape[0])
+            if len(pending) == group:
+                yield from flush()
+        if pending:
+            yield from flush()
+
+    def render_orientations(self, input_path, output_paths, orientations, block_size=4096):
+        """Renders one binaural file per fixed listener orientation in one pass per stage.
+
+        `orientations` is a list of (yaw, pitch, roll) in degrees, using the same
+        convention as head-tracked rendering. Each output is normalized on its own
+        peak, matching what a separate render() per orientation would produce.
+        Returns render()'s stats dict, with 'peak' and 'gain_db' as per-output lists.
+        """
+        if len(output_paths) != len(orientations):
+            raise ValueError("Need exactly one output path per orientation.")
+        t_start = time.perf_counter()
 
-    def render(self, input_path, output_path, block_size=4096):
-        """Two-Pass Transparent Render."""
         with sf.SoundFile(input_path) as f:
             fs = f.samplerate
             n_ch = f.channels
             n_samples = len(f)
             order = int(np.sqrt(n_ch) - 1)
 
-        self.prepare(order)
-        n_sh = (order + 1)**2
-        hrir_len = self.sh_hrtfs.shape[2]
-        fft_len = 2**int(np.ceil(np.log2(block_size + hrir_len - 1)))
-        H_sh_freq = rfft(self.sh_hrtfs, n=fft_len, axis=2)
+        n_sh, fft_len, H_sh_freq = self._prepare_convolution(order, block_size)
+        H_stack = self._rotated_filter_stack(H_sh_freq, orientations, order)
 
-        last_progress_int = 0
+        self._last_progress_int = 0
         total_batches = 2 * (n_samples // block_size + 1) # 2 passes
         current_batch = 0
 
-        # PASS 1: Peak Detection
-        print("[SAFRenderer] Pass 1: Analyzing peaks...")
-        global_peak = 0.0
+        # PASS 1: Peak Detection (per orientation)
+        log.info(f"Pass 1: Analyzing peaks for {len(orientations)} orientations...",
+                 extra=fields(event="pass", pass_no=1, orientations=len(orientations)))
+        peaks = np.zeros(len(orientations))
         with sf.SoundFile(input_path) as f_in:
-            ola_buf = np.zeros((fft_len, 2), dtype=np.float32)
-            for block in f_in.blocks(blocksize=block_size, dtype='float32'):
-                # Progress Update
+            blocks = f_in.blocks(blocksize=block_size, dtype='float32')
+            for out_blk in self._convolve_blocks_multi(blocks, n_sh, H_stack, fft_len):
                 current_batch += 1
-                prog = int(current_batch / total_batches * 100)
-                if prog > last_progress_int:
-                    print(f"PROGRESS:{prog/100:.2f}")
-                    sys.stdout.flush()
-                    last_progress_int = prog
-
-                if block.shape[1] != n_sh: block = np.pad(block, ((0,0),(0, n_sh-block.shape[1])))[:,:n_sh]
-                
-                block_f = rfft(block.T, n=fft_len, axis=1)
-                out_f = np.einsum('sk, srk -> rk', block_f, H_sh_freq)
-                out_t = irfft(out_f, n=fft_len, axis=1).T
-                out_t += ola_buf
-                ola_buf = np.pad(out_t[block.shape[0]:, :], ((0, block.shape[0]), (0, 0)))[:fft_len]
-                
-                global_peak = max(global_peak, np.max(np.abs(out_t[:block.shape[0], :])))
+                self._emit_progress(current_batch, total_batches)
+                np.maximum(peaks, np.max(np.abs(out_blk), axis=(1, 2)), out=peaks)
 
-        gain = 0.98 / global_peak if global_peak > 0.98 else 1.0
-        print(f"[SAFRenderer] Pass 2: Rendering with {20*np.log10(gain):.2f}dB adjustment.")
+        gains = np.where(peaks > 0.98, 0.98 / np.maximum(peaks, 1e-12), 1.0)
+        log.info("Pass 2: Rendering orientations.", extra=fields(event="pass", pass_no=2))
 
         # PASS 2: Final Write
-        with sf.SoundFile(input_path) as f_in:
-            with sf.SoundFile(output_path, 'w', samplerate=fs, channels=2) as f_out:
-                ola_buf = np.zeros((fft_len, 2), dtype=np.float32)
-                for block in f_in.blocks(blocksize=block_size, dtype='float32'):
-                    # Progress Update
+        try:
+            with sf.SoundFile(input_path) as f_in, ExitStack() as stack:
+                f_outs = [stack.enter_context(sf.SoundFile(p, 'w', samplerate=fs, channels=2)) for p in output_paths]
+                blocks = f_in.blocks(blocksize=block_size, dtype='float32')
+                for out_blk in self._convolve_blocks_multi(blocks, n_sh, H_stack, fft_len):
                     current_batch += 1
-                    prog = int(current_batch / total_batches * 100)
-                    if prog > last_progress_int:
-                        print(f"PROGRESS:{prog/100:.2f}")
-                        sys.stdout.flush()
-                        last_progress_int = prog
-                        
-                    n_blk = block.shape[0]
-                    if block.shape[1] != n_sh: block = np.pad(block, ((0,0),(0, n_sh-block.shape[1])))[:,:n_sh]
-                    
-                    block_f = rfft(block.T, n=fft_len, axis=1)
-                    out_f = np.einsum('sk, srk -> rk', block_f, H_sh_freq)
-                    out_t = irfft(out_f, n=fft_len, axis=1).T
-                    out_t += ola_buf
-                    ola_buf = np.zeros_like(ola_buf)
-                    ola_buf[:fft_len - n_blk, :] = out_t[n_blk:, :]
-                    
-                    f_out.write(out_t[:n_blk, :] * gain)
+                    self._emit_progress(current_batch, total_batches)
+                    with self.tracer.span("block.write"):
+                        for o, f_out in enumerate(f_outs):
+                            f_out.write(out_blk[o] * gains[o])
+        except BaseException:
+            _remove_partial(*output_paths)
+            raise
 
-        # Force 100%
-        print("PROGRESS:1.0")
-        sys.stdout.flush()
-        print("[SAFRenderer] Done.")
+        self._report_progress(1.0)
+        stats = {'fs': fs, 'samples': n_samples, 'order': order, 'passes': 2,
+                 'peak': [float(p) for p in peaks], 'gain_db': [float(20 * np.log10(g)) for g in gains],
+                 'wall_s': time.perf_counter() - t_start}
+        self._log_done(stats, input=input_path, outputs=list(output_paths), block_size=block_size)
+        return stats
+
+
+def _remove_partial(*paths):
+    """Deletes outputs left behind by a cancelled or failed render."""
+    for path in paths:
+        try:
+            os.remove(path)
+            log.info(f"Removed partial output: {path}", extra=fields(event="removed_partial", path=path))
+        except OSError:
+            pass
+
+
+def header_channel_peaks(input_path):
+    """Per-channel peaks from the WAV PEAK chunk (libsndfile writes one for float files), or None.
+
+    Read straight from the header rather than the probe cache: the no-clip guarantee
+    should not depend on a cached entry.
+    """
+    try:
+        info = read_wav_header(input_path)
+    except (OSError, struct.error):
+        return None
+    if info is None or info['peaks'] is None:
+        return None
+    return np.asarray(info['peaks'])
+
+
+def scan_channel_peaks(input_path, block_size=65536, cancel_event=None):
+    """Per-channel max |sample| of a file: one read, no convolution."""
+    with sf.SoundFile(input_path) as f:
+        peaks = np.zeros(f.channels)
+        for block in f.blocks(blocksize=block_size, dtype='float32'):
+            if cancel_event is not None and cancel_event.is_set():
+                raise RenderCancelled()
+            if block.size:
+                np.maximum(peaks, np.max(np.abs(block), axis=0), out=peaks)
+    return peaks
+
+
+def _render_fingerprint(input_path, sofa_path, order, block_size, gain_db, trajectory, gain_mode="peak",
+                        input_peaks=None, ceiling_db=None):
+    """Identifies a render so a checkpoint is only resumed by the same job."""
+    st = os.stat(input_path)
+    traj = None
+    if trajectory is not None:
+        h = hashlib.sha1()
+        for arr in (trajectory.times, trajectory.yaw, trajectory.pitch, trajectory.roll):
+            h.update(np.ascontiguousarray(arr, dtype=np.float64).tobytes())
+        traj = h.hexdigest()
+    return json.dumps({'input': os.path.abspath(input_path), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns,
+                       'sofa': os.path.abspath(sofa_path) if sofa_path else None, 'order': order,
+                       'block_size': block_size, 'gain_db': gain_db, 'trajectory': traj, 'gain_mode': gain_mode,
+                       'input_peaks': None if input_peaks is None else np.ravel(input_peaks).tolist(),
+                       'ceiling_db': ceiling_db},
+                      sort_keys=True)
+
+
+def _save_checkpoint(path, fingerprint, state):
+    """Atomically writes render state to `path` (.npz): temp file, fsync, rename."""
+    arrays = {'fingerprint': np.array(fingerprint)}
+    for key, value in state.items():
+        if value is not None:
+            arrays[key] = np.asarray(value)
+    tmp = path + ".tmp"
+    with open(tmp, 'wb') as f:
+        np.savez(f, **arrays)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _load_checkpoint(path, fingerprint):
+    """Returns the saved state dict, or None if there is no usable checkpoint for this job."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as data:
+            if str(data['fingerprint']) != fingerprint:
+                log.warning(f"Ignoring checkpoint for a different job: {path}",
+                            extra=fields(event="checkpoint_mismatch", path=path))
+                return None
+            state = {}
+            for key in data.files:
+                value = data[key]
+                if value.ndim == 0:
+                    # Python floats were saved as float64; keep them Python floats so that
+                    # resumed arithmetic promotes exactly like the uninterrupted run
+                    value = value.item() if value.dtype in (np.float64, np.int64) else value[()]
+                state[key] = value
+            state.setdefault('ola', None)
+            return state
+    except (OSError, ValueError, KeyError) as e:
+        log.warning(f"Unreadable checkpoint {path}: {e}", extra=fields(event="checkpoint_unreadable", path=path))
+        return None
+
+
+def render_stereo(input_path, output_path, block_size=65536, progress_callback=None, cancel_event=None, gain_db=None):
+    """Speaker stereo preview: a W +/- Y mid-side decode (same matrix as the app's ffmpeg pan).
+
+    Returns the same stats dict as SAFRenderer.render().
+    """
+    gain = 0.5 * 10.0 ** ((gain_db or 0.0) / 20.0)
+    out_peak = 0.0
+    f_out = None
+    try:
+        with sf.SoundFile(input_path) as f_in:
+            n_samples = len(f_in)
+            fs = f_in.samplerate
+            f_out = sf.SoundFile(output_path, 'w', samplerate=fs, channels=2)
+            with f_out:
+                done = 0
+                for block in f_in.blocks(blocksize=block_size, dtype='float32', always_2d=True):
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise RenderCancelled()
+                    w = block[:, 0]
+                    y = block[:, 1] if block.shape[1] > 1 else np.zeros_like(w)
+                    out = np.stack([gain * (w + y), gain * (w - y)], axis=1)
+                    if out.size:
+                        out_peak = max(out_peak, float(np.max(np.abs(out))))
+                    f_out.write(out)
+                    done += block.shape[0]
+                    if progress_callback is not None:
+                        progress_callback(min(done / max(n_samples, 1), 1.0))
+    except BaseException:
+        if f_out is not None:
+            _remove_partial(output_path)
+        raise
+    return {'fs': fs, 'samples': n_samples, 'order': None, 'passes': 1,
+            'peak': out_peak, 'gain_db': float(gain_db or 0.0)}
+
+
+def listen_for_control(stream, cancel_event):
+    """Reads newline commands from `stream` (the worker's stdin) on a daemon thread.
+
+    "cancel" sets `cancel_event`; the render stops at the next block boundary. EOF
+    is ignored, so a parent that simply closes the pipe does not abort the job.
+    """
+    def reader():
+        for line in stream:
+            if line.strip().lower() == "cancel":
+                cancel_event.set()
+    thread = threading.Thread(target=reader, name="saf-control", daemon=True)
+    thread.start()
+    return thread
+
+
+def _chain_first(first, rest):
+    yield first
+    yield from rest
+
+def _drain(feed):
+    """Endless generator over a list that the consumer refills between pulls."""
+    while True:
+        yield feed.pop(0)
+
+def parse_orientations(spec):
+    """Parses "0,45,90" (yaws) or "yaw:pitch:roll,..." into (yaw, pitch, roll) tuples."""
+    orientations = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        vals = [float(v) for v in item.split(":")]
+        orientations.append(tuple((vals + [0.0, 0.0])[:3]))
+    return orientations
+
+def orientation_output_path(output_path, yaw, pitch=0.0, roll=0.0):
+    """Derives a per-orientation output path, e.g. scene_binaural_yaw045.wav."""
+    base, ext = os.path.splitext(output_path)
+    tag = f"_yaw{yaw:03g}"
+    if pitch: tag += f"_pitch{pitch:g}"
+    if roll: tag += f"_roll{roll:g}"
+    return f"{base}{tag}{ext}"
 
 if __name__ == "__main__":
     import argparse
@@ -211,6 +945,27 @@ if __name__ == "__main__":
     parser.add_argument("--input", required=True, help="Input Ambisonic file")
     parser.add_argument("--output", required=True, help="Output Binaural file")
     parser.add_argument("--sofa", required=True, help="SOFA Head Model file")
+    parser.add_argument("--trajectory", help="Head-tracking CSV/JSON (time, yaw, pitch, roll in degrees)")
+    parser.add_argument("--orientations", help="Batch fixed orientations: '0,45,90' or 'yaw:pitch:roll,...'")
+    parser.add_argument("--checkpoint", action="store_true",
+                        help="Save resumable state to <output>.ckpt.npz; re-running the same command resumes")
+    parser.add_argument("--checkpoint-interval", type=float, default=30.0, help="Seconds between checkpoints")
+    parser.add_argument("--gain-mode", choices=["peak", "bound", "limit"], default="peak",
+                        help="peak: two-pass normalization; bound: one pass with a guaranteed no-clip gain; "
+                             "limit: one pass through a look-ahead true-peak limiter")
+    parser.add_argument("--ceiling-db", type=float, default=-1.0, help="Limiter true-peak ceiling (dBTP)")
+    parser.add_argument("--control-stdin", action="store_true",
+                        help="Accept 'cancel' lines on stdin; exits with code 3 after removing partial output")
+    parser.add_argument("--log-level", choices=["off", "warning", "info", "debug"],
+                        help=f"Engine log level (default: ${render_log.ENV_VAR} or info)")
+    parser.add_argument("--log-json", action="store_true", help="Log one JSON object per line")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="Record per-stage timing spans; writes a Chrome/Perfetto trace JSON to PATH")
+    parser.add_argument("--memory-profile", action="store_true",
+                        help="Log per-stage heap peaks and largest allocations (slower: uses tracemalloc)")
+    parser.add_argument("--memory-limit-mb", type=float,
+                        help="Memory ceiling: block size, FFT workers and SOFA residency are chosen to fit it")
+    parser.add_argument("--fft-workers", type=int, default=1, help="FFT threads (may be lowered by --memory-limit-mb)")
     
     # Support both flagged (App) and positional (Legacy/Manual) arguments for flexibility
     # Note: If positional args are detected, we map them manually to simulate flags if needed, 
@@ -221,11 +976,39 @@ if __name__ == "__main__":
     # Simple Heuristic: If we see flags, use argparse. If not, use positional.
     if len(sys.argv) > 1 and sys.argv[1].startswith("-"):
         args = parser.parse_args()
+        if args.log_level or args.log_json:
+            render_log.configure(args.log_level or "info", "json" if args.log_json else "text")
+        else:
+            render_log.configure_from_env(default="info")
         engine = SAFRenderer()
-        engine.load_sofa(args.sofa)
-        engine.render(args.input, args.output)
+        engine.tracer.enabled = bool(args.trace)
+        engine.memory.enabled = args.memory_profile
+        engine.memory_limit_mb = args.memory_limit_mb
+        engine.fft_workers = args.fft_workers
+        if args.control_stdin:
+            engine.cancel_event = threading.Event()
+            listen_for_control(sys.stdin, engine.cancel_event)
+        try:
+            engine.load_sofa(args.sofa)
+            if args.orientations:
+                orientations = parse_orientations(args.orientations)
+                outputs = [orientation_output_path(args.output, *o) for o in orientations]
+                engine.render_orientations(args.input, outputs, orientations)
+            else:
+                engine.render(args.input, args.output, trajectory=args.trajectory,
+                              checkpoint_path=args.output + ".ckpt.npz" if args.checkpoint else None,
+                              checkpoint_interval=args.checkpoint_interval, gain_mode=args.gain_mode,
+                              ceiling_db=args.ceiling_db)
+        except RenderCancelled:
+            print("CANCELLED")
+            sys.stdout.flush()
+            sys.exit(CANCELLED_EXIT_CODE)
+        finally:
+            if args.trace:
+                engine.tracer.write_chrome_trace(args.trace)
     elif len(sys.argv) >= 4:
         # Legacy positional mode
+        render_log.configure_from_env(default="info")
         engine = SAFRenderer()
         engine.load_sofa(sys.argv[3])
         engine.render(sys.argv[1], sys.argv[2])
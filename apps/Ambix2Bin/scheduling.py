@@ -0,0 +1,146 @@
+import math
+import heapq
+import time
+import threading
+
+from sofa_io import sofa_filter_length
+from audio_probe import probe
+
+# Imports nothing heavy (no SciPy, netCDF4 or renderer): the GUI schedules batches
+# on its own thread with it.
+
+
+def probe_job(input_path, mode='binaural', order=None, gain_db=None, taps=None, gain_mode='peak'):
+    """Header-only look at one input, plus its estimated render cost.
+
+    Cost is samples x SH channels x filter taps x passes, an arbitrary unit that only
+    ranks jobs against each other; BatchETA turns it into seconds from measured
+    throughput. Returns None when the header cannot be read (the render will report
+    the actual error). Headers come from the audio_probe cache, so files the folder
+    scan already looked at are not opened again.
+    """
+    info = probe(input_path)
+    if info is None:
+        return None
+    n_ch = info['channels']
+    if mode == 'stereo':
+        n_sh, taps = 1, 1  # Pass-through matrix, no convolution
+    else:
+        if order is None:
+            order = int(math.sqrt(n_ch) - 1)
+        n_sh = (order + 1)**2
+    passes = 2 if gain_db is None and gain_mode == 'peak' and mode != 'stereo' else 1
+    return {
+        'samples': info['frames'],
+        'fs': info['samplerate'],
+        'channels': n_ch,
+        'duration_s': info['duration_s'],
+        'cost': float(info['frames']) * n_sh * (taps or 1) * passes,
+    }
+
+
+def _makespan(costs, order, n_workers):
+    """Finish time of list scheduling `order` onto n_workers identical workers."""
+    free = [0.0] * max(1, n_workers)
+    for i in order:
+        heapq.heapreplace(free, free[0] + costs[i])
+    return max(free)
+
+
+def schedule_jobs(costs, n_workers, slack=0.05):
+    """Start order for jobs with the given costs on a shared n_workers queue.
+
+    Shortest-job-first returns small files soonest but can leave the largest file to
+    start last and run alone. Longest-first (LPT) packs for the shortest makespan.
+    This starts from SJF and moves the largest jobs to the front only until the
+    simulated makespan is within `slack` of LPT, so both goals mostly hold.
+    """
+    idx = list(range(len(costs)))
+    bound = _makespan(costs, sorted(idx, key=lambda i: -costs[i]), n_workers)
+    rest = sorted(idx, key=lambda i: costs[i])
+    front = []
+    while rest and _makespan(costs, front + rest, n_workers) > bound * (1 + slack):
+        front.append(rest.pop())
+    return front + rest
+
+
+class BatchETA:
+    """Batch time-remaining estimate that recalibrates from measured throughput.
+
+    `costs` maps a job key to its cost (see probe_job). Feed per-job progress
+    fractions through update(); throughput is an exponential moving average of
+    cost units completed per second, so the estimate corrects itself as files of
+    different sizes and orders finish.
+    """
+
+    def __init__(self, costs, n_workers=1, smoothing_s=10.0, min_interval_s=0.5, start=None):
+        self.costs = dict(costs)
+        self.total = float(sum(self.costs.values()))
+        self.n_workers = max(1, n_workers)
+        self.smoothing_s = smoothing_s
+        self.min_interval_s = min_interval_s
+        self.progress = {}
+        self.rate = None  # Cost units per second, all workers together
+        self._lock = threading.Lock()
+        self._t_last = time.monotonic() if start is None else start
+        self._done_last = 0.0
+
+    def done_cost(self):
+        return sum(self.costs.get(k, 0.0) * min(1.0, f) for k, f in self.progress.items())
+
+    def update(self, key, fraction, now=None):
+        """Records progress (0..1) for one job; finished, failed or cancelled jobs pass 1.0."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self.progress[key] = max(fraction, self.progress.get(key, 0.0))
+            dt = now - self._t_last
+            if dt < self.min_interval_s:
+                return
+            done = self.done_cost()
+            inst = (done - self._done_last) / dt
+            alpha = 1.0 - math.exp(-dt / self.smoothing_s)
+            self.rate = inst if self.rate is None else self.rate + alpha * (inst - self.rate)
+            self._t_last, self._done_last = now, done
+
+    def discard(self, key):
+        """Drops a cancelled job without counting it as throughput."""
+        with self._lock:
+            cost = self.costs.pop(key, 0.0)
+            self._done_last -= cost * min(1.0, self.progress.pop(key, 0.0))
+            self.total -= cost
+
+    def remaining_s(self):
+        """Seconds left, or None until a throughput measurement exists."""
+        with self._lock:
+            if not self.rate or self.rate <= 0:
+                return None
+            left = {k: c * (1.0 - min(1.0, self.progress.get(k, 0.0))) for k, c in self.costs.items()}
+            remaining = sum(left.values()) / self.rate
+            # A single long file cannot go faster than one worker's share of the throughput
+            longest = max(left.values(), default=0.0) / (self.rate / self.n_workers)
+            return max(remaining, longest)
+
+
+def format_eta(seconds):
+    if seconds is None:
+        return "--:--"
+    seconds = int(round(seconds))
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"
+
+
+def estimate_job_costs(jobs):
+    """probe_job cost for each job dict (input, mode, sofa, order, gain_db); 0.0 if unreadable."""
+    costs = []
+    for job in jobs:
+        taps = None
+        if job.get('mode', 'binaural') != 'stereo' and job.get('sofa'):
+            try:
+                taps = sofa_filter_length(job['sofa'])
+            except Exception:
+                pass  # Missing/broken SOFA: the render reports it
+        probe = probe_job(job['input'], job.get('mode', 'binaural'), job.get('order'), job.get('gain_db'), taps,
+                          job.get('gain_mode', 'peak'))
+        costs.append(probe['cost'] if probe else 0.0)
+    return costs
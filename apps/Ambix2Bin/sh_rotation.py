@@ -0,0 +1,210 @@
+import csv
+import json
+from collections import OrderedDict
+
+import numpy as np
+
+
+def head_rotation_matrix(yaw, pitch, roll):
+    """Cartesian rotation of the listener's head (radians).
+
+    Yaw turns left around +Z, pitch lifts the nose, roll raises the left ear.
+    """
+    cy, sy = np.cos(yaw), np.sin(yaw)
+    cp, sp = np.cos(pitch), np.sin(pitch)
+    cr, sr = np.cos(roll), np.sin(roll)
+    Rz = np.array([[cy, -sy, 0.0], [sy, cy, 0.0], [0.0, 0.0, 1.0]])
+    Ry = np.array([[cp, 0.0, -sp], [0.0, 1.0, 0.0], [sp, 0.0, cp]])  # Nose up = -Y rotation
+    Rx = np.array([[1.0, 0.0, 0.0], [0.0, cr, -sr], [0.0, sr, cr]])
+    return Rz @ Ry @ Rx
+
+
+def sh_rotation_blocks(order, rot):
+    """Real SH rotation matrices per degree (Ivanic & Ruedenberg recursion).
+
+    `rot` is a 3x3 Cartesian rotation. Returns a list of (2l+1, 2l+1) blocks in ACN
+    order such that Y(rot @ d) = R_l @ Y_l(d). Rotations never mix degrees, so the
+    same blocks apply to SN3D and N3D signals.
+    """
+    blocks = [np.ones((1, 1))]
+    if order < 1:
+        return blocks
+
+    # Band 1 is the Cartesian matrix permuted to (y, z, x)
+    perm = [1, 2, 0]
+    r1 = np.asarray(rot, dtype=np.float64)[np.ix_(perm, perm)]
+    blocks.append(r1)
+
+    def P(i, a, b, l, prev):
+        # prev is indexed [-(l-1)..(l-1)] via offset l-1; r1 via offset 1
+        if b == l:
+            return r1[i + 1, 2] * prev[a + l - 1, 2 * l - 2] - r1[i + 1, 0] * prev[a + l - 1, 0]
+        if b == -l:
+            return r1[i + 1, 2] * prev[a + l - 1, 0] + r1[i + 1, 0] * prev[a + l - 1, 2 * l - 2]
+        return r1[i + 1, 1] * prev[a + l - 1, b + l - 1]
+
+    for l in range(2, order + 1):
+        prev = blocks[l - 1]
+        R = np.zeros((2 * l + 1, 2 * l + 1))
+        for m in range(-l, l + 1):
+            d = 1.0 if m == 0 else 0.0
+            am = abs(m)
+            for n in range(-l, l + 1):
+                denom = (l + n) * (l - n) if abs(n) < l else (2 * l) * (2 * l - 1)
+                u = np.sqrt((l + m) * (l - m) / denom)
+                v = 0.5 * np.sqrt((1 + d) * (l + am - 1) * (l + am) / denom) * (1 - 2 * d)
+                w = -0.5 * np.sqrt((l - am - 1) * (l - am) / denom) * (1 - d)
+
+                val = 0.0
+                if u != 0.0:
+                    val += u * P(0, m, n, l, prev)
+                if v != 0.0:
+                    if m == 0:
+                        V = P(1, 1, n, l, prev) + P(-1, -1, n, l, prev)
+                    elif m > 0:
+                        d1 = 1.0 if m == 1 else 0.0
+                        V = P(1, m - 1, n, l, prev) * np.sqrt(1 + d1) - P(-1, -m + 1, n, l, prev) * (1 - d1)
+                    else:
+                        d1 = 1.0 if m == -1 else 0.0
+                        V = P(1, m + 1, n, l, prev) * (1 - d1) + P(-1, -m - 1, n, l, prev) * np.sqrt(1 + d1)
+                    val += v * V
+                if w != 0.0:
+                    if m > 0:
+                        W = P(1, m + 1, n, l, prev) + P(-1, -m - 1, n, l, prev)
+                    else:
+                        W = P(1, m - 1, n, l, prev) - P(-1, -m + 1, n, l, prev)
+                    val += w * W
+                R[m + l, n + l] = val
+        blocks.append(R)
+    return blocks
+
+
+class SHRotator:
+    """Scene-rotation matrices for a listener orientation, cached on a quantized grid."""
+
+    def __init__(self, order, resolution_deg=1.0, max_cache=4096):
+        self.order = order
+        self.resolution_deg = resolution_deg
+        self.max_cache = max_cache
+        self._cache = OrderedDict()
+
+    def key(self, yaw, pitch, roll):
+        """Quantized grid key for an orientation in degrees."""
+        q = self.resolution_deg
+        return (int(round((yaw % 360.0) / q)) % int(round(360.0 / q)),
+                int(round(pitch / q)),
+                int(round(roll / q)))
+
+    def blocks(self, yaw, pitch, roll):
+        """Per-degree float32 blocks that counter-rotate the scene for the given head orientation."""
+        k = self.key(yaw, pitch, roll)
+        blocks = self._cache.get(k)
+        if blocks is not None:
+            self._cache.move_to_end(k)
+            return blocks
+
+        q = np.deg2rad(self.resolution_deg)
+        head = head_rotation_matrix(k[0] * q, k[1] * q, k[2] * q)
+        # A source fixed in the room appears at head^T @ d in head coordinates
+        blocks = [b.astype(np.float32) for b in sh_rotation_blocks(self.order, head.T)]
+        self._cache[k] = blocks
+        if len(self._cache) > self.max_cache:
+            self._cache.popitem(last=False)
+        return blocks
+
+    @staticmethod
+    def apply(x, blocks_a, blocks_b=None, ramp=None, out=None, work=None):
+        """Rotates a channel-first (n_sh, n_frames) block.
+
+        Crossfades from A to B along `ramp` when B is given. Working per degree on
+        contiguous rows keeps the cost at sum((2l+1)^2) MACs per frame. With `out`
+        and `work` preallocated, no arrays are allocated.
+        """
+        if out is None:
+            out = np.empty_like(x)
+        out[0] = x[0]
+        for l in range(1, len(blocks_a)):
+            sl = slice(l * l, (l + 1) * (l + 1))
+            A = blocks_a[l]
+            np.matmul(A, x[sl], out=out[sl])
+            if blocks_b is not None and blocks_b[l] is not A:
+                if work is None:
+                    work = np.empty_like(x)
+                # (1-w)*Ax + w*Bx == Ax + w*(Bx - Ax)
+                np.matmul(blocks_b[l], x[sl], out=work[sl])
+                np.subtract(work[sl], out[sl], out=work[sl])
+                work[sl] *= ramp
+                out[sl] += work[sl]
+        return out
+
+
+class HeadTrajectory:
+    """Listener yaw/pitch/roll over time, in degrees, linearly interpolated."""
+
+    def __init__(self, times, yaw, pitch=None, roll=None):
+        times = np.asarray(times, dtype=np.float64)
+        order = np.argsort(times, kind="stable")
+        self.times = times[order]
+        zeros = np.zeros_like(self.times)
+        # Unwrap so that 359 -> 1 interpolates through 0, not through 180
+        self.yaw = np.rad2deg(np.unwrap(np.deg2rad(np.asarray(yaw, dtype=np.float64)[order])))
+        self.pitch = zeros if pitch is None else np.asarray(pitch, dtype=np.float64)[order]
+        self.roll = zeros if roll is None else np.asarray(roll, dtype=np.float64)[order]
+
+    @classmethod
+    def load(cls, path):
+        """Reads a CSV (time,yaw,pitch,roll; header optional) or JSON trajectory."""
+        if path.lower().endswith(".json"):
+            with open(path) as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                data = data.get("samples", data.get("trajectory", []))
+            rows = []
+            for s in data:
+                if isinstance(s, dict):
+                    t = s.get("t", s.get("time"))
+                    rows.append((t, s.get("yaw", 0.0), s.get("pitch", 0.0), s.get("roll", 0.0)))
+                else:
+                    rows.append((tuple(s) + (0.0, 0.0, 0.0))[:4])
+        else:
+            rows = []
+            with open(path, newline="") as f:
+                for rec in csv.reader(f):
+                    if not rec or rec[0].strip().startswith("#"):
+                        continue
+                    try:
+                        vals = [float(v) for v in rec[:4]]
+                    except ValueError:
+                        continue  # Header row
+                    rows.append((vals + [0.0, 0.0, 0.0])[:4])
+        if not rows:
+            raise ValueError(f"No orientation samples found in trajectory: {path}")
+        arr = np.array(rows, dtype=np.float64)
+        return cls(arr[:, 0], arr[:, 1], arr[:, 2], arr[:, 3])
+
+    def orientation_at(self, t):
+        """Returns (yaw, pitch, roll) in degrees at time t (seconds)."""
+        return (float(np.interp(t, self.times, self.yaw)),
+                float(np.interp(t, self.times, self.pitch)),
+                float(np.interp(t, self.times, self.roll)))
+
+
+class HeadTracker:
+    """Applies a head trajectory to successive SH blocks, crossfading matrices per block."""
+
+    def __init__(self, trajectory, order, fs, resolution_deg=1.0):
+        self.trajectory = trajectory
+        self.fs = float(fs)
+        self.rotator = SHRotator(order, resolution_deg)
+        self._ramp = np.zeros(0, dtype=np.float32)
+
+    def process(self, block, start_sample, out=None):
+        """Rotates a channel-first `block` whose first frame sits at `start_sample`."""
+        n_blk = block.shape[1]
+        rot_a = self.rotator.blocks(*self.trajectory.orientation_at(start_sample / self.fs))
+        rot_b = self.rotator.blocks(*self.trajectory.orientation_at((start_sample + n_blk) / self.fs))
+        if rot_b is rot_a:
+            return SHRotator.apply(block, rot_a, out=out)
+        if self._ramp.shape[0] != n_blk:
+            self._ramp = (np.arange(n_blk, dtype=np.float32) + 1.0) / n_blk
+        return SHRotator.apply(block, rot_a, rot_b, self._ramp, out=out)
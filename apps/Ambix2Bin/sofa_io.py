@@ -0,0 +1,21 @@
+import threading
+
+# SOFA helpers that don't need the renderer. netCDF4 is imported only when a file is
+# actually read, so the GUI and the scheduler can import this module for free.
+
+# netCDF4/HDF5 is not thread-safe; serialize SOFA reads across renderer instances
+NETCDF_LOCK = threading.Lock()
+
+_filter_lengths = {}
+
+
+def sofa_filter_length(sofa_path):
+    """HRIR length (taps) of a SOFA file, read from the dimensions only."""
+    if sofa_path in _filter_lengths:
+        return _filter_lengths[sofa_path]
+    import netCDF4
+    with NETCDF_LOCK:
+        with netCDF4.Dataset(sofa_path, 'r') as ds:
+            taps = int(ds.variables['Data.IR'].shape[-1])
+    _filter_lengths[sofa_path] = taps
+    return taps
@@ -0,0 +1,289 @@
+import os
+import sys
+import time
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from audio_files import scan_audio_files, is_audio_file, unique_output_path
+from batch_render import run_job, MODE_SUFFIX
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+
+if WATCHDOG_AVAILABLE:
+    class _InboxHandler(FileSystemEventHandler):
+        """Hands the watcher the paths each event names; the service loop does the filtering."""
+
+        def __init__(self, watcher):
+            self.watcher = watcher
+
+        def on_any_event(self, event):
+            dest = getattr(event, 'dest_path', None)
+            if not event.is_directory:
+                self.watcher._note('file', event.src_path)
+                if dest:
+                    self.watcher._note('file', dest)
+            elif event.event_type == 'created':
+                self.watcher._note('tree', event.src_path)
+            elif event.event_type == 'deleted':
+                self.watcher._note('gone', event.src_path)
+            elif event.event_type == 'moved':
+                self.watcher._note('gone', event.src_path)
+                self.watcher._note('tree', dest)
+            # A folder's "modified" only repeats what its files' own events say
+
+
+class WatchFolder:
+    """Drop-folder service: renders files that land in `inbox` once they stop growing.
+
+    Changes are picked up through watchdog notifications when it is installed and by
+    polling otherwise. Notifications update only the paths they name; a full rescan
+    of the inbox runs every `rescan_s` as a fallback for missed events (and every
+    `poll_s` when polling). A file counts as complete when its size and mtime have not
+    changed for `settle_s` seconds. Inputs move to `done_dir` next to their render,
+    or to `error_dir` with an .error.txt note, keeping their subfolder layout.
+    """
+
+    def __init__(self, inbox, sofa=None, done_dir=None, error_dir=None, mode='binaural', order=None,
+                 gain_db=None, jobs=1, block_size=4096, settle_s=2.0, poll_s=1.0, use_watchdog=None,
+                 gain_mode='peak', rescan_s=60.0):
+        self.inbox = os.path.abspath(inbox)
+        self.done_dir = os.path.abspath(done_dir or self.inbox.rstrip(os.sep) + "_done")
+        self.error_dir = os.path.abspath(error_dir or self.inbox.rstrip(os.sep) + "_error")
+        self.job_defaults = {'sofa': sofa, 'mode': mode, 'order': order, 'gain_db': gain_db, 'gain_mode': gain_mode}
+        self.jobs = jobs
+        self.block_size = block_size
+        self.settle_s = settle_s
+        self.poll_s = poll_s
+        self.rescan_s = rescan_s
+        self.use_watchdog = WATCHDOG_AVAILABLE if use_watchdog is None else (use_watchdog and WATCHDOG_AVAILABLE)
+
+        self._candidates = {}   # path -> (size, mtime_ns, time the signature was first seen)
+        self._in_flight = {}    # path -> (job, future)
+        self._changes = {}      # path -> 'file' | 'tree' | 'gone', from watchdog since the last poll
+        self._changes_lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._last_scan = None  # The first poll scans the whole inbox for files already waiting
+        self._observer = None
+        self._pool = None
+        self.processed = []     # (input, status, destination) for each finished file
+
+    def start(self):
+        for d in (self.inbox, self.done_dir, self.error_dir):
+            os.makedirs(d, exist_ok=True)
+        if self.jobs > 1:
+            self._pool = ProcessPoolExecutor(max_workers=self.jobs)
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="watch-render")
+        if self.use_watchdog:
+            self._observer = Observer()
+            self._observer.schedule(_InboxHandler(self), self.inbox, recursive=True)
+            self._observer.start()
+        print(f"[Watch] {self.inbox} ({'notifications' if self.use_watchdog else 'polling'}, "
+              f"{self.jobs} job(s))", flush=True)
+        return self
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._collect()
+
+    def _note(self, kind, path):
+        """Called from the watchdog thread: remembers a changed path and wakes the service loop."""
+        with self._changes_lock:
+            self._changes[path] = kind
+        self._dirty.set()
+
+    def _take_changes(self):
+        with self._changes_lock:
+            changes, self._changes = self._changes, {}
+        return changes
+
+    def _is_ours(self, path):
+        """Renders and moved inputs, in case the done/error folders sit inside the inbox.
+
+        Only those are ignored; a dropped file named like an output (take_binaural.wav)
+        is an input like any other.
+        """
+        return any(path.startswith(d + os.sep) for d in (self.done_dir, self.error_dir))
+
+    def _refresh(self, path, now):
+        """Updates one path's candidate entry from a fresh stat; drops it if the file is gone."""
+        if path in self._in_flight or self._is_ours(path):
+            return
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._candidates.pop(path, None)  # Moved away (or never there)
+            return
+        sig = (st.st_size, st.st_mtime_ns)
+        prev = self._candidates.get(path)
+        if prev is None or prev[:2] != sig:
+            self._candidates[path] = sig + (now,)
+
+    def _scan(self):
+        """Rebuilds the candidate table from the whole inbox (shared scan + extension filter)."""
+        now = time.monotonic()
+        seen = set()
+        for path in scan_audio_files([self.inbox]):
+            seen.add(path)
+            self._refresh(path, now)
+        for path in list(self._candidates):
+            if path not in seen:
+                del self._candidates[path]
+
+    def _apply_changes(self, changes):
+        """Updates the candidate table for the paths watchdog reported, without walking the inbox."""
+        now = time.monotonic()
+        for path, kind in changes.items():
+            if kind == 'file':
+                if is_audio_file(path):
+                    self._refresh(path, now)
+            elif kind == 'gone':
+                prefix = path + os.sep
+                for candidate in [c for c in self._candidates if c.startswith(prefix)]:
+                    del self._candidates[candidate]
+            else:  # A folder created or moved in: its files raise no events of their own
+                for candidate in scan_audio_files([path]):
+                    self._refresh(candidate, now)
+
+    def _ready(self, limit):
+        """Up to `limit` paths whose size/mtime have been stable for settle_s, re-checked with a fresh stat.
+
+        Only those about to be submitted are stat'ed, so a large backlog costs no syscalls per tick.
+        """
+        now = time.monotonic()
+        ready = []
+        for path, (size, mtime_ns, since) in list(self._candidates.items()):
+            if len(ready) >= limit:
+                break
+            if now - since < self.settle_s:
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                del self._candidates[path]
+                continue
+            if (st.st_size, st.st_mtime_ns) != (size, mtime_ns):
+                self._candidates[path] = (st.st_size, st.st_mtime_ns, now)  # Still growing
+            elif size > 0:
+                ready.append(path)
+        return ready
+
+    def _submit(self, path):
+        rel = os.path.relpath(os.path.splitext(path)[0], self.inbox)
+        job = dict(self.job_defaults, input=path)
+        # Render straight into the done tree; a failure removes the partial output
+        base = os.path.join(self.done_dir, rel)
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        job['output'] = unique_output_path(base, MODE_SUFFIX[job['mode']])
+        del self._candidates[path]
+        self._in_flight[path] = (job, self._pool.submit(run_job, job, self.block_size))
+
+    def _collect(self):
+        for path, (job, fut) in list(self._in_flight.items()):
+            if not fut.done():
+                continue
+            del self._in_flight[path]
+            try:
+                entry = fut.result()
+            except Exception as e:  # Worker process died (run_job itself never raises)
+                entry = dict(job, status='error', error=f"{type(e).__name__}: {e}")
+            rel = os.path.relpath(path, self.inbox)
+            if entry['status'] == 'ok':
+                self._move(path, self.done_dir, rel)
+                print(f"[Watch] OK    {rel} -> {entry['output']}", flush=True)
+                self.processed.append((path, 'ok', entry['output']))
+            else:
+                if os.path.exists(entry['output']):
+                    os.remove(entry['output'])
+                dest = self._move(path, self.error_dir, rel)
+                with open(dest + ".error.txt", "w") as f:
+                    f.write(entry['error'] + "\n")
+                print(f"[Watch] ERROR {rel}: {entry['error']}", flush=True)
+                self.processed.append((path, 'error', dest))
+
+    @staticmethod
+    def _move(path, root, rel):
+        base, ext = os.path.splitext(os.path.join(root, rel))
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        dest = unique_output_path(base, ext)
+        shutil.move(path, dest)
+        return dest
+
+    def poll(self):
+        """One service iteration. Returns the number of files queued or rendering."""
+        self._collect()
+        now = time.monotonic()
+        self._dirty.clear()
+        changes = self._take_changes()
+        interval = self.rescan_s if self.use_watchdog else self.poll_s
+        if self._last_scan is None or now - self._last_scan >= interval:
+            self._last_scan = now
+            self._scan()  # Covers whatever the notifications reported
+        elif changes:
+            self._apply_changes(changes)
+        # Never hand the pool more than a few files per worker, so thousands of
+        # arrivals queue here (cheaply) instead of as pickled futures
+        room = max(0, 4 * self.jobs - len(self._in_flight))
+        for path in self._ready(room):
+            self._submit(path)
+        return len(self._in_flight) + len(self._candidates)
+
+    def run(self, stop_event=None, idle_exit_s=None):
+        """Serves until `stop_event` is set (or after `idle_exit_s` with nothing pending)."""
+        self.start()
+        idle_since = time.monotonic()
+        try:
+            while stop_event is None or not stop_event.is_set():
+                if self.poll():
+                    idle_since = time.monotonic()
+                elif idle_exit_s is not None and time.monotonic() - idle_since >= idle_exit_s:
+                    break
+                # Candidates waiting to settle need re-checks even without new events
+                self._dirty.wait(min(self.poll_s, self.settle_s / 2) if self.settle_s else self.poll_s)
+        finally:
+            self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ambix2Bin watch-folder service")
+    parser.add_argument("inbox", help="Folder to watch (recursively)")
+    parser.add_argument("--sofa", help="SOFA Head Model file (binaural mode)")
+    parser.add_argument("--done", help="Completed inputs and renders (default: <inbox>_done)")
+    parser.add_argument("--error", help="Failed inputs (default: <inbox>_error)")
+    parser.add_argument("--mode", choices=sorted(MODE_SUFFIX), default="binaural")
+    parser.add_argument("--order", type=int)
+    parser.add_argument("--gain-db", type=float)
+    parser.add_argument("--gain-mode", choices=["peak", "bound", "limit"], default="peak",
+                        help="bound: single pass with a guaranteed no-clip gain; limit: single pass through "
+                             "a true-peak limiter")
+    parser.add_argument("--jobs", "-j", type=int, default=1)
+    parser.add_argument("--settle", type=float, default=2.0, help="Seconds a file must stop growing")
+    parser.add_argument("--poll", type=float, default=1.0, help="Polling interval (fallback mode)")
+    parser.add_argument("--no-watchdog", action="store_true", help="Force polling")
+    parser.add_argument("--rescan", type=float, default=60.0,
+                        help="Full inbox rescan interval with watchdog (catches missed events)")
+    args = parser.parse_args()
+
+    if args.mode == "binaural" and not args.sofa:
+        parser.error("--sofa is required in binaural mode")
+    watcher = WatchFolder(args.inbox, args.sofa, args.done, args.error, args.mode, args.order, args.gain_db,
+                          args.jobs, settle_s=args.settle, poll_s=args.poll,
+                          use_watchdog=False if args.no_watchdog else None, gain_mode=args.gain_mode,
+                          rescan_s=args.rescan)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        sys.exit(0)
@@ -1,12 +1,12 @@
 import sys
 import os
+import hashlib
 import webbrowser
-import requests
-import qtawesome as qta
+from collections import OrderedDict
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QLabel, QVBoxLayout, 
                              QWidget, QPushButton, QFrame, QHBoxLayout, 
                              QGraphicsDropShadowEffect, QMessageBox)
-from PyQt6.QtCore import Qt, QMimeData, QPoint, QSize, QUrl
+from PyQt6.QtCore import Qt, QMimeData, QPoint, QSize, QUrl, QStandardPaths
 from PyQt6.QtGui import (QDragEnterEvent, QDropEvent, QFont, QPixmap, QCursor, 
                          QFontDatabase, QColor, QIcon, QPainter, QImage, 
                          QResizeEvent, QDesktopServices)
@@ -48,18 +48,12 @@ class AssetManager:
         if not os.path.exists(cls.ASSET_DIR):
             os.makedirs(cls.ASSET_DIR)
         
-        for filename, url in cls.FONTS.items():
-            path = os.path.join(cls.ASSET_DIR, filename)
-            if not os.path.exists(path):
-                try:
-                    r = requests.get(url, timeout=10)
-                    r.raise_for_status()
-                    with open(path, 'wb') as f: f.write(r.content)
-                except: pass
-
-        for filename, url in cls.SVGS.items():
-            path = os.path.join(cls.ASSET_DIR, filename)
-            if not os.path.exists(path):
+        missing = [(filename, url) for filename, url in list(cls.FONTS.items()) + list(cls.SVGS.items())
+                   if not os.path.exists(os.path.join(cls.ASSET_DIR, filename))]
+        if missing:
+            import requests # Only needed on a first run, and slow to import
+            for filename, url in missing:
+                path = os.path.join(cls.ASSET_DIR, filename)
                 try:
                     r = requests.get(url, timeout=10)
                     r.raise_for_status()
@@ -68,19 +62,58 @@ class AssetManager:
 
         cls.load_fonts()
 
+    # Rendered pixmaps, LRU by (file, color, size, dpr). SVGs used to be re-parsed and
+    # rasterized on every call, i.e. once per file row for the same 24px icon.
+    PIXMAP_CACHE_SIZE = 256
+    DEVICE_PIXEL_RATIO = 2.0 # Retina
+    DISK_CACHE_DIR = None # Set by enable_disk_cache(): rasterized PNGs persist between launches
+    _pixmaps = OrderedDict()
+    cache_stats = {'hits': 0, 'misses': 0, 'disk_hits': 0}
+
     @classmethod
-    def get_pixmap(cls, filename, color=None, size=None):
+    def get_pixmap(cls, filename, color=None, size=None, dpr=None):
+        dpr = dpr or cls.DEVICE_PIXEL_RATIO
+        if size and not isinstance(size, (tuple, list)):
+            size = (size, size)
+        key = (filename, color, tuple(size) if size else None, dpr)
+        pm = cls._pixmaps.get(key)
+        if pm is not None:
+            cls._pixmaps.move_to_end(key)
+            cls.cache_stats['hits'] += 1
+            return pm
+        cls.cache_stats['misses'] += 1
+
         path = cls.get_path(filename)
-        if not os.path.exists(path): return QPixmap()
-        
-        dpr = 2.0 # Retina
-        
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return QPixmap()
+        disk_path = cls._disk_cache_path(key + (mtime,)) # Edited asset files get new entries
+        img = QImage(disk_path) if disk_path and os.path.exists(disk_path) else QImage()
+        if not img.isNull():
+            img.setDevicePixelRatio(dpr)
+            cls.cache_stats['disk_hits'] += 1
+        else:
+            img = cls._render_image(path, filename, color, size, dpr)
+            if img is None:
+                return QPixmap()
+            if disk_path:
+                img.save(disk_path, "PNG")
+
+        pm = QPixmap.fromImage(img)
+        cls._pixmaps[key] = pm
+        while len(cls._pixmaps) > cls.PIXMAP_CACHE_SIZE:
+            cls._pixmaps.popitem(last=False)
+        return pm
+
+    @classmethod
+    def _render_image(cls, path, filename, color, size, dpr):
+        """Rasterizes an SVG (or scales a PNG) at size * dpr and tints it; None if invalid."""
         if filename.endswith(".svg"):
             renderer = QSvgRenderer(path)
-            if not renderer.isValid(): return QPixmap()
+            if not renderer.isValid(): return None
             if size:
-                if isinstance(size, (tuple, list)): w, h = size
-                else: w, h = size, size
+                w, h = size
             else:
                 sz = renderer.defaultSize()
                 w, h = sz.width(), sz.height()
@@ -98,8 +131,7 @@ class AssetManager:
             # PNG
             img = QImage(path)
             if size:
-                if isinstance(size, (tuple, list)): w, h = size
-                else: w, h = size, size
+                w, h = size
                 img = img.scaled(int(w * dpr), int(h * dpr), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
                 img.setDevicePixelRatio(dpr)
 
@@ -109,8 +141,29 @@ class AssetManager:
             painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceIn)
             painter.fillRect(img.rect(), color_obj)
             painter.end()
-            
-        return QPixmap.fromImage(img)
+        return img
+
+    @classmethod
+    def _disk_cache_path(cls, key):
+        if not cls.DISK_CACHE_DIR:
+            return None
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(cls.DISK_CACHE_DIR, f"{os.path.splitext(key[0])[0]}-{digest[:16]}.png")
+
+    @classmethod
+    def enable_disk_cache(cls, directory=None):
+        """Persists rendered pixmaps as PNGs (default: the app's cache location)."""
+        if directory is None:
+            directory = os.path.join(QStandardPaths.writableLocation(
+                QStandardPaths.StandardLocation.CacheLocation), "pixmaps")
+        os.makedirs(directory, exist_ok=True)
+        cls.DISK_CACHE_DIR = directory
+        return directory
+
+    @classmethod
+    def invalidate_pixmaps(cls):
+        """Drops every in-memory pixmap; called on theme changes, when the colors in use change."""
+        cls._pixmaps.clear()
 
     @classmethod
     def get_icon(cls, filename, color=None):
@@ -422,6 +475,7 @@ class AmbiToolboxApp(QMainWindow):
 
     def toggle_theme(self):
         self.is_dark = not self.is_dark
+        AssetManager.invalidate_pixmaps()
         self.title_bar.update_theme_icon()
         self.apply_styles()
 
@@ -0,0 +1,260 @@
+"""Render benchmark suite: load_sofa / prepare / render timings as JSON.
+
+Every case runs in a fresh subprocess, so peak RSS and warm caches belong to that
+case alone. Inputs and SOFA files are synthetic and seeded (gen_test_signal.py,
+gen_test_sofa.py), so two runs on the same machine measure the same work.
+
+    python tests/benchmark_render.py --orders 1-7 --block-sizes 1024,4096 --hrir-lengths 128,512 -o new.json
+    python tests/benchmark_render.py --compare base.json new.json          # exit 1 on regressions
+    python tests/benchmark_render.py --against HEAD~5 --orders 1,3 -o new.json   # also benchmarks that commit
+"""
+import sys
+import os
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(TESTS_DIR)
+DEFAULT_APP_DIR = os.path.join(REPO_DIR, "apps", "Ambix2Bin")
+
+# Metrics compared by --compare (larger is worse), with the smallest absolute change that
+# counts: millisecond timings jitter by more than 10% on a busy machine
+COMPARED = {'load_s': 0.005, 'prepare_s': 0.005, 'render_best_s': 0.01, 'peak_rss_mb': 4.0,
+            'traced_peak_mb': 1.0}
+
+
+def parse_list(spec):
+    """'1-3,5' -> [1, 2, 3, 5]"""
+    values = []
+    for part in str(spec).split(','):
+        if '-' in part:
+            lo, hi = part.split('-')
+            values += list(range(int(lo), int(hi) + 1))
+        elif part.strip():
+            values.append(int(part))
+    return values
+
+
+def case_key(case):
+    return f"order={case['order']} block={case['block_size']} taps={case['taps']}"
+
+
+def run_case(case):
+    """Child-process side: times one configuration and prints its JSON result."""
+    sys.path.insert(0, case['app_dir'])
+    import inspect
+    import numpy as np
+    import tracemalloc
+    import resource
+    from saf_wrapper import SAFRenderer
+
+    renderer = SAFRenderer()
+    renderer.progress_callback = lambda fraction: None
+    devnull = open(os.devnull, 'w')
+    stdout, sys.stdout = sys.stdout, devnull  # Renderer chatter would corrupt the JSON line
+    try:
+        t0 = time.perf_counter()
+        renderer.load_sofa(case['sofa'])
+        load_s = time.perf_counter() - t0
+
+        prepare = []
+        for _ in range(case['repeat']):
+            renderer.current_order = -1
+            t0 = time.perf_counter()
+            renderer.prepare(case['order'])
+            prepare.append(time.perf_counter() - t0)
+
+        out = os.path.join(case['work_dir'], f"out_{os.getpid()}.wav")
+        # Older renderers (--against) have no `order` argument; they decode at the file's
+        # order, which is case['order'] for the synthetic inputs anyway
+        options = {'block_size': case['block_size']}
+        if 'order' in inspect.signature(renderer.render).parameters:
+            options['order'] = case['order']
+        render = []
+        for _ in range(case['repeat']):
+            t0 = time.perf_counter()
+            renderer.render(case['input'], out, **options)
+            render.append(time.perf_counter() - t0)
+
+        # One extra traced run: tracemalloc slows rendering, so it is kept out of the timings
+        blocks_before = sys.getallocatedblocks()
+        tracemalloc.start()
+        renderer.render(case['input'], out, **options)
+        traced_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        leaked_blocks = sys.getallocatedblocks() - blocks_before
+        os.remove(out)
+    finally:
+        sys.stdout = stdout
+        devnull.close()
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss = rss / 2**20 if sys.platform == "darwin" else rss / 2**10
+    render_s = float(np.median(render))
+    result = dict(case, load_s=load_s, prepare_s=float(np.median(prepare)), render_s=render_s,
+                  render_runs=render, render_best_s=min(render), rtf=render_s / case['duration_s'],
+                  peak_rss_mb=rss, traced_peak_mb=traced_peak / 2**20, leaked_blocks=leaked_blocks)
+    for key in ('app_dir', 'work_dir', 'input', 'sofa'):
+        result.pop(key)
+    print(json.dumps(result))
+
+
+def git_commit(app_dir):
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=app_dir, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(args, app_dir=DEFAULT_APP_DIR):
+    sys.path.insert(0, TESTS_DIR)
+    from gen_test_signal import write_ambisonic_signal
+    from gen_test_sofa import generate_sofa
+
+    work_dir = tempfile.mkdtemp(prefix="ambix2bin-bench-")
+    results = []
+    failed = []
+    try:
+        sofas = {taps: generate_sofa(os.path.join(work_dir, f"hrir_{taps}.sofa"), args.directions, taps)
+                 for taps in args.hrir_lengths}
+        for order in args.orders:
+            in_wav = write_ambisonic_signal(os.path.join(work_dir, f"in_o{order}.wav"), order, args.duration,
+                                            seed=order)
+            for taps in args.hrir_lengths:
+                for block_size in args.block_sizes:
+                    case = {'order': order, 'block_size': block_size, 'taps': taps, 'duration_s': args.duration,
+                            'repeat': args.repeat, 'input': in_wav, 'sofa': sofas[taps], 'app_dir': app_dir,
+                            'work_dir': work_dir}
+                    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--run-case", json.dumps(case)],
+                                          capture_output=True, text=True)
+                    if proc.returncode != 0:
+                        print(f"[Bench] FAILED {case_key(case)}\n{proc.stderr}", file=sys.stderr)
+                        failed.append(case_key(case))
+                        continue
+                    result = json.loads(proc.stdout.strip().splitlines()[-1])
+                    print(f"[Bench] {case_key(result):32s} render {result['render_s']:.3f}s "
+                          f"RTF {result['rtf']:.4f}  prepare {result['prepare_s'] * 1e3:.1f}ms  "
+                          f"RSS {result['peak_rss_mb']:.0f}MB", file=sys.stderr)
+                    results.append(result)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'meta': {
+            'commit': git_commit(app_dir),
+            'host': platform.node(),
+            'machine': platform.machine(),
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count(),
+            'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'directions': args.directions,
+        },
+        'cases': results,
+        'failed': failed,
+    }
+
+
+def compare(base, new, threshold=0.10):
+    """Per-case relative change of the COMPARED metrics; returns (rows, regressions)."""
+    base_cases = {case_key(c): c for c in base['cases']}
+    rows, regressions = [], []
+    for case in new['cases']:
+        key = case_key(case)
+        old = base_cases.get(key)
+        if old is None:
+            continue
+        for metric, floor in COMPARED.items():
+            if metric not in old or metric not in case or not old[metric]:
+                continue
+            change = case[metric] / old[metric] - 1.0
+            worse = change > threshold and case[metric] - old[metric] > floor
+            row = (key, metric, old[metric], case[metric], change, worse)
+            rows.append(row)
+            if worse:
+                regressions.append(row)
+    return rows, regressions
+
+
+def print_comparison(base, new, threshold):
+    """Prints the comparison; returns 1 on regressions, failed cases or no cases in common."""
+    rows, regressions = compare(base, new, threshold)
+    print(f"[Bench] {base['meta'].get('commit') or 'base'} -> {new['meta'].get('commit') or 'new'} "
+          f"(threshold {threshold:+.0%})")
+    for key, metric, old, cur, change, worse in rows:
+        if metric in ('render_best_s', 'peak_rss_mb') or worse:
+            flag = "REGRESSION" if worse else ""
+            print(f"  {key:32s} {metric:14s} {old:10.4f} -> {cur:10.4f} {change:+7.1%} {flag}")
+    status = 1 if regressions else 0
+    for name, report in (("base", base), ("new", new)):
+        for key in report.get('failed', []):
+            print(f"[Bench] FAILED in {name}: {key}")
+            status = 1
+    shared = {case_key(c) for c in base['cases']} & {case_key(c) for c in new['cases']}
+    if not shared:
+        print("[Bench] No cases in common: nothing was compared")
+        status = 1
+    print(f"[Bench] {len(regressions)} regression(s) in {len(shared)} shared case(s)")
+    return status
+
+
+def worktree_app_dir(ref, dest):
+    subprocess.run(["git", "worktree", "add", "--detach", dest, ref], cwd=REPO_DIR, check=True,
+                   capture_output=True)
+    return os.path.join(dest, "apps", "Ambix2Bin")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ambix2Bin render benchmark suite")
+    parser.add_argument("--orders", type=parse_list, default=parse_list("1-7"))
+    parser.add_argument("--block-sizes", type=parse_list, default=[1024, 4096, 16384])
+    parser.add_argument("--hrir-lengths", type=parse_list, default=[128, 512])
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds of synthetic input per case")
+    parser.add_argument("--directions", type=int, default=440, help="Directions in the synthetic SOFA")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case (median reported)")
+    parser.add_argument("--output", "-o", help="Write the JSON results here (default: stdout)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="Compare two result files")
+    parser.add_argument("--against", metavar="GIT_REF",
+                        help="Also benchmark this commit (temporary git worktree) and compare")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown flagged as regression")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_case:
+        run_case(json.loads(args.run_case))
+        return 0
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            base = json.load(f)
+        with open(args.compare[1]) as f:
+            new = json.load(f)
+        return print_comparison(base, new, args.threshold)
+
+    report = run_suite(args)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    status = 1 if report['failed'] else 0
+
+    if args.against:
+        dest = tempfile.mkdtemp(prefix="ambix2bin-bench-base-")
+        os.rmdir(dest)
+        try:
+            base = run_suite(args, worktree_app_dir(args.against, dest))
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", dest], cwd=REPO_DIR, capture_output=True)
+        return max(status, print_comparison(base, report, args.threshold))
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""GUI startup benchmark: time to first painted frame and to finished pre-flight checks.
+
+Every run starts the app in a fresh interpreter (offscreen Qt platform unless
+QT_QPA_PLATFORM is set) with its own settings directory, so the first run pays for
+the FFmpeg probe and later runs use the cached result.
+
+    python tests/benchmark_startup.py --runs 5 -o startup.json
+    python tests/benchmark_startup.py --budget-ms 1500      # exit 1 if the warm first frame is slower
+"""
+import sys
+import os
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(os.path.dirname(TESTS_DIR), "apps", "Ambix2Bin")
+DEFAULT_BUDGET_MS = 1500
+
+# Modules that must not be loaded before the first frame
+HEAVY_MODULES = ["scipy", "netCDF4", "soundfile", "saf_wrapper", "saf_async", "scheduling", "qtawesome", "requests"]
+
+CHILD = r"""
+import sys, time, json
+t0 = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+from PyQt6.QtWidgets import QApplication, QMessageBox
+from PyQt6.QtCore import QObject, QEvent, QTimer
+app = QApplication(sys.argv[:1])
+QMessageBox.critical = staticmethod(lambda *a, **k: None)  # No modal dialogs when FFmpeg is missing
+t_qt = time.perf_counter()
+import app_ambix2bin
+t_import = time.perf_counter()
+window = app_ambix2bin.Ambix2Bin()
+t_window = time.perf_counter()
+marks = {}
+
+class FirstPaint(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint and 'first_frame' not in marks:
+            marks['first_frame'] = time.perf_counter()
+            marks['wall'] = time.time()
+            marks['heavy'] = sorted(m for m in HEAVY if m in sys.modules)
+        return False
+
+HEAVY = json.loads(sys.argv[2])
+painter = FirstPaint()
+window.installEventFilter(painter)
+
+def preflight_done(result):
+    marks['preflight'] = time.perf_counter()
+    marks['cached'] = result['ffmpeg_cached']
+    QTimer.singleShot(0, app.quit)
+
+window.preflight_done.connect(preflight_done)
+window.show()
+QTimer.singleShot(int(float(sys.argv[3]) * 1000), app.quit)
+app.exec()
+ms = lambda t: round((t - t0) * 1000, 2) if t is not None else None
+print(json.dumps({'qt_ms': ms(t_qt), 'import_ms': ms(t_import), 'window_ms': ms(t_window),
+                  'first_frame_ms': ms(marks.get('first_frame')), 'preflight_ms': ms(marks.get('preflight')),
+                  'probe_cached': marks.get('cached'), 'first_frame_wall': marks.get('wall'),
+                  'heavy_before_first_frame': marks.get('heavy')}))
+"""
+
+
+def run_once(config_dir, timeout_s=30.0):
+    """One app start; times in ms since interpreter start, plus the process launch time."""
+    env = dict(os.environ, XDG_CONFIG_HOME=config_dir)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    spawned = time.time()
+    proc = subprocess.run([sys.executable, "-c", CHILD, APP_DIR, json.dumps(HEAVY_MODULES), str(timeout_s)],
+                          capture_output=True, text=True, env=env, timeout=timeout_s + 30)
+    lines = [l for l in proc.stdout.splitlines() if l.startswith("{")]
+    if proc.returncode != 0 or not lines:
+        raise RuntimeError(f"Startup run failed ({proc.returncode}): {proc.stderr[-2000:]}")
+    result = json.loads(lines[-1])
+    wall = result.pop('first_frame_wall')
+    result['launch_to_first_frame_ms'] = round((wall - spawned) * 1000, 2) if wall else None
+    return result
+
+
+def run_benchmark(runs=5, timeout_s=30.0):
+    """First run with empty settings (cold probe), then `runs - 1` warm runs; medians of the warm ones."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        results = [run_once(config_dir, timeout_s) for _ in range(max(1, runs))]
+    warm = results[1:] or results
+    keys = ['import_ms', 'window_ms', 'first_frame_ms', 'preflight_ms', 'launch_to_first_frame_ms']
+    median = {k: statistics.median(r[k] for r in warm if r[k] is not None) if any(r[k] is not None for r in warm)
+              else None for k in keys}
+    return {'cold': results[0], 'warm_median': median, 'runs': results,
+            'python': sys.version.split()[0], 'platform': os.environ.get("QT_QPA_PLATFORM", "offscreen")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Ambix2Bin GUI startup time")
+    parser.add_argument("--runs", type=int, default=5, help="App starts (the first one is cold)")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help=f"Fail if the warm launch-to-first-frame median exceeds this (e.g. {DEFAULT_BUDGET_MS})")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds to wait for pre-flight per run")
+    parser.add_argument("-o", "--output", help="Write the JSON result here")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.runs, args.timeout)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+    med = report['warm_median']
+    print(f"[Bench] first frame {med['launch_to_first_frame_ms']} ms after launch "
+          f"(window {med['window_ms']} ms, pre-flight done {med['preflight_ms']} ms; "
+          f"cold pre-flight {report['cold']['preflight_ms']} ms)", file=sys.stderr)
+    heavy = report['cold']['heavy_before_first_frame']
+    if heavy:
+        print(f"[Bench] Heavy modules loaded before the first frame: {', '.join(heavy)}", file=sys.stderr)
+    if args.budget_ms is not None and (med['launch_to_first_frame_ms'] or 0) > args.budget_ms:
+        print(f"[Bench] Over budget: {med['launch_to_first_frame_ms']} ms > {args.budget_ms} ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
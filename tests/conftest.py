@@ -0,0 +1,22 @@
+import sys
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_probe_cache(monkeypatch):
+    """Keeps audio_probe off the user's ~/.cache database and gives each test a fresh shared cache.
+
+    Tests probe temporary files (directly, or through the folder scan, the scheduler and
+    the manifest); their results must neither leak into the real cache nor between tests.
+    Subprocesses started by a test inherit the setting.
+    """
+    monkeypatch.setenv("AMBIX2BIN_PROBE_CACHE", "off")
+    _reset_shared_cache()
+    yield
+    _reset_shared_cache()
+
+
+def _reset_shared_cache():
+    audio_probe = sys.modules.get("audio_probe")  # Imported by the test modules themselves
+    if audio_probe is not None:
+        audio_probe._shared = None
@@ -25,5 +25,26 @@ def generate_test_signal():
     sf.write(output_file, data, fs)
     print(f"Generated {output_file}")
 
+def ambisonic_signal(order, duration=2.0, fs=48000, kind="noise", seed=0, level=0.25):
+    """Synthetic ACN/SN3D test material, (n_frames, (order+1)^2) float32.
+
+    kind="noise": independent Gaussian noise per channel, the same for a given seed.
+    kind="sine":  the 440 Hz W-channel tone of generate_test_signal(), other channels silent.
+    """
+    n = int(fs * duration)
+    n_ch = (order + 1)**2
+    if kind == "sine":
+        data = np.zeros((n, n_ch), dtype=np.float32)
+        data[:, 0] = level * np.sin(2 * np.pi * 440 * np.arange(n) / fs)
+        return data
+    rng = np.random.default_rng(seed)
+    # Higher orders carry less energy in real scenes; keep the mix realistic
+    degree = np.floor(np.sqrt(np.arange(n_ch)))
+    return (rng.standard_normal((n, n_ch)) * level / (1 + degree)).astype(np.float32)
+
+def write_ambisonic_signal(path, order, duration=2.0, fs=48000, kind="noise", seed=0, subtype="FLOAT"):
+    sf.write(path, ambisonic_signal(order, duration, fs, kind, seed), fs, subtype=subtype)
+    return path
+
 if __name__ == "__main__":
     generate_test_signal()
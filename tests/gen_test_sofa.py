@@ -0,0 +1,193 @@
+import sys
+import numpy as np
+import netCDF4
+
+# Lebedev orbit parameters for the supported rules (degree of exactness in the comment)
+LEBEDEV_RULES = {
+    6: ('a1',),                                                # 3
+    14: ('a1', 'a3'),                                          # 5
+    26: ('a1', 'a2', 'a3'),                                    # 7
+    38: ('a1', 'a3', ('c', 0.4597008433809831)),               # 9
+    50: ('a1', 'a2', 'a3', ('b', 0.3015113445777636)),         # 11
+}
+
+
+def fibonacci_grid(n):
+    """n roughly uniform directions as (azimuth, elevation) in degrees."""
+    i = np.arange(n) + 0.5
+    ele = np.rad2deg(np.arcsin(1 - 2 * i / n))
+    azi = np.rad2deg(np.pi * (1 + 5**0.5) * i) % 360.0
+    return azi, ele
+
+
+def _signed_permutations(p):
+    """Every distinct coordinate permutation and sign flip of point p."""
+    from itertools import permutations, product
+    pts = {tuple(s * v for s, v in zip(signs, perm))
+           for perm in permutations(p) for signs in product((1, -1), repeat=3)}
+    return [np.array(q) for q in sorted(pts)]
+
+
+def lebedev_grid(n):
+    """Lebedev rule with n points (6, 14, 26, 38 or 50) as (azimuth, elevation) in degrees."""
+    if n not in LEBEDEV_RULES:
+        raise ValueError(f"Lebedev grids available: {sorted(LEBEDEV_RULES)}")
+    pts = []
+    for orbit in LEBEDEV_RULES[n]:
+        if orbit == 'a1':
+            pts += _signed_permutations((1.0, 0.0, 0.0))
+        elif orbit == 'a2':
+            pts += _signed_permutations((0.0, 2**-0.5, 2**-0.5))
+        elif orbit == 'a3':
+            pts += _signed_permutations((3**-0.5,) * 3)
+        elif orbit[0] == 'b':  # (l, l, m)
+            l = orbit[1]
+            pts += _signed_permutations((l, l, np.sqrt(1 - 2 * l * l)))
+        elif orbit[0] == 'c':  # (p, q, 0)
+            p = orbit[1]
+            pts += _signed_permutations((p, np.sqrt(1 - p * p), 0.0))
+    xyz = np.array(pts)
+    azi = np.rad2deg(np.arctan2(xyz[:, 1], xyz[:, 0])) % 360.0
+    ele = np.rad2deg(np.arcsin(np.clip(xyz[:, 2], -1, 1)))
+    return azi, ele
+
+
+def gaussian_grid(n_ele, n_azi=None):
+    """Gauss-Legendre elevations x equiangular azimuths (default 2 * n_ele), in degrees."""
+    n_azi = n_azi or 2 * n_ele
+    nodes, _ = np.polynomial.legendre.leggauss(n_ele)
+    ele = np.rad2deg(np.arcsin(nodes))
+    azi = np.arange(n_azi) * 360.0 / n_azi
+    return np.tile(azi, n_ele), np.repeat(ele, n_azi)
+
+
+def make_grid(kind, n):
+    """Grid by name; `n` is the point count (fibonacci, lebedev) or the elevation count (gaussian)."""
+    if kind == 'fibonacci':
+        return fibonacci_grid(n)
+    if kind == 'lebedev':
+        return lebedev_grid(n)
+    if kind == 'gaussian':
+        return gaussian_grid(n)
+    raise ValueError(f"Unknown grid '{kind}'")
+
+
+def woodworth_itd(azi_deg, ele_deg, radius=0.0875, c=343.0):
+    """Interaural time difference in seconds, positive when the source is on the left."""
+    azi = np.deg2rad(np.asarray(azi_deg, dtype=float))
+    ele = np.deg2rad(np.asarray(ele_deg, dtype=float))
+    lateral = np.clip(np.sin(azi) * np.cos(ele), -1, 1)
+    return radius / c * (np.arcsin(lateral) + lateral)
+
+
+def synthetic_hrirs(azi_deg, ele_deg, taps=256, fs=48000, seed=0, itd_in_ir=True):
+    """Plausible, deterministic HRIRs (M, 2, taps): ITD, head-shadow ILD and a diffuse tail.
+
+    Not a measured head, but it has the properties the renderer cares about: energy
+    and arrival time depend on direction, and filters have the requested length.
+    With itd_in_ir=False both ears start together and the ITD belongs in Data.Delay.
+    """
+    rng = np.random.default_rng(seed)
+    azi = np.deg2rad(np.asarray(azi_deg, dtype=float))
+    ele = np.deg2rad(np.asarray(ele_deg, dtype=float))
+    lateral = np.sin(azi) * np.cos(ele)  # +1 = fully left
+    itd = woodworth_itd(azi_deg, ele_deg) if itd_in_ir else np.zeros(len(azi))
+    n = np.arange(taps)
+    onset = min(24.0, taps / 4)
+    tail = np.exp(-n / max(2.0, taps / 8))
+    window = np.hanning(2 * taps + 1)[taps + 1:]  # Fading window
+    ir = np.zeros((len(azi), 2, taps), dtype=np.float32)
+    for ear, sign in ((0, 1.0), (1, -1.0)):
+        # Far ear: later and quieter
+        delay = onset + np.maximum(0.0, -sign * itd) * fs
+        gain = 0.5 * (1.25 + 0.75 * sign * lateral)
+        pulse = np.sinc(n[None, :] - delay[:, None]) * window
+        noise = rng.standard_normal((len(azi), taps)) * tail * 0.05
+        ir[:, ear] = (gain[:, None] * (pulse + noise)).astype(np.float32)
+    return ir
+
+
+def write_sofa(path, ir, azi_deg, ele_deg, fs=48000, radius=1.2, delays=None, units="degree"):
+    """Writes a SimpleFreeFieldHRIR SOFA file (netCDF4).
+
+    `delays` is None (a zero (I, R) Data.Delay) or an (M, R) array in samples.
+    `units` is "degree" or "radian" for the SourcePosition angles.
+    """
+    m, r, n = ir.shape
+    if units not in ("degree", "radian"):
+        raise ValueError("units must be 'degree' or 'radian'")
+    angles = np.stack([azi_deg, ele_deg], axis=1).astype(float)
+    if units == "radian":
+        angles = np.deg2rad(angles)
+    with netCDF4.Dataset(path, "w", format="NETCDF4") as ds:
+        ds.Conventions = "SOFA"
+        ds.Version = "2.1"
+        ds.SOFAConventions = "SimpleFreeFieldHRIR"
+        ds.SOFAConventionsVersion = "1.0"
+        ds.DataType = "FIR"
+        ds.RoomType = "free field"
+        ds.Title = "Synthetic HRIR set"
+        ds.APIName = "AmbiToolbox tests"
+        ds.APIVersion = "1.0"
+        ds.AuthorContact = ""
+        ds.Organization = ""
+        ds.License = "No license provided, ask the author for permission"
+        ds.DateCreated = ds.DateModified = "1970-01-01 00:00:00"
+        for dim, size in (("M", m), ("R", r), ("N", n), ("E", 1), ("I", 1), ("C", 3)):
+            ds.createDimension(dim, size)
+
+        def var(name, dims, value, **attrs):
+            v = ds.createVariable(name, "f8", dims)
+            v[:] = value
+            for k, a in attrs.items():
+                v.setncattr(k, a)
+
+        var("ListenerPosition", ("I", "C"), np.zeros((1, 3)), Type="cartesian", Units="metre")
+        var("ListenerUp", ("I", "C"), [[0, 0, 1]])
+        var("ListenerView", ("I", "C"), [[1, 0, 0]])
+        var("ReceiverPosition", ("R", "C", "I"), np.array([[[0], [0.09], [0]], [[0], [-0.09], [0]]])[:r],
+            Type="cartesian", Units="metre")
+        var("SourcePosition", ("M", "C"), np.column_stack([angles, np.full(m, radius)]),
+            Type="spherical", Units=f"{units}, {units}, metre")
+        var("EmitterPosition", ("E", "C", "I"), np.zeros((1, 3, 1)), Type="cartesian", Units="metre")
+        var("Data.IR", ("M", "R", "N"), ir)
+        var("Data.SamplingRate", ("I",), [fs], Units="hertz")
+        var("Data.Delay", ("M", "R") if delays is not None else ("I", "R"),
+            delays if delays is not None else np.zeros((1, r)))
+    return path
+
+
+def generate_sofa(path, n_dirs=440, taps=256, fs=48000, seed=0, grid="fibonacci", units="degree",
+                  delays=False):
+    """Synthetic SOFA file; the same arguments give the same file contents.
+
+    `grid` is fibonacci (n_dirs points), lebedev (n_dirs in 6/14/26/38/50) or gaussian
+    (n_dirs elevation rings). With `delays`, the ITD moves from the IRs into an (M, R)
+    Data.Delay variable in samples, as in measured sets with removed onsets.
+    10k directions at 256 taps write in well under a second.
+    """
+    azi, ele = make_grid(grid, n_dirs)
+    ir = synthetic_hrirs(azi, ele, taps, fs, seed, itd_in_ir=not delays)
+    delay = None
+    if delays:
+        itd = woodworth_itd(azi, ele) * fs
+        delay = np.stack([np.maximum(0.0, -itd), np.maximum(0.0, itd)], axis=1)
+    return write_sofa(path, ir, azi, ele, fs, delays=delay, units=units)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write a synthetic SOFA (SimpleFreeFieldHRIR) file")
+    parser.add_argument("output", nargs="?", default="synthetic.sofa")
+    parser.add_argument("--grid", choices=["fibonacci", "lebedev", "gaussian"], default="fibonacci")
+    parser.add_argument("--directions", "-n", type=int, default=440,
+                        help="Points (fibonacci/lebedev) or elevation rings (gaussian)")
+    parser.add_argument("--taps", type=int, default=256, help="IR length")
+    parser.add_argument("--fs", type=int, default=48000)
+    parser.add_argument("--units", choices=["degree", "radian"], default="degree")
+    parser.add_argument("--delays", action="store_true", help="Store the ITD in Data.Delay instead of the IRs")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate_sofa(args.output, args.directions, args.taps, args.fs, args.seed, args.grid, args.units, args.delays)
+    print(f"Generated {args.output}")
@@ -0,0 +1,287 @@
+"""Golden-output harness: every render path against the reference SAFRenderer.render().
+
+Fixed synthetic scenes are rendered once through render() in its default two-pass
+peak mode (the golden output), then through each faster path in MODES. Every
+result is compared at its own output level with per-mode tolerances: max
+abs error, SNR, and the interaural level/time difference of each encoded source
+direction. Everything is generated in memory and uses the bundled HRIR set, so
+it runs offline in the test suite (test_golden_render.py).
+
+    python tests/golden_render.py                  # error table for all scenes and modes
+    python tests/golden_render.py --modes stream,limit --scenes directions
+"""
+import sys
+import os
+import argparse
+import tempfile
+import numpy as np
+import soundfile as sf
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(TESTS_DIR, "..", "apps", "Ambix2Bin"))
+sys.path.append(TESTS_DIR)
+
+from saf_wrapper import SAFRenderer
+from saf_stream import StreamingBinauralRenderer, run_offline_harness
+from sh_rotation import HeadTrajectory
+from gen_test_signal import ambisonic_signal
+
+SOFA_PATH = os.path.join(TESTS_DIR, "..", "apps", "Ambix2Bin", "assets", "hrtf", "HRIR_L2702.sofa")
+FS = 48000
+LSB = 1.0 / 32768  # File renders are written as 16-bit PCM
+
+# Source directions (azimuth, elevation in degrees): the eight points of
+# debug_rotation_sweep.py, then straight up
+SWEEP_DIRECTIONS = [(a, 0.0) for a in range(0, 360, 45)] + [(0.0, 90.0)]
+
+
+def encoder_check(renderer):
+    """The SN3D/ACN basis the scenes are encoded with (same expectations as test_math.py)."""
+    Y = renderer._compute_sn3d_sh(1, np.array([0, np.pi / 2, 0]), np.array([0, 0, np.pi / 2]))
+    expected = [[1, 0, 0, 1],  # Front: W, X
+                [1, 1, 0, 0],  # Left: W, Y
+                [1, 0, 1, 0]]  # Up: W, Z
+    return np.allclose(Y, expected, atol=1e-4)
+
+
+def directions_scene(renderer, order=3, burst_s=0.25, level=0.5, seed=0):
+    """Noise bursts encoded at SWEEP_DIRECTIONS, one after the other.
+
+    Returns the (n, n_sh) signal and one (azi, ele, start, end) segment per burst.
+    """
+    rng = np.random.default_rng(seed)
+    n = int(FS * burst_s)
+    window = np.hanning(n)
+    chunks, segments = [], []
+    for i, (azi, ele) in enumerate(SWEEP_DIRECTIONS):
+        Y = renderer._compute_sn3d_sh(order, np.deg2rad([azi]), np.deg2rad([ele]))[0]
+        chunks.append(np.outer(rng.standard_normal(n) * window * level, Y))
+        segments.append((azi, ele, i * n, (i + 1) * n))
+    return np.vstack(chunks).astype(np.float32), segments
+
+
+def diffuse_scene(renderer, order=1, duration=1.0, seed=1):
+    """Independent noise per channel (gen_test_signal.ambisonic_signal), loud enough to normalize."""
+    return ambisonic_signal(order, duration, FS, seed=seed, level=0.6), []
+
+
+def transient_scene(renderer, order=2, duration=1.0, seed=2, level=1.0):
+    """Quiet noise with one loud burst from the left: drives normalization and the limiter."""
+    rng = np.random.default_rng(seed)
+    x = ambisonic_signal(order, duration, FS, seed=seed, level=0.05)
+    start, n = int(0.6 * FS), 480
+    Y = renderer._compute_sn3d_sh(order, np.deg2rad([90.0]), np.array([0.0]))[0]
+    x[start:start + n] += np.outer(rng.standard_normal(n) * np.hanning(n) * level, Y).astype(np.float32)
+    return x, [(90.0, 0.0, start - 2400, start + 2400)]
+
+
+SCENES = {
+    'directions': directions_scene,
+    'diffuse': diffuse_scene,
+    'transient': transient_scene,
+}
+
+
+def interaural(y, fs=FS, max_itd_s=0.001):
+    """(ILD in dB, ITD in seconds) of a binaural segment; both positive towards the left.
+
+    The ITD is the lag of the interaural cross-correlation peak within +/- max_itd_s.
+    """
+    left, right = y[:, 0].astype(np.float64), y[:, 1].astype(np.float64)
+    ild = 10 * np.log10((np.sum(left**2) + 1e-20) / (np.sum(right**2) + 1e-20))
+    n_fft = 2 ** int(np.ceil(np.log2(2 * len(left))))
+    xc = np.fft.irfft(np.conj(np.fft.rfft(left, n_fft)) * np.fft.rfft(right, n_fft), n_fft)
+    max_lag = int(max_itd_s * fs)
+    lags = np.arange(-max_lag, max_lag + 1)
+    return ild, lags[np.argmax(xc[lags])] / fs
+
+
+def measure(ref, out, segments, fs=FS, gain=1.0):
+    """Errors of `out` against the golden `ref` scaled by `gain` (the level `out` was rendered at)."""
+    lengths = (len(ref), len(out))
+    n = min(lengths)
+    ref, out = ref[:n].astype(np.float64) * gain, out[:n].astype(np.float64)
+    err = out - ref
+    noise = np.sum(err**2)
+    result = {
+        'samples': lengths,
+        'max_abs': float(np.max(np.abs(err))) if n else 0.0,
+        'snr_db': float(10 * np.log10(np.sum(ref**2) / noise)) if noise > 0 else float('inf'),
+        'ild_db': 0.0,
+        'itd_us': 0.0,
+    }
+    for azi, ele, start, end in segments:
+        ild_r, itd_r = interaural(ref[start:end], fs)
+        ild_o, itd_o = interaural(out[start:end], fs)
+        result['ild_db'] = max(result['ild_db'], abs(ild_o - ild_r))
+        result['itd_us'] = max(result['itd_us'], abs(itd_o - itd_r) * 1e6)
+    return result
+
+
+def _db(gain_db):
+    return 10.0 ** (gain_db / 20.0)
+
+
+# Each mode renders `x` and returns (output, gain of the output relative to the golden
+# render). Comparing at the mode's own level keeps its 16-bit rounding at face value.
+# `ctx` holds the renderer, the input file, a scratch output path and the golden stats.
+
+def _read(path):
+    return sf.read(path, dtype='float32')[0]
+
+
+def mode_block_size(ctx, x):
+    ctx['renderer'].render(ctx['input'], ctx['out'], block_size=1024)
+    return _read(ctx['out']), 1.0
+
+
+def mode_render_array(ctx, x):
+    return ctx['renderer'].render_array(x, FS), 1.0
+
+
+def mode_render_blocks(ctx, x):
+    blocks = (x[i:i + 1000] for i in range(0, len(x), 1000))
+    gain = _db(ctx['golden']['gain_db'])
+    return np.concatenate(list(ctx['renderer'].render_blocks(blocks, FS, gain=gain))), 1.0
+
+
+def mode_stream(ctx, x):
+    stream = StreamingBinauralRenderer(ctx['renderer'].sh_hrtfs, block_size=512)
+    y, _ = run_offline_harness(stream, x, host_block=256, fs=FS)
+    return y * _db(ctx['golden']['gain_db']), 1.0
+
+
+def mode_orientations(ctx, x):
+    ctx['renderer'].render_orientations(ctx['input'], [ctx['out']], [(0.0, 0.0, 0.0)])
+    return _read(ctx['out']), 1.0
+
+
+def mode_head_tracked(ctx, x):
+    still = HeadTrajectory([0.0, len(x) / FS], [0.0, 0.0])
+    ctx['renderer'].render(ctx['input'], ctx['out'], trajectory=still)
+    return _read(ctx['out']), 1.0
+
+
+def mode_bound(ctx, x):
+    stats = ctx['renderer'].render(ctx['input'], ctx['out'], gain_mode="bound")
+    return _read(ctx['out']), _db(stats['gain_db'] - ctx['golden']['gain_db'])
+
+
+def mode_limit(ctx, x):
+    stats = ctx['renderer'].render(ctx['input'], ctx['out'], gain_mode="limit")
+    return _read(ctx['out']), _db(stats['gain_db'] - ctx['golden']['gain_db'])
+
+
+# Per-mode tolerances. Lossless paths differ from the golden file by 16-bit rounding
+# only (in-memory outputs are never quantized, so up to one LSB each way); their SNR
+# floor is that rounding against the quiet parts of a scene. Bound mode rounds at a
+# lower level, so the same LSB costs more SNR. The limiter changes loud passages on
+# purpose: it is held to the signal as a whole and to the source directions only.
+LOSSLESS = {'max_abs': 1.5 * LSB, 'snr_db': 55.0, 'ild_db': 0.01, 'itd_us': 0.0}
+TOLERANCES = {
+    'block_size': LOSSLESS,
+    'render_array': LOSSLESS,
+    'render_blocks': LOSSLESS,
+    'stream': LOSSLESS,
+    'orientations': LOSSLESS,
+    'head_tracked': LOSSLESS,
+    'bound': {'max_abs': 1.5 * LSB, 'snr_db': 40.0, 'ild_db': 0.01, 'itd_us': 0.0},
+    'limit': {'max_abs': 1.0, 'snr_db': 6.0, 'ild_db': 1.0, 'itd_us': 21.0},
+}
+
+MODES = {
+    'block_size': mode_block_size,
+    'render_array': mode_render_array,
+    'render_blocks': mode_render_blocks,
+    'stream': mode_stream,
+    'orientations': mode_orientations,
+    'head_tracked': mode_head_tracked,
+    'bound': mode_bound,
+    'limit': mode_limit,
+}
+
+
+def check(result, tolerance):
+    """Names of the metrics outside `tolerance` (an empty list means the mode passes)."""
+    failed = []
+    if result['samples'][0] != result['samples'][1]:
+        failed.append('samples')
+    for metric in ('max_abs', 'ild_db', 'itd_us'):
+        if result[metric] > tolerance[metric] + 1e-12:
+            failed.append(metric)
+    if result['snr_db'] < tolerance['snr_db']:
+        failed.append('snr_db')
+    return failed
+
+
+def golden_directions(golden, segments):
+    """Sanity of the golden render itself: sources on the left/right lead and are louder there."""
+    problems = []
+    for azi, ele, start, end in segments:
+        ild, itd = interaural(golden[start:end])
+        side = np.sin(np.deg2rad(azi)) * np.cos(np.deg2rad(ele))
+        if side > 0.5 and not (ild > 3.0 and itd > 0):
+            problems.append(f"source at {azi:.0f} deg not on the left (ILD {ild:.1f} dB, ITD {itd * 1e6:.0f} us)")
+        elif side < -0.5 and not (ild < -3.0 and itd < 0):
+            problems.append(f"source at {azi:.0f} deg not on the right (ILD {ild:.1f} dB, ITD {itd * 1e6:.0f} us)")
+        elif abs(side) < 0.1 and abs(ild) > 3.0:
+            problems.append(f"median-plane source at {azi:.0f}/{ele:.0f} deg is lateralized (ILD {ild:.1f} dB)")
+    return problems
+
+
+def run(sofa_path=SOFA_PATH, scenes=None, modes=None):
+    """Renders every scene through every mode; returns one row dict per (scene, mode).
+
+    Rows carry the measured errors, the tolerance and the list of `failed` metrics.
+    The golden render's own direction problems are reported as mode 'golden'.
+    """
+    renderer = SAFRenderer()
+    renderer.progress_callback = lambda fraction: None
+    renderer.load_sofa(sofa_path)
+    if not encoder_check(renderer):
+        raise AssertionError("SN3D encoder does not match the ACN front/left/up basis")
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for scene in scenes or SCENES:
+            x, segments = SCENES[scene](renderer)
+            ctx = {'renderer': renderer, 'input': os.path.join(tmp, f"{scene}.wav"),
+                   'out': os.path.join(tmp, f"{scene}_out.wav")}
+            sf.write(ctx['input'], x, FS, subtype="FLOAT")
+            ctx['golden'] = renderer.render(ctx['input'], os.path.join(tmp, f"{scene}_golden.wav"))
+            golden = _read(os.path.join(tmp, f"{scene}_golden.wav"))
+            rows.append({'scene': scene, 'mode': 'golden', 'failed': golden_directions(golden, segments)})
+            for mode in modes or MODES:
+                out, gain = MODES[mode](ctx, x)
+                result = measure(golden, out, segments, gain=gain)
+                tolerance = TOLERANCES[mode]
+                rows.append(dict(result, scene=scene, mode=mode, tolerance=tolerance,
+                                 failed=check(result, tolerance)))
+    return rows
+
+
+def print_rows(rows):
+    print(f"{'scene':<11} {'mode':<13} {'max abs':>9} {'SNR dB':>7} {'dILD dB':>8} {'dITD us':>8}")
+    for row in rows:
+        if row['mode'] == 'golden':
+            for problem in row['failed']:
+                print(f"{row['scene']:<11} {'golden':<13} {problem}")
+            continue
+        flag = "FAIL " + ",".join(row['failed']) if row['failed'] else ""
+        print(f"{row['scene']:<11} {row['mode']:<13} {row['max_abs'] * 32768:7.2f}LSB {row['snr_db']:7.1f} "
+              f"{row['ild_db']:8.3f} {row['itd_us']:8.1f} {flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare every render path against the golden render()")
+    parser.add_argument("--sofa", default=SOFA_PATH)
+    parser.add_argument("--scenes", help=f"Comma-separated subset of {','.join(SCENES)}")
+    parser.add_argument("--modes", help=f"Comma-separated subset of {','.join(MODES)}")
+    args = parser.parse_args(argv)
+    rows = run(args.sofa, args.scenes and args.scenes.split(','), args.modes and args.modes.split(','))
+    print_rows(rows)
+    return 1 if any(row['failed'] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import sys
+import os
+import tempfile
+
+# Add src (common_ui) to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+from common_ui import AssetManager, AmbiToolboxApp
+
+app = QApplication.instance() or QApplication([])
+
+
+def _reset():
+    AssetManager.invalidate_pixmaps()
+    AssetManager.DISK_CACHE_DIR = None
+    for k in AssetManager.cache_stats:
+        AssetManager.cache_stats[k] = 0
+
+
+def test_pixmap_cache_hits():
+    print("Testing pixmap cache...")
+    _reset()
+    first = AssetManager.get_pixmap("ic_music.svg", color="#888888", size=24)
+    assert not first.isNull() and first.width() == 48 and first.devicePixelRatio() == 2.0
+    for _ in range(100):
+        again = AssetManager.get_pixmap("ic_music.svg", color="#888888", size=24)
+    assert again.cacheKey() == first.cacheKey()
+    assert AssetManager.cache_stats == {'hits': 100, 'misses': 1, 'disk_hits': 0}
+
+    # Every key part gives its own entry
+    assert AssetManager.get_pixmap("ic_music.svg", color="#2ecc71", size=24).cacheKey() != first.cacheKey()
+    assert AssetManager.get_pixmap("ic_music.svg", color="#888888", size=32).width() == 64
+    assert AssetManager.get_pixmap("ic_music.svg", color="#888888", size=24, dpr=1.0).width() == 24
+    assert AssetManager.cache_stats['misses'] == 4
+    assert AssetManager.get_pixmap("no_such_icon.svg").isNull()
+    print("PASS: Pixmap cache")
+
+
+def test_pixmap_cache_lru_and_theme_invalidation():
+    print("Testing pixmap LRU eviction and theme invalidation...")
+    _reset()
+    size = AssetManager.PIXMAP_CACHE_SIZE
+    AssetManager.PIXMAP_CACHE_SIZE = 3
+    try:
+        for px in (10, 11, 12):
+            AssetManager.get_pixmap("ic_check.svg", size=px)
+        AssetManager.get_pixmap("ic_check.svg", size=10)  # Most recently used now
+        AssetManager.get_pixmap("ic_check.svg", size=13)  # Evicts size 11
+        assert len(AssetManager._pixmaps) == 3
+        misses = AssetManager.cache_stats['misses']
+        AssetManager.get_pixmap("ic_check.svg", size=10)
+        assert AssetManager.cache_stats['misses'] == misses
+        AssetManager.get_pixmap("ic_check.svg", size=11)
+        assert AssetManager.cache_stats['misses'] == misses + 1
+    finally:
+        AssetManager.PIXMAP_CACHE_SIZE = size
+
+    window = AmbiToolboxApp("Test", "#2ecc71")
+    assert len(AssetManager._pixmaps) > 0
+    window.toggle_theme()
+    # Only the icons of the new theme are cached again
+    colors = {key[1] for key in AssetManager._pixmaps}
+    assert colors == {"#333333"}, colors
+    window.close()
+    print("PASS: Pixmap LRU eviction and theme invalidation")
+
+
+def test_pixmap_disk_cache():
+    print("Testing persistent pixmap cache...")
+    _reset()
+    with tempfile.TemporaryDirectory() as tmp:
+        AssetManager.enable_disk_cache(tmp)
+        rendered = AssetManager.get_pixmap("ic_error.svg", color="#e74c3c", size=24).toImage()
+        assert len(os.listdir(tmp)) == 1
+        AssetManager.invalidate_pixmaps()  # As in a new launch
+        loaded = AssetManager.get_pixmap("ic_error.svg", color="#e74c3c", size=24)
+        assert AssetManager.cache_stats['disk_hits'] == 1
+        assert loaded.devicePixelRatio() == 2.0 and loaded.toImage() == rendered
+        AssetManager.DISK_CACHE_DIR = None
+    print("PASS: Persistent pixmap cache")
+
+
+if __name__ == "__main__":
+    test_pixmap_cache_hits()
+    test_pixmap_cache_lru_and_theme_invalidation()
+    test_pixmap_disk_cache()
@@ -0,0 +1,125 @@
+import sys
+import os
+import time
+import asyncio
+import tempfile
+import numpy as np
+import soundfile as sf
+
+# Add Ambix2Bin to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin"))
+
+from saf_async import AsyncRenderService
+
+SOFA_PATH = os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin", "assets", "hrtf", "HRIR_L2702.sofa")
+
+
+def _write_input(path, n_frames, n_ch=4, seed=0):
+    rng = np.random.default_rng(seed)
+    sf.write(path, (rng.standard_normal((n_frames, n_ch)) * 0.1).astype(np.float32), 48000, subtype="FLOAT")
+
+
+def test_async_jobs_report_progress():
+    print("Testing AsyncRenderService jobs and progress...")
+
+    async def main(tmp):
+        async with AsyncRenderService(max_concurrency=2) as service:
+            jobs = []
+            for i in range(3):
+                in_wav = os.path.join(tmp, f"in_{i}.wav")
+                _write_input(in_wav, 48000, seed=i)
+                jobs.append(service.submit(in_wav, os.path.join(tmp, f"out_{i}.wav"), SOFA_PATH, block_size=2048))
+
+            progress = [p async for p in jobs[0].progress()]
+            results = await asyncio.gather(*jobs)
+            return jobs, progress, results
+
+    with tempfile.TemporaryDirectory() as tmp:
+        jobs, progress, results = asyncio.run(main(tmp))
+        assert all(os.path.exists(r) for r in results)
+        assert progress and progress[-1] == 1.0 and progress == sorted(progress)
+        assert all(j.status == "done" for j in jobs)
+    print("PASS: Async Jobs")
+
+
+def test_async_cancel_running_job():
+    print("Testing cancellation of a running job...")
+
+    async def main(tmp):
+        in_wav = os.path.join(tmp, "long.wav")
+        _write_input(in_wav, 48000 * 20, n_ch=16)
+        async with AsyncRenderService(max_concurrency=1) as service:
+            job = service.submit(in_wav, os.path.join(tmp, "long_out.wav"), SOFA_PATH, block_size=1024)
+            queued = service.submit(in_wav, os.path.join(tmp, "never.wav"), SOFA_PATH)
+            async for p in job.progress():
+                if p > 0:
+                    job.cancel()
+                    queued.cancel()
+            for j in (job, queued):
+                try:
+                    await j
+                except asyncio.CancelledError:
+                    pass
+            return job, queued
+
+    with tempfile.TemporaryDirectory() as tmp:
+        job, queued = asyncio.run(main(tmp))
+        assert job.status == "cancelled" and job.last_progress < 1.0
+        assert queued.status == "cancelled"
+    print("PASS: Async Cancel")
+
+
+def test_async_cancel_while_starting():
+    print("Testing cancellation while a process job starts...")
+
+    async def main(tmp):
+        in_wav = os.path.join(tmp, "in.wav")
+        _write_input(in_wav, 48000 * 5)
+        async with AsyncRenderService(max_concurrency=1, executor="process") as service:
+            make_event = service._manager.Event
+            service._manager.Event = lambda: (time.sleep(0.3), make_event())[1]  # Widen the window
+            job = service.submit(in_wav, os.path.join(tmp, "out.wav"), SOFA_PATH, block_size=1024)
+            while job.status != "running":
+                await asyncio.sleep(0.01)
+            assert job._cancel_event is None
+            job.cancel()
+            try:
+                await job
+            except asyncio.CancelledError:
+                pass
+            return job
+
+    with tempfile.TemporaryDirectory() as tmp:
+        job = asyncio.run(main(tmp))
+        assert job.status == "cancelled", job.status
+    print("PASS: Cancel while starting")
+
+
+def test_async_finished_jobs_leave_table():
+    print("Testing that finished jobs leave the service's job table...")
+
+    async def main(tmp):
+        in_wav = os.path.join(tmp, "in.wav")
+        _write_input(in_wav, 4800)
+        async with AsyncRenderService(max_concurrency=2) as service:
+            jobs = [service.submit(in_wav, os.path.join(tmp, f"out_{i}.wav"), SOFA_PATH) for i in range(6)]
+            jobs.append(service.submit(os.path.join(tmp, "missing.wav"), os.path.join(tmp, "x.wav"), SOFA_PATH))
+            jobs.append(service.submit(in_wav, os.path.join(tmp, "never.wav"), SOFA_PATH, priority=9))
+            assert len(service.jobs) == 8
+            jobs[-1].cancel()
+            await asyncio.gather(*jobs, return_exceptions=True)
+            assert [p async for p in jobs[-1].progress()] == []  # Ends although the job never started
+            return jobs, dict(service.jobs)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        jobs, remaining = asyncio.run(main(tmp))
+        assert [j.status for j in jobs] == ["done"] * 6 + ["failed", "cancelled"]
+        assert remaining == {}, remaining
+    print("PASS: Finished jobs leave the job table")
+
+
+if __name__ == "__main__":
+    test_async_jobs_report_progress()
+    test_async_cancel_running_job()
+    test_async_cancel_while_starting()
+    test_async_finished_jobs_leave_table()
@@ -0,0 +1,175 @@
+import sys
+import os
+import json
+import stat
+import struct
+import tempfile
+import numpy as np
+import soundfile as sf
+
+# Add Ambix2Bin to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin"))
+
+import audio_probe
+from audio_probe import probe_file, read_wav_header, ProbeCache, describe
+from saf_wrapper import header_channel_peaks, scan_channel_peaks
+from incremental import RenderManifest
+
+B_FORMAT_PCM = bytes.fromhex("01000000" "2107" "d311" "8644c8c1ca000000")
+
+
+def _wav(path, channels, frames, extensible_guid=None, chunks=()):
+    """Hand-built 16-bit WAVE file: optional WAVE_FORMAT_EXTENSIBLE subformat and extra chunks before 'data'."""
+    block = 2 * channels
+    if extensible_guid is None:
+        fmt = struct.pack('<HHIIHH', 1, channels, 48000, 48000 * block, block, 16)
+    else:
+        fmt = struct.pack('<HHIIHHHHI', 0xFFFE, channels, 48000, 48000 * block, block, 16, 22, 16, 0) + extensible_guid
+    body = b'WAVE' + b'fmt ' + struct.pack('<I', len(fmt)) + fmt
+    for chunk_id, payload in chunks:
+        body += chunk_id + struct.pack('<I', len(payload)) + payload + b'\0' * (len(payload) & 1)
+    data = bytes(frames * block)
+    body += b'data' + struct.pack('<I', len(data)) + data
+    with open(path, 'wb') as f:
+        f.write(b'RIFF' + struct.pack('<I', len(body)) + body)
+
+
+def test_wav_header_fields():
+    print("Testing WAV/RF64 header probe...")
+    with tempfile.TemporaryDirectory() as tmp:
+        x = np.zeros((4800, 16), dtype=np.float32)
+        x[100, 3] = 0.5
+        x[200, 15] = -0.75
+        toa = os.path.join(tmp, "toa.wav")
+        sf.write(toa, x, 48000, subtype='FLOAT')
+        info = probe_file(toa)
+        assert (info['channels'], info['samplerate'], info['frames'], info['order']) == (16, 48000, 4800, 3)
+        assert info['codec'] == 'float' and info['source'] == 'header' and abs(info['duration_s'] - 0.1) < 1e-12
+        assert info['peaks'][3] == 0.5 and info['peaks'][15] == 0.75 and info['peak'] == 0.75
+        assert (info['ordering'], info['normalization'], info['convention_source']) == ("ACN", "SN3D", "default")
+
+        pcm = os.path.join(tmp, "foa.wav")
+        sf.write(pcm, x[:, :4], 44100, subtype='PCM_24')
+        info = probe_file(pcm)
+        assert (info['channels'], info['samplerate'], info['frames'], info['bits']) == (4, 44100, 4800, 24)
+        assert info['peaks'] is None and info['peak'] is None  # No PEAK chunk in PCM files
+
+        rf64 = os.path.join(tmp, "foa_rf64.wav")
+        sf.write(rf64, x[:, :9], 48000, format='RF64', subtype='FLOAT')
+        info = probe_file(rf64)
+        assert info['container'] == 'rf64' and info['frames'] == sf.info(rf64).frames == 4800 and info['order'] == 2
+
+        # A recording still being written: data size larger than the file
+        with open(pcm, 'r+b') as f:
+            f.truncate(os.path.getsize(pcm) - 12 * 100 - 6)
+        assert probe_file(pcm)['frames'] == 4800 - 101
+
+        stereo = os.path.join(tmp, "stereo.wav")
+        sf.write(stereo, x[:, :2], 48000)
+        info = probe_file(stereo)
+        assert info['order'] is None and info['ordering'] is None
+
+        # Convention hints: B-format GUID, metadata text, .amb extension
+        bformat = os.path.join(tmp, "bformat.wav")
+        _wav(bformat, 4, 10, extensible_guid=B_FORMAT_PCM)
+        info = probe_file(bformat)
+        assert (info['ordering'], info['normalization'], info['convention_source']) == ("FuMa", "FuMa", "format")
+        assert info['frames'] == 10 and info['codec'] == 'pcm'
+        tagged = os.path.join(tmp, "tagged.wav")
+        _wav(tagged, 9, 10, chunks=[(b'LIST', b'INFOICMT\x0c\x00\x00\x00ACN / N3D\x00\x00\x00')])
+        info = probe_file(tagged)
+        assert (info['ordering'], info['normalization'], info['convention_source']) == ("ACN", "N3D", "metadata")
+        amb = os.path.join(tmp, "take.amb")
+        _wav(amb, 4, 10)
+        assert (probe_file(amb)['ordering'], probe_file(amb)['convention_source']) == ("FuMa", "extension")
+        assert describe(probe_file(toa)) == "3rd order AmbiX (ACN/SN3D), 16 ch, 48 kHz, 0:00"
+
+        broken = os.path.join(tmp, "broken.wav")
+        with open(broken, "w") as f:
+            f.write("not audio")
+        assert read_wav_header(broken) is None and probe_file(broken) is None
+    print("PASS: WAV/RF64 header probe")
+
+
+def test_other_containers():
+    print("Testing ffprobe and libsndfile fallbacks...")
+    with tempfile.TemporaryDirectory() as tmp:
+        opus = os.path.join(tmp, "foa.opus")
+        open(opus, "wb").close()
+        ffprobe = os.path.join(tmp, "ffprobe")
+        doc = {"streams": [{"codec_name": "opus", "channels": 4, "sample_rate": "48000", "time_base": "1/48000",
+                            "duration_ts": 96000}], "format": {"format_name": "ogg", "tags": {"comment": "AmbiX"}}}
+        with open(ffprobe, "w") as f:
+            f.write(f"#!/bin/sh\ncat <<'EOF'\n{json.dumps(doc)}\nEOF\n")
+        os.chmod(ffprobe, os.stat(ffprobe).st_mode | stat.S_IEXEC)
+        info = probe_file(opus, ffprobe=ffprobe)
+        assert info['source'] == 'ffprobe' and (info['channels'], info['frames'], info['order']) == (4, 96000, 1)
+        assert info['duration_s'] == 2.0 and info['convention_source'] == "metadata"
+
+        # No ffprobe: libsndfile reads the CAF header
+        caf = os.path.join(tmp, "toa.caf")
+        sf.write(caf, np.zeros((480, 16), dtype=np.float32), 48000, format='CAF', subtype='FLOAT')
+        info = probe_file(caf, ffprobe=os.path.join(tmp, "no-ffprobe"))
+        assert info['source'] == 'soundfile' and (info['channels'], info['frames'], info['order']) == (16, 480, 3)
+        assert probe_file(opus, ffprobe=os.path.join(tmp, "no-ffprobe")) is None
+    print("PASS: ffprobe and libsndfile fallbacks")
+
+
+def test_probe_cache():
+    print("Testing persistent probe cache...")
+    reads = []
+    real = audio_probe.probe_file
+    audio_probe.probe_file = lambda path, ffprobe=None: (reads.append(path), real(path, ffprobe))[1]
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = os.path.join(tmp, "cache", "probe.sqlite")
+            wav = os.path.join(tmp, "foa.wav")
+            sf.write(wav, np.zeros((480, 4), dtype=np.float32), 48000)
+            broken = os.path.join(tmp, "broken.wav")
+            with open(broken, "w") as f:
+                f.write("not audio")
+
+            with ProbeCache(db) as cache:
+                assert cache.peek(wav) is None
+                first = cache.get(wav)
+                assert cache.get(wav) == first and cache.peek(wav) == first
+                assert cache.get(broken) is None and cache.get(broken) is None  # Unreadable is cached too
+                assert cache.get(os.path.join(tmp, "missing.wav")) is None
+                assert len(reads) == 2 and cache.stats == {'hits': 2, 'misses': 2}
+
+            # A new process: served from sqlite without reading the files
+            with ProbeCache(db) as cache:
+                assert cache.get(wav) == first and cache.get(broken) is None
+                assert len(reads) == 2
+
+                # Size or mtime change: read again
+                sf.write(wav, np.zeros((960, 4), dtype=np.float32), 48000)
+                assert cache.get(wav)['frames'] == 960 and len(reads) == 3
+    finally:
+        audio_probe.probe_file = real
+    print("PASS: Persistent probe cache")
+
+
+def test_consumers_reuse_probe():
+    print("Testing PEAK chunk peaks and the manifest's effective order...")
+    with tempfile.TemporaryDirectory() as tmp:
+        x = np.random.default_rng(0).uniform(-0.5, 0.5, (4096, 9)).astype(np.float32)
+        wav = os.path.join(tmp, "soa.wav")
+        sf.write(wav, x, 48000, subtype='FLOAT')
+        assert np.array_equal(header_channel_peaks(wav), scan_channel_peaks(wav))
+        sf.write(wav, x, 48000, subtype='PCM_16')
+        assert header_channel_peaks(wav) is None
+
+        job = {'input': wav, 'output': os.path.join(tmp, "out.wav"), 'mode': 'binaural', 'sofa': None}
+        with RenderManifest(os.path.join(tmp, "m.sqlite")) as manifest:
+            default = manifest.fingerprint(job, 4096)
+            assert manifest.fingerprint(dict(job, order=2), 4096) == default
+            assert manifest.fingerprint(dict(job, order=1), 4096) != default
+    print("PASS: PEAK chunk peaks and the manifest's effective order")
+
+
+if __name__ == "__main__":
+    test_wav_header_fields()
+    test_other_containers()
+    test_probe_cache()
+    test_consumers_reuse_probe()
@@ -0,0 +1,142 @@
+import sys
+import os
+import json
+import tempfile
+import numpy as np
+import soundfile as sf
+
+# Add Ambix2Bin to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin"))
+
+from saf_wrapper import SAFRenderer
+from audio_files import scan_audio_files, unique_output_path
+import batch_render
+from incremental import RenderManifest
+
+SOFA_PATH = os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin", "assets", "hrtf", "HRIR_L2702.sofa")
+
+
+def test_scan_and_unique_paths():
+    print("Testing shared file scan helper...")
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "sub"))
+        for name in ("b.wav", "a.AMB", "notes.txt", os.path.join("sub", "c.caf")):
+            open(os.path.join(tmp, name), "w").close()
+        found = scan_audio_files([tmp, os.path.join(tmp, "*.wav")])
+        assert [os.path.relpath(p, tmp) for p in found] == ["a.AMB", "b.wav", os.path.join("sub", "c.caf")]
+
+        base = os.path.join(tmp, "b")
+        open(base + "_binaural.wav", "w").close()
+        first = unique_output_path(base, "_binaural.wav")
+        assert first == base + "_binaural_v2.wav"
+        assert unique_output_path(base, "_binaural.wav", {first}) == base + "_binaural_v3.wav"
+    print("PASS: Scan")
+
+
+def test_fixed_gain_is_single_pass():
+    print("Testing fixed-gain render...")
+    rng = np.random.default_rng(4)
+    x = (rng.standard_normal((30000, 4)) * 0.05).astype(np.float32)
+    with tempfile.TemporaryDirectory() as tmp:
+        in_wav = os.path.join(tmp, "in.wav")
+        sf.write(in_wav, x, 48000, subtype="FLOAT")
+        renderer = SAFRenderer()
+        renderer.progress_callback = lambda v: None
+        renderer.load_sofa(SOFA_PATH)
+        ref = renderer.render(in_wav, os.path.join(tmp, "ref.wav"))
+        fixed = renderer.render(in_wav, os.path.join(tmp, "fixed.wav"), gain_db=-6.0)
+        assert ref["passes"] == 2 and fixed["passes"] == 1
+        assert abs(fixed["gain_db"] + 6.0) < 1e-9
+        a, _ = sf.read(os.path.join(tmp, "ref.wav"))
+        b, _ = sf.read(os.path.join(tmp, "fixed.wav"))
+        assert np.max(np.abs(a * 10 ** (-6 / 20) - b)) < 2 / 32768
+        assert abs(fixed["peak"] - np.max(np.abs(b))) < 1 / 32768
+    print("PASS: Fixed Gain")
+
+
+def test_batch_manifest_and_report():
+    print("Testing batch CLI with manifest and parallel jobs...")
+    rng = np.random.default_rng(5)
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("one.wav", "two.wav"):
+            sf.write(os.path.join(tmp, name), (rng.standard_normal((24000, 4)) * 0.1).astype(np.float32), 48000)
+        manifest = os.path.join(tmp, "jobs.csv")
+        with open(manifest, "w") as f:
+            f.write("input,output,mode,gain_db,order\n")
+            f.write("two.wav,out/two_stereo.wav,stereo,-3,\n")
+            f.write("missing.wav,,,,1\n")
+        report_path = os.path.join(tmp, "report.json")
+
+        code = batch_render.main([os.path.join(tmp, "one.wav"), "--manifest", manifest, "--sofa", SOFA_PATH,
+                                  "--jobs", "2", "--report", report_path])
+        assert code == 1  # One job fails
+        with open(report_path) as f:
+            report = json.load(f)
+
+        assert report["summary"]["files"] == 3 and report["summary"]["failed"] == 1
+        one, two, missing = report["files"]
+        assert one["status"] == "ok" and one["passes"] == 2 and one["order"] == 1
+        assert one["output"].endswith("one_binaural.wav") and os.path.exists(one["output"])
+        assert one["rtf"] > 0 and one["peak"] > 0
+        assert two["status"] == "ok" and two["gain_db"] == -3.0
+        assert os.path.exists(os.path.join(tmp, "out", "two_stereo.wav"))
+        assert missing["status"] == "error" and missing["error"]
+    print("PASS: Batch")
+
+
+def test_incremental_skips_unchanged():
+    print("Testing incremental re-runs...")
+    rng = np.random.default_rng(6)
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "lib")
+        os.makedirs(src)
+        for name in ("a.wav", "b.wav", "c.wav"):
+            sf.write(os.path.join(src, name), (rng.standard_normal((12000, 4)) * 0.1).astype(np.float32), 48000)
+        report_path = os.path.join(tmp, "report.json")
+        argv = [src, "--sofa", SOFA_PATH, "--incremental", "--state-db", os.path.join(tmp, "state.sqlite"),
+                "--report", report_path]
+
+        def run():
+            assert batch_render.main(argv) == 0
+            with open(report_path) as f:
+                return {os.path.basename(r["input"]): r for r in json.load(f)["files"]}
+
+        first = run()
+        assert all(r["status"] == "ok" for r in first.values())
+        second = run()
+        assert all(r["status"] == "skipped" for r in second.values())
+
+        # Edit one input, delete another's output: only those two re-render, in place
+        sf.write(os.path.join(src, "b.wav"), (rng.standard_normal((12000, 4)) * 0.1).astype(np.float32), 48000)
+        os.remove(first["c.wav"]["output"])
+        third = run()
+        assert [third[n]["status"] for n in ("a.wav", "b.wav", "c.wav")] == ["skipped", "ok", "ok"]
+        assert third["b.wav"]["output"] == first["b.wav"]["output"]
+        assert not any(f.endswith("_v2.wav") for f in os.listdir(src))
+    print("PASS: Incremental")
+
+
+def test_only_our_outputs_are_skipped():
+    print("Testing detection of earlier outputs in a scan...")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("take.wav", "take_binaural.wav", "take_stereo_v2.wav", "field_binaural.wav", "old_binaural.wav"):
+            open(os.path.join(tmp, name), "w").close()
+        names = lambda jobs: sorted(os.path.basename(j["input"]) for j in jobs)
+        # take_* sit next to their input; field_binaural.wav has none, so it is a genuine input
+        assert names(batch_render.build_jobs([tmp], sofa=SOFA_PATH)) == ["field_binaural.wav", "old_binaural.wav",
+                                                                        "take.wav"]
+        # old_binaural.wav is a recorded output whose input lives elsewhere
+        with RenderManifest(os.path.join(tmp, "state.sqlite")) as state:
+            job = {"input": os.path.join(tmp, "elsewhere", "old.wav"), "output": os.path.join(tmp, "old_binaural.wav")}
+            state.record(job, ("a", None, "{}"))
+            assert names(batch_render.build_jobs([tmp], sofa=SOFA_PATH, state=state)) == ["field_binaural.wav",
+                                                                                          "take.wav"]
+    print("PASS: Detection of earlier outputs")
+
+
+if __name__ == "__main__":
+    test_scan_and_unique_paths()
+    test_fixed_gain_is_single_pass()
+    test_batch_manifest_and_report()
+    test_incremental_skips_unchanged()
+    test_only_our_outputs_are_skipped()
@@ -0,0 +1,70 @@
+import sys
+import os
+import json
+import tempfile
+import numpy as np
+import soundfile as sf
+
+# Add Ambix2Bin to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin"))
+sys.path.append(os.path.dirname(__file__))
+
+from saf_wrapper import SAFRenderer
+from gen_test_signal import write_ambisonic_signal
+from gen_test_sofa import generate_sofa
+import benchmark_render
+
+
+def test_synthetic_inputs_render():
+    print("Testing synthetic benchmark inputs...")
+    with tempfile.TemporaryDirectory() as tmp:
+        sofa = generate_sofa(os.path.join(tmp, "h.sofa"), n_dirs=200, taps=96)
+        in_wav = write_ambisonic_signal(os.path.join(tmp, "in.wav"), 2, duration=0.5, seed=3)
+        again = write_ambisonic_signal(os.path.join(tmp, "again.wav"), 2, duration=0.5, seed=3)
+        a, fs = sf.read(in_wav)
+        assert a.shape == (24000, 9) and fs == 48000
+        assert np.array_equal(a, sf.read(again)[0])  # Seeded: every run benchmarks the same data
+
+        renderer = SAFRenderer()
+        renderer.progress_callback = lambda v: None
+        renderer.load_sofa(sofa)
+        assert renderer.sofa_data['ir'].shape == (200, 2, 96)
+        stats = renderer.render(in_wav, os.path.join(tmp, "out.wav"))
+        assert stats["order"] == 2 and stats["peak"] > 0
+        # Left-side sources must be louder in the left ear
+        ir, pos = renderer.sofa_data['ir'], renderer.sofa_data['pos']
+        left = np.abs(pos[:, 0] - 90) < 30
+        assert np.sum(ir[left, 0]**2) > 2 * np.sum(ir[left, 1]**2)
+    print("PASS: Synthetic Inputs")
+
+
+def test_suite_and_compare():
+    print("Testing benchmark run and regression check...")
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "bench.json")
+        assert benchmark_render.main(["--orders", "1", "--block-sizes", "2048", "--hrir-lengths", "64",
+                                      "--duration", "0.5", "--repeat", "1", "-o", out]) == 0
+        with open(out) as f:
+            report = json.load(f)
+        (case,) = report["cases"]
+        assert case["order"] == 1 and case["rtf"] > 0 and case["peak_rss_mb"] > 0 and case["traced_peak_mb"] > 0
+
+        slower = json.loads(json.dumps(report))
+        slower["cases"][0]["render_best_s"] = case["render_best_s"] * 1.5 + 0.05
+        rows, regressions = benchmark_render.compare(report, slower)
+        assert [r[1] for r in regressions] == ["render_best_s"]
+        assert benchmark_render.compare(report, report)[1] == []
+        assert benchmark_render.print_comparison(report, report, 0.1) == 0
+
+        # A failed case, or two suites without a common case, must not pass as "0 regressions"
+        broken = dict(report, cases=[], failed=[benchmark_render.case_key(case)])
+        assert benchmark_render.print_comparison(broken, report, 0.1) == 1
+        other = json.loads(json.dumps(report))
+        other["cases"][0]["order"] = 2
+        assert benchmark_render.print_comparison(report, other, 0.1) == 1
+    print("PASS: Suite")
+
+
+if __name__ == "__main__":
+    test_synthetic_inputs_render()
+    test_suite_and_compare()
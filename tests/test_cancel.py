@@ -0,0 +1,66 @@
+import sys
+import os
+import time
+import subprocess
+import tempfile
+import threading
+import numpy as np
+import soundfile as sf
+
+# Add Ambix2Bin to path
+APP_DIR = os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin")
+sys.path.append(APP_DIR)
+
+from saf_wrapper import SAFRenderer, RenderCancelled, CANCELLED_EXIT_CODE
+
+SOFA_PATH = os.path.join(APP_DIR, "assets", "hrtf", "HRIR_L2702.sofa")
+
+
+def test_cancel_removes_partial_output():
+    print("Testing cancellation mid write-pass...")
+    rng = np.random.default_rng(9)
+    with tempfile.TemporaryDirectory() as tmp:
+        in_wav = os.path.join(tmp, "in.wav")
+        out_wav = os.path.join(tmp, "out.wav")
+        sf.write(in_wav, (rng.standard_normal((96000, 4)) * 0.1).astype(np.float32), 48000, subtype="FLOAT")
+        renderer = SAFRenderer()
+        renderer.load_sofa(SOFA_PATH)
+        renderer.cancel_event = threading.Event()
+        renderer.progress_callback = lambda v: renderer.cancel_event.set() if v >= 0.75 else None
+        try:
+            renderer.render(in_wav, out_wav, block_size=1024)
+            assert False, "render should have been cancelled"
+        except RenderCancelled:
+            pass
+        assert not os.path.exists(out_wav)
+    print("PASS: Cancel")
+
+
+def test_worker_stdin_control_channel():
+    print("Testing worker 'cancel' message on stdin...")
+    rng = np.random.default_rng(10)
+    with tempfile.TemporaryDirectory() as tmp:
+        in_wav = os.path.join(tmp, "in.wav")
+        out_wav = os.path.join(tmp, "out.wav")
+        sf.write(in_wav, (rng.standard_normal((48000 * 60, 16)) * 0.1).astype(np.float32), 48000, subtype="FLOAT")
+        proc = subprocess.Popen([sys.executable, os.path.join(APP_DIR, "saf_wrapper.py"), "--input", in_wav,
+                                 "--output", out_wav, "--sofa", SOFA_PATH, "--control-stdin"],
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        # Wait for the render to start, then ask it to stop
+        for line in proc.stdout:
+            if line.startswith("PROGRESS:"):
+                break
+        proc.stdin.write("cancel\n")
+        proc.stdin.flush()
+        t0 = time.monotonic()
+        rest, _ = proc.communicate(timeout=60)
+        assert proc.returncode == CANCELLED_EXIT_CODE, rest
+        assert "CANCELLED" in rest
+        assert time.monotonic() - t0 < 5.0
+        assert not os.path.exists(out_wav)
+    print("PASS: Control Channel")
+
+
+if __name__ == "__main__":
+    test_cancel_removes_partial_output()
+    test_worker_stdin_control_channel()
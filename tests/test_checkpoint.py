@@ -0,0 +1,113 @@
+import sys
+import os
+import subprocess
+import tempfile
+import threading
+import numpy as np
+import soundfile as sf
+
+# Add Ambix2Bin to path
+APP_DIR = os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin")
+sys.path.append(APP_DIR)
+
+from saf_wrapper import SAFRenderer, RenderCancelled
+from sh_rotation import HeadTrajectory
+
+SOFA_PATH = os.path.join(APP_DIR, "assets", "hrtf", "HRIR_L2702.sofa")
+
+
+def _make_input(tmp, seconds=2.0):
+    rng = np.random.default_rng(8)
+    x = (rng.standard_normal((int(48000 * seconds), 9)) * 0.4).astype(np.float32)  # Loud: forces a gain change
+    path = os.path.join(tmp, "in.wav")
+    sf.write(path, x, 48000, subtype="FLOAT")
+    return path
+
+
+def _read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _cancel_after(renderer, n_updates):
+    """Progress callback that trips the cancel event after n progress reports."""
+    event = threading.Event()
+    count = [0]
+
+    def on_progress(value):
+        count[0] += 1
+        if count[0] >= n_updates:
+            event.set()
+
+    renderer.cancel_event = event
+    renderer.progress_callback = on_progress
+
+
+def test_resume_after_cancel_is_bit_identical():
+    print("Testing checkpoint/resume after cancellation (both passes)...")
+    traj = HeadTrajectory([0.0, 2.0], [0.0, 120.0], [0.0, 10.0])
+    with tempfile.TemporaryDirectory() as tmp:
+        in_wav = _make_input(tmp)
+        renderer = SAFRenderer()
+        renderer.progress_callback = lambda v: None
+        renderer.load_sofa(SOFA_PATH)
+        ref = os.path.join(tmp, "ref.wav")
+        renderer.render(in_wav, ref, block_size=2048, trajectory=traj)
+
+        # Interrupt once in the peak pass and once in the write pass
+        for stop_at in (20, 70):
+            out = os.path.join(tmp, f"out_{stop_at}.wav")
+            ckpt = out + ".ckpt.npz"
+            _cancel_after(renderer, stop_at)
+            try:
+                renderer.render(in_wav, out, block_size=2048, trajectory=traj,
+                                checkpoint_path=ckpt, checkpoint_interval=3600)
+                assert False, "render should have been cancelled"
+            except RenderCancelled:
+                pass
+            assert os.path.exists(ckpt)
+
+            renderer.cancel_event = None
+            renderer.progress_callback = lambda v: None
+            stats = renderer.render(in_wav, out, block_size=2048, trajectory=traj, checkpoint_path=ckpt)
+            assert not os.path.exists(ckpt)
+            assert stats["gain_db"] < 0
+            assert _read_bytes(out) == _read_bytes(ref), f"Resumed output differs (stop at {stop_at})"
+    print("PASS: Resume after cancel")
+
+
+def test_resume_after_kill_is_bit_identical():
+    print("Testing checkpoint/resume after a hard kill...")
+    with tempfile.TemporaryDirectory() as tmp:
+        in_wav = _make_input(tmp)
+        ref = os.path.join(tmp, "ref.wav")
+        out = os.path.join(tmp, "out.wav")
+        ckpt = out + ".ckpt.npz"
+
+        renderer = SAFRenderer()
+        renderer.progress_callback = lambda v: None
+        renderer.load_sofa(SOFA_PATH)
+        renderer.render(in_wav, ref, block_size=1024)
+
+        # Child checkpoints every block and dies mid write-pass without any cleanup
+        code = (
+            "import os, sys\n"
+            f"sys.path.insert(0, {APP_DIR!r})\n"
+            "from saf_wrapper import SAFRenderer\n"
+            "r = SAFRenderer()\n"
+            "r.progress_callback = lambda v: os._exit(9) if v >= 0.8 else None\n"
+            f"r.load_sofa({SOFA_PATH!r})\n"
+            f"r.render({in_wav!r}, {out!r}, block_size=1024, checkpoint_path={ckpt!r}, checkpoint_interval=0)\n"
+        )
+        proc = subprocess.run([sys.executable, "-c", code], capture_output=True)
+        assert proc.returncode == 9, proc.stderr
+        assert os.path.exists(ckpt) and os.path.exists(out)
+
+        renderer.render(in_wav, out, block_size=1024, checkpoint_path=ckpt)
+        assert _read_bytes(out) == _read_bytes(ref)
+    print("PASS: Resume after kill")
+
+
+if __name__ == "__main__":
+    test_resume_after_cancel_is_bit_identical()
+    test_resume_after_kill_is_bit_identical()
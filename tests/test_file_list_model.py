@@ -0,0 +1,153 @@
+import sys
+import os
+import tempfile
+import numpy as np
+import soundfile as sf
+
+# Add Ambix2Bin to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication, QMessageBox
+from PyQt6.QtCore import Qt, QPoint, QPointF, QEvent
+from PyQt6.QtGui import QPixmap, QMouseEvent, QKeyEvent
+from file_list_model import (FileJobModel, FileRowDelegate, FileListView, STATE_ROLE, PROGRESS_ROLE, IDLE, QUEUED,
+                             RUNNING, DONE, ERROR, CANCELLED)
+
+app = QApplication.instance() or QApplication([])
+
+
+def _view(n):
+    model = FileJobModel()
+    model.add_paths([f"/audio/take_{i:05d}.wav" for i in range(n)])
+    pm = QPixmap(24, 24)
+    pm.fill(Qt.GlobalColor.gray)
+    view = FileListView()
+    view.setModel(model)
+    delegate = FileRowDelegate(lambda state: pm, lambda: pm, parent=view)
+    view.setItemDelegate(delegate)
+    view.resize(500, 300)
+    return model, view, delegate
+
+
+def test_model_rows_and_states():
+    print("Testing file job model rows and states...")
+    model = FileJobModel()
+    model.add_paths([f"/a/{i}.wav" for i in range(10)])
+    assert model.rowCount() == 10 and model.data(model.index(3)) == "3.wav"
+    assert model.data(model.index(3), Qt.ItemDataRole.ToolTipRole) == "/a/3.wav"
+    model.remove_rows([1, 2, 3, 7])
+    assert model.paths == ["/a/0.wav", "/a/4.wav", "/a/5.wav", "/a/6.wav", "/a/8.wav", "/a/9.wav"]
+    assert len(model.state) == len(model.progress) == 6
+
+    model.set_states([0, 1, 2], QUEUED)
+    model.set_state(1, RUNNING)
+    model.set_progress(1, 42)
+    model.set_state(2, DONE)
+    model.set_state(0, CANCELLED)
+    model.set_state(3, ERROR)
+    assert model.data(model.index(1), PROGRESS_ROLE) == 42 and model.data(model.index(2), PROGRESS_ROLE) == 100
+    assert model.data(model.index(0), PROGRESS_ROLE) == -1
+    assert model.rows_in_state(IDLE, CANCELLED) == [0, 4, 5]
+    assert model.data(model.index(1), STATE_ROLE) == RUNNING
+    model.clear()
+    assert model.rowCount() == 0 and len(model.state) == 0
+    print("PASS: Model rows and states")
+
+
+def test_progress_updates_are_coalesced():
+    print("Testing coalesced progress updates...")
+    model = FileJobModel()
+    model.add_paths([f"/a/{i}.wav" for i in range(50000)])
+    changes = []
+    model.dataChanged.connect(lambda tl, br, roles: changes.append((tl.row(), br.row())))
+    for pct in range(0, 100, 10):
+        for row in range(100, 50000, 97):
+            model.set_progress(row, pct)
+    assert changes == []  # Nothing until the flush timer fires
+    model.flush()
+    assert changes == [(100, 100 + 97 * ((50000 - 100 - 1) // 97))]
+    model.set_progress(100, 90)  # Unchanged value: no repaint
+    model.flush()
+    assert len(changes) == 1
+    print("PASS: Coalesced progress updates")
+
+
+def test_delegate_paints_and_cancels():
+    print("Testing row delegate painting and cancel clicks...")
+    model, view, delegate = _view(800)
+    for row, state in enumerate((QUEUED, RUNNING, DONE, ERROR, CANCELLED)):
+        model.set_state(row, state)
+    model.set_progress(1, 60)
+    model.flush()
+    view.show()
+    app.processEvents()
+    image = view.viewport().grab().toImage()
+    assert not image.isNull()
+
+    cancelled = []
+    delegate.cancel_clicked.connect(cancelled.append)
+    rect = view.visualRect(model.index(1))
+    pos = QPointF(rect.right() - 5 - 12, rect.center().y())
+    for kind in (QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonRelease):
+        event = QMouseEvent(kind, pos, view.viewport().mapToGlobal(pos), Qt.MouseButton.LeftButton,
+                            Qt.MouseButton.LeftButton, Qt.KeyboardModifier.NoModifier)
+        QApplication.sendEvent(view.viewport(), event)
+    assert cancelled == [1], cancelled
+
+    # Delete removes selected rows, except while a batch runs
+    view.clearSelection()
+    view.selectionModel().select(model.index(10), view.selectionModel().SelectionFlag.Select)
+    view.locked = True
+    QApplication.sendEvent(view, QKeyEvent(QEvent.Type.KeyPress, Qt.Key.Key_Delete, Qt.KeyboardModifier.NoModifier))
+    assert model.rowCount() == 800
+    view.locked = False
+    QApplication.sendEvent(view, QKeyEvent(QEvent.Type.KeyPress, Qt.Key.Key_Delete, Qt.KeyboardModifier.NoModifier))
+    assert model.rowCount() == 799
+    view.close()
+    print("PASS: Row delegate painting and cancel clicks")
+
+
+def test_app_batch_events_update_model():
+    print("Testing batch events against the file model...")
+    QMessageBox.critical = staticmethod(lambda *a, **k: None)
+    import app_ambix2bin
+    window = app_ambix2bin.Ambix2Bin()
+    sent = []
+    window.server.send = sent.append
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(3):
+            sf.write(os.path.join(tmp, f"in{i}.wav"), np.zeros((480, 4), dtype=np.float32), 48000)
+        window.process_file([tmp])
+        while window.scan_thread is not None:
+            app.processEvents()
+        model = window.file_model
+        assert model.rowCount() == 3
+
+        window.file_queue = [(model.path(r), r) for r in range(3)]
+        window.is_processing = True
+        window.pending_sofa = None
+        window.submit_batch()
+        assert [m["op"] for m in sent] == ["submit"] * 3 and model.rows_in_state(QUEUED) == [0, 1, 2]
+        for job, msg in enumerate(sent):
+            window.on_server_event({"event": "queued", "job": job, "ref": msg["ref"]})
+        window.on_server_event({"event": "started", "job": 0, "ref": sent[0]["ref"]})
+        window.on_server_event({"event": "progress", "job": 0, "ref": sent[0]["ref"], "value": 0.5})
+        row0 = window.jobs_by_ref[sent[0]["ref"]][0]
+        assert model.state[row0] == RUNNING and model.progress[row0] == 50
+        window.on_server_event({"event": "done", "job": 0, "ref": sent[0]["ref"], "output": "x"})
+        window.on_server_event({"event": "cancelled", "job": 1, "ref": sent[1]["ref"]})
+        window.on_server_event({"event": "error", "job": 2, "ref": sent[2]["ref"], "message": "boom"})
+        assert sorted(model.state.tolist()) == sorted([DONE, CANCELLED, ERROR])
+        assert not window.is_processing and not window.file_list_view.locked
+        # Only the cancelled file is queued again
+        assert window.status.text().startswith("Batch stopped: 1 file(s)")
+    window.close()
+    print("PASS: Batch events against the file model")
+
+
+if __name__ == "__main__":
+    test_model_rows_and_states()
+    test_progress_updates_are_coalesced()
+    test_delegate_paints_and_cancels()
+    test_app_batch_events_update_model()
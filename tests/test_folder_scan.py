@@ -0,0 +1,127 @@
+import sys
+import os
+import tempfile
+import threading
+import numpy as np
+import soundfile as sf
+
+# Add Ambix2Bin to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication, QMessageBox
+from PyQt6.QtCore import Qt
+from audio_files import iter_audio_files, scan_audio_files, ambisonic_order, ambisonic_header_ok
+from folder_scan import FolderScanWorker
+
+app = QApplication.instance() or QApplication([])
+
+
+def _tree(tmp):
+    """foa.wav (4 ch), a/stereo.wav (2 ch), a/b/toa.wav (16 ch), a/broken.wav, a/notes.txt, z.amb (9 ch)."""
+    os.makedirs(os.path.join(tmp, "a", "b"))
+    sf.write(os.path.join(tmp, "foa.wav"), np.zeros((64, 4), dtype=np.float32), 48000)
+    sf.write(os.path.join(tmp, "a", "stereo.wav"), np.zeros((64, 2), dtype=np.float32), 48000)
+    sf.write(os.path.join(tmp, "a", "b", "toa.wav"), np.zeros((64, 16), dtype=np.float32), 48000)
+    sf.write(os.path.join(tmp, "z.amb"), np.zeros((64, 9), dtype=np.float32), 48000, format="WAV")
+    with open(os.path.join(tmp, "a", "broken.wav"), "w") as f:
+        f.write("not audio")
+    with open(os.path.join(tmp, "a", "notes.txt"), "w") as f:
+        f.write("x")
+
+
+def test_scandir_matches_walk_order():
+    print("Testing scandir scan order...")
+    with tempfile.TemporaryDirectory() as tmp:
+        _tree(tmp)
+        expected = []
+        for root, dirs, files in os.walk(tmp):
+            dirs.sort()
+            expected += [os.path.join(root, f) for f in sorted(files) if not f.endswith(".txt")]
+        assert scan_audio_files([tmp]) == expected
+        assert list(iter_audio_files([tmp, os.path.join(tmp, "foa.wav")])) == expected  # Duplicates dropped
+
+        cancel = threading.Event()
+        it = iter_audio_files([tmp], cancel)
+        first = next(it)
+        cancel.set()
+        assert first == expected[0] and list(it) == []
+    print("PASS: Scandir scan order")
+
+
+def test_ambisonic_prefilter():
+    print("Testing ambisonic header prefilter...")
+    assert [(n, ambisonic_order(n)) for n in range(1, 70) if ambisonic_order(n)] == \
+        [(4, 1), (9, 2), (16, 3), (25, 4), (36, 5), (49, 6), (64, 7)]
+    with tempfile.TemporaryDirectory() as tmp:
+        _tree(tmp)
+        assert ambisonic_header_ok(os.path.join(tmp, "foa.wav"))
+        assert ambisonic_header_ok(os.path.join(tmp, "a", "stereo.wav")) is False
+        # Unreadable headers are unknown, not rejected
+        assert ambisonic_header_ok(os.path.join(tmp, "a", "broken.wav")) is None
+        assert ambisonic_header_ok(os.path.join(tmp, "missing.wav")) is None
+    print("PASS: Ambisonic header prefilter")
+
+
+def test_scan_worker_chunks():
+    print("Testing scan worker chunks...")
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(25):
+            sf.write(os.path.join(tmp, f"f{i:02d}.wav"), np.zeros((16, 4), dtype=np.float32), 48000)
+        sf.write(os.path.join(tmp, "stereo.wav"), np.zeros((16, 2), dtype=np.float32), 48000)
+        with open(os.path.join(tmp, "take.opus"), "wb") as f:
+            f.write(b"OggS")  # No header reader understands it here
+        chunks, summary = [], []
+        worker = FolderScanWorker([tmp], prefilter=True, chunk_files=10, chunk_interval_s=60)
+        worker.chunk.connect(chunks.append)
+        worker.finished.connect(summary.append)
+        worker.run()
+        assert [len(c) for c in chunks] == [10, 10, 6]
+        expected = sorted(os.path.join(tmp, f"f{i:02d}.wav") for i in range(25)) + [os.path.join(tmp, "take.opus")]
+        assert sum(chunks, []) == expected
+        assert (summary[0]['found'], summary[0]['skipped'], summary[0]['unverified']) == (26, 1, 1)
+        assert not summary[0]['cancelled']
+
+        # Cancelled from the first chunk: nothing after it is delivered
+        chunks, summary = [], []
+        worker = FolderScanWorker([tmp], prefilter=False, chunk_files=10)
+        worker.chunk.connect(lambda c: (chunks.append(c), worker.cancel()))
+        worker.finished.connect(summary.append)
+        worker.run()
+        assert len(chunks) == 1 and summary[0]['cancelled'] and summary[0]['found'] == 10
+        assert summary[0]['unverified'] == 0
+    print("PASS: Scan worker chunks")
+
+
+def test_drop_streams_into_file_list():
+    print("Testing background scan of a drop...")
+    QMessageBox.critical = staticmethod(lambda *a, **k: None)
+    import app_ambix2bin
+    window = app_ambix2bin.Ambix2Bin()
+    with tempfile.TemporaryDirectory() as tmp:
+        _tree(tmp)
+        window.process_file([tmp])
+        assert window.scan_thread is not None and window.btn_process.text() == "STOP SCAN"
+        while window.scan_thread is not None:
+            app.processEvents()
+        names = [os.path.basename(p) for p in window.file_model.paths]
+        assert names == ["foa.wav", "z.amb", "broken.wav", "toa.wav"], names
+        assert window.status.text() == "Ready to convert 4 files. (1 non-Ambisonic skipped, 1 with unreadable header kept)"
+        # The prefilter's header probe is reused for the tooltip, without reading the file again
+        tooltip = window.file_model.data(window.file_model.index(1), Qt.ItemDataRole.ToolTipRole)
+        assert tooltip.endswith("2nd order FuMa (FuMa/FuMa), 9 ch, 48 kHz, 0:00"), tooltip
+
+        window.process_file([tmp])
+        window.process_file([os.path.join(tmp, "foa.wav")])  # Queued behind the running scan
+        while window.scan_thread is not None or window.scan_queue:
+            app.processEvents()
+        assert window.file_model.rowCount() == 9
+    window.close()
+    print("PASS: Background scan of a drop")
+
+
+if __name__ == "__main__":
+    test_scandir_matches_walk_order()
+    test_ambisonic_prefilter()
+    test_scan_worker_chunks()
+    test_drop_streams_into_file_list()
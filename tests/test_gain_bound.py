@@ -0,0 +1,79 @@
+import sys
+import os
+import tempfile
+import numpy as np
+import soundfile as sf
+
+# Add Ambix2Bin to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin"))
+
+from saf_wrapper import SAFRenderer, scan_channel_peaks
+from sh_rotation import HeadTrajectory
+
+SOFA_PATH = os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin", "assets", "hrtf", "HRIR_L2702.sofa")
+
+
+def _renderer():
+    renderer = SAFRenderer()
+    renderer.progress_callback = lambda v: None
+    renderer.load_sofa(SOFA_PATH)
+    return renderer
+
+
+def test_bound_is_tight_for_worst_case_input():
+    print("Testing no-clip bound against a worst-case input...")
+    renderer = _renderer()
+    renderer.prepare(1)
+    h = np.asarray(renderer.sh_hrtfs, dtype=np.float64)
+    taps = h.shape[2]
+    peaks = np.array([0.9, 0.5, 0.7, 0.3])
+    ear = int(np.argmax(peaks @ np.sum(np.abs(h), axis=2)))
+    # Time-reversed filter signs at full channel peak: the louder ear hits the bound exactly at n0
+    x = np.zeros((48000, 4), dtype=np.float32)
+    n0 = 10000
+    x[n0 - taps + 1:n0 + 1] = (np.sign(h[:, ear, ::-1]) * peaks[:, None]).T
+    with tempfile.TemporaryDirectory() as tmp:
+        in_wav = os.path.join(tmp, "in.wav")
+        sf.write(in_wav, x, 48000, subtype="FLOAT")
+        assert np.allclose(scan_channel_peaks(in_wav, block_size=4096), peaks, atol=1e-7)
+        bound = renderer.no_clip_bound(peaks, 1)
+        assert np.isclose(bound[ear], peaks @ np.sum(np.abs(h[:, ear]), axis=1))
+
+        stats = renderer.render(in_wav, os.path.join(tmp, "out.wav"), gain_mode="bound")
+        y, _ = sf.read(os.path.join(tmp, "out.wav"))
+        assert stats["passes"] == 1
+        assert abs(stats["gain_db"] - 20 * np.log10(0.98 / bound.max())) < 1e-5
+        assert np.max(np.abs(y)) <= 0.98 + 1e-4
+        assert np.max(np.abs(y[:, ear])) > 0.98 - 1e-3  # Tight: this input reaches the bound
+    print("PASS: Worst Case")
+
+
+def test_bound_holds_under_rotation():
+    print("Testing no-clip bound with a head trajectory...")
+    rng = np.random.default_rng(9)
+    x = (rng.standard_normal((96000, 9)) * 0.5).clip(-1, 1).astype(np.float32)
+    traj = HeadTrajectory([0.0, 2.0], [0.0, 300.0], [0.0, 40.0], [0.0, -20.0])
+    renderer = _renderer()
+    with tempfile.TemporaryDirectory() as tmp:
+        in_wav = os.path.join(tmp, "in.wav")
+        sf.write(in_wav, x, 48000, subtype="FLOAT")
+        peaks = scan_channel_peaks(in_wav)
+        still = renderer.no_clip_bound(peaks, 2)
+        rotating = renderer.no_clip_bound(peaks, 2, rotating=True)
+        assert np.all(rotating >= still - 1e-12)
+
+        bound = renderer.render(in_wav, os.path.join(tmp, "bound.wav"), trajectory=traj, gain_mode="bound")
+        peak = renderer.render(in_wav, os.path.join(tmp, "peak.wav"), trajectory=traj)
+        assert bound["passes"] == 1 and peak["passes"] == 2
+        assert bound["peak"] <= 0.98 and bound["gain_db"] <= peak["gain_db"]
+
+        # "At or below full scale" without scanning gives a lower, still safe gain
+        full = renderer.render(in_wav, os.path.join(tmp, "full.wav"), trajectory=traj, gain_mode="bound",
+                               input_peaks=1.0)
+        assert full["gain_db"] <= bound["gain_db"] and full["peak"] <= 0.98
+    print("PASS: Rotation")
+
+
+if __name__ == "__main__":
+    test_bound_is_tight_for_worst_case_input()
+    test_bound_holds_under_rotation()
@@ -0,0 +1,46 @@
+import sys
+import os
+import numpy as np
+
+# Add Ambix2Bin to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin"))
+sys.path.append(os.path.dirname(__file__))
+
+import golden_render
+from saf_wrapper import SAFRenderer
+
+
+def test_every_mode_matches_golden():
+    print("Testing all render paths against the golden render...")
+    rows = golden_render.run()
+    golden_render.print_rows(rows)
+    assert {row['mode'] for row in rows} == set(golden_render.MODES) | {'golden'}
+    failed = [(row['scene'], row['mode'], row['failed']) for row in rows if row['failed']]
+    assert not failed, failed
+    print("PASS: Golden Outputs")
+
+
+def test_harness_catches_broken_paths():
+    print("Testing that the harness flags wrong outputs...")
+    renderer = SAFRenderer()
+    renderer.progress_callback = lambda v: None
+    renderer.load_sofa(golden_render.SOFA_PATH)
+    x, segments = golden_render.directions_scene(renderer)
+    ref = renderer.render_array(x, golden_render.FS)
+    tol = golden_render.LOSSLESS
+    assert golden_render.golden_directions(ref, segments) == []
+
+    swapped = golden_render.measure(ref, ref[:, ::-1], segments)
+    assert {'ild_db', 'itd_us', 'snr_db'} <= set(golden_render.check(swapped, tol))
+    late = np.concatenate([np.zeros((1, 2), np.float32), ref[:-1]])
+    assert 'snr_db' in golden_render.check(golden_render.measure(ref, late, segments), tol)
+    assert golden_render.check(golden_render.measure(ref, ref * 1.01, segments), tol) == ['max_abs', 'snr_db']
+    assert golden_render.check(golden_render.measure(ref, ref[:-10], segments), tol) == ['samples']
+    # Mirrored scene: the golden check itself notices
+    assert len(golden_render.golden_directions(ref[:, ::-1], segments)) == 6  # The six lateral sources
+    print("PASS: Harness")
+
+
+if __name__ == "__main__":
+    test_every_mode_matches_golden()
+    test_harness_catches_broken_paths()
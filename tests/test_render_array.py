@@ -0,0 +1,54 @@
+import sys
+import os
+import tempfile
+import numpy as np
+import soundfile as sf
+
+# Add Ambix2Bin to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin"))
+
+from saf_wrapper import SAFRenderer
+
+SOFA_PATH = os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin", "assets", "hrtf", "HRIR_L2702.sofa")
+
+
+def test_render_array_matches_file_render():
+    print("Testing render_array() against file-based render()...")
+    rng = np.random.default_rng(3)
+    x = (rng.standard_normal((40000, 9)) * 0.8).astype(np.float32)  # Loud: exercises normalization
+
+    renderer = SAFRenderer()
+    renderer.load_sofa(SOFA_PATH)
+    with tempfile.TemporaryDirectory() as tmp:
+        in_wav = os.path.join(tmp, "in.wav")
+        out_wav = os.path.join(tmp, "out.wav")
+        sf.write(in_wav, x, 48000, subtype="FLOAT")
+        renderer.render(in_wav, out_wav)
+        ref, _ = sf.read(out_wav, dtype="float32")
+
+    y = renderer.render_array(x, 48000)
+    assert y.shape == ref.shape
+    assert np.max(np.abs(y - ref)) * 32768 <= 1.5
+    print("PASS: render_array")
+
+
+def test_render_blocks_streams_variable_blocks():
+    print("Testing render_blocks() with variable block sizes...")
+    rng = np.random.default_rng(4)
+    x = (rng.standard_normal((30000, 4)) * 0.1).astype(np.float32)
+
+    renderer = SAFRenderer()
+    renderer.load_sofa(SOFA_PATH)
+    ref = renderer.render_array(x, 48000, normalize=False)
+
+    cuts = [0, 17, 5000, 5001, 14000, 30000]  # Includes blocks longer than block_size
+    chunks = [x[a:b] for a, b in zip(cuts[:-1], cuts[1:])]
+    outs = list(renderer.render_blocks(iter(chunks), 48000, block_size=4096))
+    assert [o.shape[0] for o in outs] == [c.shape[0] for c in chunks]
+    assert np.allclose(np.concatenate(outs), ref, atol=1e-5)
+    print("PASS: render_blocks")
+
+
+if __name__ == "__main__":
+    test_render_array_matches_file_render()
+    test_render_blocks_streams_variable_blocks()
@@ -0,0 +1,127 @@
+import sys
+import os
+import tempfile
+import numpy as np
+import soundfile as sf
+
+# Add Ambix2Bin to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin"))
+
+from render_memory import (MemoryAccountant, estimate_render_bytes, plan_memory, min_block_size, jobs_within,
+                           split_budget, MB)
+from saf_wrapper import SAFRenderer, FilterBankCache
+
+SOFA_PATH = os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin", "assets", "hrtf", "HRIR_L2702.sofa")
+
+
+def _input(tmp, n=30000, n_ch=16):
+    path = os.path.join(tmp, "in.wav")
+    sf.write(path, (np.random.default_rng(0).standard_normal((n, n_ch)) * 0.05).astype(np.float32), 48000,
+             subtype="FLOAT")
+    return path
+
+
+def test_plan_memory_steps():
+    print("Testing memory plan steps...")
+    n_sh, taps = 64, 128
+    roomy = plan_memory(10000, n_sh, taps, 65536, n_dirs=2702, fft_workers=4)
+    assert roomy == dict(roomy, block_size=65536, fft_workers=4, keep_sofa=True, fits=True)
+
+    # Shrinking order: release the SOFA, drop FFT workers, then halve the block size
+    big = estimate_render_bytes(n_sh, taps, 65536, 2702, fft_workers=4) / MB
+    no_sofa = plan_memory(big - 0.01, n_sh, taps, 65536, n_dirs=2702, fft_workers=4)
+    assert not no_sofa['keep_sofa'] and no_sofa['fft_workers'] == 4 and no_sofa['block_size'] == 65536
+    tight = plan_memory(20, n_sh, taps, 65536, n_dirs=2702, fft_workers=4)
+    assert tight['fits'] and tight['fft_workers'] == 1 and tight['block_size'] < 65536
+    assert tight['estimate_mb'] <= 20
+
+    floor = plan_memory(0.1, n_sh, taps, 65536, n_dirs=2702)
+    assert not floor['fits'] and floor['block_size'] == min_block_size(taps)
+    print("PASS: Plan steps")
+
+
+def test_jobs_within_and_split_budget():
+    print("Testing job count and budget split...")
+    assert jobs_within(1000, 300, 8) == 3
+    assert jobs_within(100, 300, 8) == 1  # Always at least one job
+    assert jobs_within(None, 300, 8) == 8
+    per_job, cache = split_budget(1000, 3)
+    assert cache == 250 and per_job == 250
+    print("PASS: Job count and budget split")
+
+
+def test_filter_cache_byte_budget():
+    print("Testing filter cache byte budget...")
+    cache = FilterBankCache(max_bytes=3 * 8000)
+    for k in range(5):
+        cache.put(k, np.zeros(1000))  # 8000 bytes each
+    assert cache.get(0) is None and cache.get(1) is None and cache.get(4) is not None
+    assert cache.nbytes() <= 3 * 8000
+    cache.put('big', {'ir': np.zeros(10000)})  # Over budget alone: kept, everything else goes
+    assert cache.get('big') is not None and cache.get(4) is None
+    print("PASS: Filter cache byte budget")
+
+
+def test_render_under_memory_limit():
+    print("Testing render under a memory ceiling...")
+    with tempfile.TemporaryDirectory() as tmp:
+        in_wav = _input(tmp)
+        plain = SAFRenderer()
+        plain.progress_callback = lambda v: None
+        plain.load_sofa(SOFA_PATH)
+
+        bounded = SAFRenderer()
+        bounded.progress_callback = lambda v: None
+        bounded.load_sofa(SOFA_PATH)
+        bounded.memory_limit_mb = 8
+        stats = bounded.render(in_wav, os.path.join(tmp, "bounded.wav"), block_size=65536, order=3)
+        plan = bounded.memory_plan
+        assert plan['fits'] and plan['block_size'] < 65536 and not plan['keep_sofa']
+        assert bounded.sofa_data['ir'] is None  # Released after prepare
+
+        plain.render(in_wav, os.path.join(tmp, "plain.wav"), block_size=plan['block_size'], order=3)
+        a, _ = sf.read(os.path.join(tmp, "bounded.wav"), dtype='int16')
+        b, _ = sf.read(os.path.join(tmp, "plain.wav"), dtype='int16')
+        assert np.array_equal(a, b), "Plan must only change settings, not output"
+        assert stats['samples'] == 30000
+
+        # Another order needs the raw IRs again
+        bounded.memory_limit_mb = None
+        bounded.render(in_wav, os.path.join(tmp, "order4.wav"), block_size=4096, order=4)
+        assert bounded.current_order == 4 and bounded.sofa_data['ir'] is not None
+    print("PASS: Render under a memory ceiling")
+
+
+def test_memory_profile_report():
+    print("Testing memory accounting mode...")
+    off = MemoryAccountant()
+    assert off.stage("x") is off.stage("y")
+
+    renderer = SAFRenderer()
+    renderer.progress_callback = lambda v: None
+    renderer.memory = MemoryAccountant(enabled=True, top=3)
+    with tempfile.TemporaryDirectory() as tmp:
+        in_wav = _input(tmp, n_ch=4)
+        try:
+            renderer.load_sofa(SOFA_PATH)
+            stats = renderer.render(in_wav, os.path.join(tmp, "out.wav"), block_size=4096)
+        finally:
+            renderer.memory.stop()
+    report = stats['memory']
+    assert {"load_sofa", "prepare", "pass1", "pass2"} <= set(report['stages'])
+    assert report['peak_rss_mb'] > 0
+    pass2 = report['stages']['pass2']
+    assert pass2['peak_mb'] > 0 and 0 < len(pass2['top']) <= 3
+    assert all(entry['mb'] > 0 and entry['where'] for entry in pass2['top'])
+    # The SOFA IRs dominate loading: 2702 x 2 x 128 float32
+    assert report['stages']['load_sofa']['peak_mb'] >= 2702 * 2 * 128 * 4 / MB
+    assert "pass2" in renderer.memory.format()
+    print("PASS: Memory accounting mode")
+
+
+if __name__ == "__main__":
+    test_plan_memory_steps()
+    test_jobs_within_and_split_budget()
+    test_filter_cache_byte_budget()
+    test_render_under_memory_limit()
+    test_memory_profile_report()
@@ -0,0 +1,88 @@
+import sys
+import os
+import asyncio
+import subprocess
+import tempfile
+import numpy as np
+import soundfile as sf
+
+# Add Ambix2Bin to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin"))
+
+from render_metrics import RenderMetrics, MetricsWriter, RUNNING, IDLE
+from saf_async import AsyncRenderService
+
+SOFA_PATH = os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin", "assets", "hrtf", "HRIR_L2702.sofa")
+
+
+def test_writer_and_reader_share_slots():
+    print("Testing shared-memory metrics table...")
+    table = RenderMetrics(3, create=True)
+    try:
+        reader = RenderMetrics(name=table.name, creator_tracker=True)  # Separate mapping in the creator
+        writer = MetricsWriter(table.name, 1, job_id=42)
+        writer.update(progress=0.5, blocks=10, peak=0.25)
+        rec = reader.read(1)
+        assert rec['state'] == RUNNING and rec['job'] == 42
+        assert rec['progress'] == 0.5 and rec['peak'] == 0.25 and rec['blocks_per_s'] > 0
+        assert rec['seq'] % 2 == 0 and rec['rss'] > 0
+        assert reader.read(0)['state'] == IDLE
+        writer.close()
+        assert reader.read(1)['state'] == IDLE
+        reader.close()
+    finally:
+        table.close()
+    print("PASS: Metrics Table")
+
+
+def test_unrelated_reader_leaves_segment():
+    print("Testing a reader process's exit keeps the table...")
+    table = RenderMetrics(2, create=True)
+    try:
+        table.writer(0, job_id=7)
+        # Like the GUI: a separate program that attaches by name and exits
+        code = ("import sys; sys.path.append(sys.argv[1]); from render_metrics import RenderMetrics; "
+                "r = RenderMetrics(name=sys.argv[2]); print(int(r.read(0)['job'])); r.close()")
+        app_dir = os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin")
+        proc = subprocess.run([sys.executable, "-c", code, app_dir, table.name], capture_output=True, text=True,
+                              timeout=60)
+        assert proc.stdout.strip() == "7" and "leaked" not in proc.stderr, proc.stderr
+        again = RenderMetrics(name=table.name, creator_tracker=True)  # Still there
+        assert again.read(0)['job'] == 7
+        again.close()
+    finally:
+        table.close()
+    print("PASS: Reader process exit keeps the table")
+
+
+def test_process_workers_publish_metrics():
+    print("Testing metrics from process-pool renders...")
+    rng = np.random.default_rng(11)
+
+    async def main(tmp):
+        in_wav = os.path.join(tmp, "in.wav")
+        sf.write(in_wav, (rng.standard_normal((48000 * 4, 9)) * 0.1).astype(np.float32), 48000, subtype="FLOAT")
+        async with AsyncRenderService(max_concurrency=2, executor="process", metrics=True) as service:
+            reader = RenderMetrics(name=service.metrics.name, creator_tracker=True)
+            jobs = [service.submit(in_wav, os.path.join(tmp, f"out{i}.wav"), SOFA_PATH, block_size=1024)
+                    for i in range(2)]
+            seen = {}
+            while not all(j.done() for j in jobs):
+                for rec in reader.read_all():
+                    if rec['state'] == RUNNING:
+                        seen[int(rec['job'])] = max(seen.get(int(rec['job']), 0.0), float(rec['progress']))
+                await asyncio.sleep(0.01)
+            await asyncio.gather(*jobs)
+            assert set(seen) == {j.id for j in jobs}, seen
+            assert all(r['state'] == IDLE for r in reader.read_all())
+            reader.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(main(tmp))
+    print("PASS: Worker Metrics")
+
+
+if __name__ == "__main__":
+    test_writer_and_reader_share_slots()
+    test_unrelated_reader_leaves_segment()
+    test_process_workers_publish_metrics()
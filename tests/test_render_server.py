@@ -0,0 +1,160 @@
+import sys
+import os
+import time
+import socket
+import asyncio
+import tempfile
+import threading
+import numpy as np
+import soundfile as sf
+
+# Add Ambix2Bin to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin"))
+
+from render_server import RenderServer, RenderClient
+
+SOFA_PATH = os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin", "assets", "hrtf", "HRIR_L2702.sofa")
+
+
+def _start_server(socket_path):
+    """Runs a RenderServer on its own loop in a daemon thread; returns (loop, server)."""
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    holder = {}
+
+    def run():
+        asyncio.set_event_loop(loop)
+        holder["server"] = loop.run_until_complete(RenderServer(socket_path, workers=1).start())
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait(10)
+    return loop, holder["server"]
+
+
+def _stop_server(loop, server):
+    asyncio.run_coroutine_threadsafe(server.close(), loop).result(10)
+    loop.call_soon_threadsafe(loop.stop)
+
+
+def test_protocol_round_trip():
+    print("Testing render server protocol (submit, progress, priority, cancel)...")
+    rng = np.random.default_rng(3)
+    x = (rng.standard_normal((48000, 4)) * 0.1).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        in_wav = os.path.join(tmp, "in.wav")
+        sf.write(in_wav, x, 48000, subtype="FLOAT")
+        loop, server = _start_server(os.path.join(tmp, "render.sock"))
+        try:
+            client = RenderClient(server.socket_path, timeout=60)
+            client.send(op="ping")
+            assert next(client.events())["event"] == "pong"
+
+            # One worker: "first" occupies it, then "low" and "high" queue up
+            client.submit(in_wav, os.path.join(tmp, "first.wav"), SOFA_PATH, ref="first", block_size=1024)
+            client.submit(in_wav, os.path.join(tmp, "low.wav"), SOFA_PATH, ref="low", priority=5)
+            client.submit(in_wav, os.path.join(tmp, "high.wav"), SOFA_PATH, ref="high", priority=0, mode="stereo")
+            client.submit(in_wav, os.path.join(tmp, "dropped.wav"), SOFA_PATH, ref="dropped", priority=9)
+
+            jobs, finished, order, progress = {}, {}, [], {}
+            for ev in client.events():
+                ref = ev.get("ref")
+                if ev["event"] == "queued":
+                    jobs[ref] = ev["job"]
+                    if ref == "dropped":
+                        client.cancel(ev["job"])
+                elif ev["event"] == "started":
+                    order.append(ref)
+                elif ev["event"] == "progress":
+                    progress.setdefault(ref, []).append(ev["value"])
+                elif ev["event"] in ("done", "error", "cancelled"):
+                    finished[ref] = ev
+                if len(finished) == 4:
+                    break
+            client.close()
+
+            assert finished["dropped"]["event"] == "cancelled"
+            for ref in ("first", "low", "high"):
+                assert finished[ref]["event"] == "done", finished[ref]
+                assert os.path.exists(finished[ref]["output"])
+            assert order == ["first", "high", "low"], order
+            assert progress["first"] == sorted(progress["first"])
+            assert sf.info(finished["high"]["output"]).channels == 2
+        finally:
+            _stop_server(loop, server)
+    print("PASS: Render Server")
+
+
+def test_idle_timeout():
+    print("Testing render server idle shutdown...")
+
+    async def main(socket_path):
+        server = await RenderServer(socket_path, workers=1, idle_timeout_s=0.4).start()
+        serving = asyncio.ensure_future(server.serve_forever())
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+        await asyncio.sleep(1.0)
+        assert not serving.done()  # A connected client keeps it alive
+        writer.close()
+        t0 = time.monotonic()
+        await asyncio.wait_for(serving, 5)
+        await server.close()
+        return time.monotonic() - t0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = os.path.join(tmp, "render.sock")
+        waited = asyncio.run(main(socket_path))
+        assert 0.3 < waited < 3.0, waited
+        assert not os.path.exists(socket_path)
+    print("PASS: Render server idle shutdown")
+
+
+def test_bad_requests_and_live_socket():
+    print("Testing render server bad requests and a second server on a live socket...")
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = os.path.join(tmp, "render.sock")
+        loop, server = _start_server(socket_path)
+        try:
+            client = RenderClient(socket_path, timeout=10)
+            events = client.events()
+            for payload in (b"[]\n", b"1\n", b'"x"\n', b"{not json\n"):
+                client.sock.sendall(payload)
+                ev = next(events)
+                assert ev["event"] == "error" and ev["message"].startswith("Bad request"), ev
+            client.send(op="ping")  # Same connection still served
+            assert next(events)["event"] == "pong"
+
+            # A second server must not take over the socket of a running one
+            async def second():
+                await RenderServer(socket_path, workers=1).start()
+            try:
+                asyncio.run(second())
+                raise AssertionError("second server started on a live socket")
+            except RuntimeError as e:
+                assert "already running" in str(e)
+            client.send(op="ping")
+            assert next(events)["event"] == "pong"
+            client.close()
+        finally:
+            _stop_server(loop, server)
+
+        # A stale socket file (no server behind it) is replaced
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(socket_path)
+        stale.close()
+        loop, server = _start_server(socket_path)
+        try:
+            client = RenderClient(socket_path, timeout=10)
+            client.send(op="ping")
+            assert next(client.events())["event"] == "pong"
+            client.close()
+        finally:
+            _stop_server(loop, server)
+    print("PASS: Render server bad requests and a second server on a live socket")
+
+
+if __name__ == "__main__":
+    test_protocol_round_trip()
+    test_idle_timeout()
+    test_bad_requests_and_live_socket()
@@ -0,0 +1,119 @@
+import sys
+import os
+import io
+import json
+import tempfile
+import numpy as np
+import soundfile as sf
+
+# Add Ambix2Bin to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin"))
+
+import render_log
+from render_trace import Tracer, format_summary
+from saf_wrapper import SAFRenderer
+
+SOFA_PATH = os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin", "assets", "hrtf", "HRIR_L2702.sofa")
+
+
+def _input(tmp, n=20000, n_ch=4):
+    path = os.path.join(tmp, "in.wav")
+    sf.write(path, (np.random.default_rng(0).standard_normal((n, n_ch)) * 0.1).astype(np.float32), 48000,
+             subtype="FLOAT")
+    return path
+
+
+def test_tracer_histograms_and_chrome_trace():
+    print("Testing tracer spans, histograms and trace export...")
+    off = Tracer()
+    assert off.span("x") is off.span("y")  # Shared no-op when disabled
+    with off.span("x"):
+        pass
+    assert off.summary() == {} and list(off.iter("read", [1, 2])) == [1, 2]
+
+    tracer = Tracer(enabled=True, max_events=3)
+    for _ in range(4):
+        with tracer.span("stage", block=1):
+            pass
+    tracer.add("slow", 0, 3_000_000)  # 3 ms
+    assert list(tracer.iter("read", [1, 2])) == [1, 2]
+    summary = tracer.summary()
+    assert summary["stage"]["count"] == 4 and summary["read"]["count"] == 2
+    assert sum(n for _, n in summary["stage"]["histogram_us"]) == 4
+    assert summary["slow"]["histogram_us"] == [[4096, 1]] and summary["slow"]["p95_ms"] == 3.0
+    trace = tracer.chrome_trace()
+    assert len(trace["traceEvents"]) == 3 and trace["otherData"]["dropped_events"] == 4
+    assert trace["traceEvents"][0]["ph"] == "X" and trace["traceEvents"][0]["args"] == {"block": 1}
+    assert format_summary(summary).splitlines()[0].startswith("slow")
+    print("PASS: Tracer")
+
+
+def test_render_stage_timings():
+    print("Testing render stage instrumentation...")
+    renderer = SAFRenderer()
+    renderer.progress_callback = lambda v: None
+    with tempfile.TemporaryDirectory() as tmp:
+        in_wav = _input(tmp)
+        renderer.load_sofa(SOFA_PATH)
+        stats = renderer.render(in_wav, os.path.join(tmp, "out.wav"), block_size=4096)
+        assert "timings" not in stats and renderer.tracer.summary() == {}  # Off by default
+
+        renderer = SAFRenderer()
+        renderer.progress_callback = lambda v: None
+        renderer.tracer.enabled = True
+        renderer.load_sofa(SOFA_PATH)
+        stats = renderer.render(in_wav, os.path.join(tmp, "out.wav"), block_size=4096)
+        timings = stats["timings"]
+        for name in ("load_sofa.read", "prepare.grid", "prepare.nn_map", "prepare.pinv", "prepare.einsum",
+                     "block.read", "block.rfft", "block.mix", "block.irfft", "block.ola", "block.write"):
+            assert name in timings, name
+        n_blocks = 20000 // 4096 + 1
+        assert timings["block.rfft"]["count"] == 2 * n_blocks  # Both passes
+        assert timings["block.write"]["count"] == n_blocks
+        assert stats["wall_s"] > 0
+
+        trace_path = renderer.tracer.write_chrome_trace(os.path.join(tmp, "trace.json"))
+        with open(trace_path) as f:
+            events = json.load(f)["traceEvents"]
+        assert {e["name"] for e in events} == set(timings)
+        assert all(e["dur"] >= 0 and e["ts"] >= 0 for e in events)
+    print("PASS: Stage Timings")
+
+
+def test_structured_logging():
+    print("Testing structured render log...")
+    stream = io.StringIO()
+    renderer = SAFRenderer()
+    renderer.progress_callback = lambda v: None
+    try:
+        render_log.configure("info", "json", stream=stream)
+        with tempfile.TemporaryDirectory() as tmp:
+            renderer.load_sofa(SOFA_PATH)
+            renderer.render(_input(tmp), os.path.join(tmp, "out.wav"), gain_mode="bound")
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert all(r["component"] == "SAFRenderer" for r in records)
+        (done,) = [r for r in records if r.get("event") == "render_stats"]
+        assert done["passes"] == 1 and done["gain_mode"] == "bound" and done["order"] == 1
+
+        render_log.configure("info", "text", stream=stream)
+        stream.seek(0)
+        stream.truncate()
+        renderer.current_order = -1
+        renderer.prepare(1)
+        assert stream.getvalue() == "[SAFRenderer] Preparing 1th-Order Modal Filters...\n"
+
+        render_log.configure("off")
+        stream.seek(0)
+        stream.truncate()
+        renderer.current_order = -1
+        renderer.prepare(1)
+        assert stream.getvalue() == ""
+    finally:
+        render_log.configure("off")
+    print("PASS: Logging")
+
+
+if __name__ == "__main__":
+    test_tracer_histograms_and_chrome_trace()
+    test_render_stage_timings()
+    test_structured_logging()
@@ -0,0 +1,101 @@
+import sys
+import os
+import tempfile
+import numpy as np
+import soundfile as sf
+
+# Add Ambix2Bin to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin"))
+
+from saf_wrapper import SAFRenderer
+from sh_rotation import SHRotator, HeadTrajectory, HeadTracker, head_rotation_matrix, sh_rotation_blocks
+
+SOFA_PATH = os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin", "assets", "hrtf", "HRIR_L2702.sofa")
+
+
+def test_rotation_matches_sh_basis():
+    print("Testing SH Rotation (Order 7) against rotated directions...")
+    renderer = SAFRenderer()
+    order = 7
+    rng = np.random.default_rng(0)
+    azi = rng.uniform(-np.pi, np.pi, 32)
+    ele = rng.uniform(-1.4, 1.4, 32)
+    dirs = np.stack([np.cos(ele) * np.cos(azi), np.cos(ele) * np.sin(azi), np.sin(ele)], axis=1)
+
+    rot = head_rotation_matrix(0.4, -0.3, 1.2)
+    rdirs = dirs @ rot.T
+    r_azi = np.arctan2(rdirs[:, 1], rdirs[:, 0])
+    r_ele = np.arcsin(np.clip(rdirs[:, 2], -1, 1))
+
+    Y = renderer._compute_sn3d_sh(order, azi, ele).astype(np.float64)
+    Y_rot = renderer._compute_sn3d_sh(order, r_azi, r_ele)
+    blocks = sh_rotation_blocks(order, rot)
+    for l in range(order + 1):
+        sl = slice(l * l, (l + 1) ** 2)
+        err = np.max(np.abs(Y[:, sl] @ blocks[l].T - Y_rot[:, sl]))
+        assert err < 1e-5, f"Degree {l} rotation error {err}"
+    print("PASS: Rotation")
+
+
+def test_head_yaw_moves_front_source_right():
+    print("Testing Head Yaw convention...")
+    renderer = SAFRenderer()
+    front = renderer._compute_sn3d_sh(1, np.array([0.0]), np.array([0.0])).T  # (n_sh, 1)
+    rotator = SHRotator(order=1)
+    out = SHRotator.apply(front, rotator.blocks(90.0, 0.0, 0.0))
+    # Turning the head left puts a frontal source on the right (-Y)
+    assert np.allclose(out[:, 0], [1, -1, 0, 0], atol=1e-6), out[:, 0]
+    assert rotator.blocks(90.2, 0.0, 0.0) is rotator.blocks(90.0, 0.0, 0.0)  # Quantized cache hit
+    print("PASS: Yaw")
+
+
+def test_tracker_crossfade_is_continuous():
+    print("Testing per-block crossfade...")
+    order, fs, block = 3, 48000, 1024
+    traj = HeadTrajectory([0.0, 1.0], [0.0, 90.0])
+    tracker = HeadTracker(traj, order, fs)
+    renderer = SAFRenderer()
+    sig = renderer._compute_sn3d_sh(order, np.array([0.0]), np.array([0.0])).T
+    x = np.repeat(sig, block, axis=1).astype(np.float32)
+
+    a = tracker.process(x, 0)
+    b = tracker.process(x, block)
+    # Last frame of block A and first frame of block B sit one frame apart on the path
+    assert np.max(np.abs(a[:, -1] - b[:, 0])) < 0.05
+    print("PASS: Crossfade")
+
+
+def test_multi_orientation_matches_single_renders():
+    print("Testing batch multi-orientation render against per-angle renders...")
+    rng = np.random.default_rng(1)
+    x = (rng.standard_normal((20000, 9)) * 0.1).astype(np.float32)
+    orientations = [(0.0, 0.0, 0.0), (90.0, 0.0, 0.0), (200.0, 15.0, 0.0)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        in_wav = os.path.join(tmp, "in.wav")
+        sf.write(in_wav, x, 48000, subtype="FLOAT")
+        renderer = SAFRenderer()
+        renderer.load_sofa(SOFA_PATH)
+
+        outs = [os.path.join(tmp, f"out_{i}.wav") for i in range(len(orientations))]
+        stats = renderer.render_orientations(in_wav, outs, orientations, block_size=2048)
+        assert (stats['fs'], stats['samples'], stats['order']) == (48000, 20000, 2)
+        assert len(stats['peak']) == len(stats['gain_db']) == len(orientations)
+
+        for (yaw, pitch, roll), out, peak, gain_db in zip(orientations, outs, stats['peak'], stats['gain_db']):
+            ref = os.path.join(tmp, "ref.wav")
+            traj = HeadTrajectory([0.0, 1.0], [yaw, yaw], [pitch, pitch], [roll, roll])
+            ref_stats = renderer.render(in_wav, ref, block_size=2048, trajectory=traj)
+            assert abs(gain_db - ref_stats['gain_db']) < 0.01 and abs(peak - ref_stats['peak']) < 1e-3 * peak
+            a, _ = sf.read(out, dtype="int16")
+            b, _ = sf.read(ref, dtype="int16")
+            assert a.shape == b.shape
+            assert np.max(np.abs(a.astype(int) - b)) <= 1, f"Orientation {yaw} mismatch"
+    print("PASS: Multi-Orientation")
+
+
+if __name__ == "__main__":
+    test_rotation_matches_sh_basis()
+    test_head_yaw_moves_front_source_right()
+    test_tracker_crossfade_is_continuous()
+    test_multi_orientation_matches_single_renders()
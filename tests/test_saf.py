@@ -1,9 +1,11 @@
 import sys
 import os
+import tempfile
 import numpy as np
 
-# Add src to path
-sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+# Add Ambix2Bin to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin"))
+sys.path.append(os.path.dirname(__file__))
 
 from saf_wrapper import SAFRenderer
 
@@ -22,9 +24,14 @@ def test_saf():
     base_dir = os.path.dirname(os.path.abspath(__file__))
     sofa_path = os.path.join(base_dir, "..", "assets", "hrtf", "Neumann_KU100_THK.sofa")
     
-    if not os.path.exists(sofa_path):
-        print(f"Skipping SOFA test (File not found: {sofa_path})")
-    else:
+    # load_sofa() reads everything it needs, so the synthetic file can go right after
+    with tempfile.TemporaryDirectory() as tmp:
+        if not os.path.exists(sofa_path):
+            # KU100 set is not shipped; a synthetic file exercises the same path
+            from gen_test_sofa import generate_sofa
+            sofa_path = generate_sofa(os.path.join(tmp, "synthetic.sofa"), n_dirs=440, taps=256)
+            print(f"KU100 not found, using synthetic SOFA: {sofa_path}")
+
         try:
             renderer.load_sofa(sofa_path)
             print("SOFA Load Success.")
@@ -32,35 +39,27 @@ def test_saf():
             print(f"SOFA Load Failed: {e}")
             sys.exit(1)
 
-        # 3. Prepare Grid (Order 1 -> 4 channels)
-        try:
-            renderer.prepare(order=1)
-            print("Grid Preparation Success.")
-        except Exception as e:
-            print(f"Grid Preparation Failed: {e}")
-            # Do not exit, try to continue? No, fatal.
-            sys.exit(1)
-            
-        # 4. Process Silence (WAV)
-        import soundfile as sf
-        dummy_wav = "test_silence.wav"
-        out_wav = "test_out.wav"
-        
-        # Create 1 second 4ch silent wav
-        data = np.zeros((48000, 4), dtype=np.float32)
-        sf.write(dummy_wav, data, 48000)
+    # 3. Prepare Grid (Order 1 -> 4 channels)
+    try:
+        renderer.prepare(order=1)
+        print("Grid Preparation Success.")
+    except Exception as e:
+        print(f"Grid Preparation Failed: {e}")
+        # Do not exit, try to continue? No, fatal.
+        sys.exit(1)
         
-        try:
-            renderer.process_file_chunked(dummy_wav, out_wav)
-            print("Processing Success.")
-            if os.path.exists(out_wav):
-                 print("Output file created.")
-        except Exception as e:
-             print(f"Processing Failed: {e}")
-             sys.exit(1)
-        finally:
-             if os.path.exists(dummy_wav): os.remove(dummy_wav)
-             if os.path.exists(out_wav): os.remove(out_wav)
+    # 4. Process Silence (In-Memory)
+    # Create 1 second 4ch silent buffer
+    data = np.zeros((48000, 4), dtype=np.float32)
+    
+    try:
+        out = renderer.render_array(data, 48000)
+        print("Processing Success.")
+        if out.shape == (48000, 2):
+             print("Output buffer created.")
+    except Exception as e:
+         print(f"Processing Failed: {e}")
+         sys.exit(1)
 
 if __name__ == "__main__":
     test_saf()
@@ -0,0 +1,99 @@
+import sys
+import os
+import json
+import tempfile
+import subprocess
+import numpy as np
+import soundfile as sf
+
+# Add Ambix2Bin to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin"))
+
+from scheduling import probe_job, schedule_jobs, sofa_filter_length, BatchETA, format_eta, _makespan
+
+SOFA_PATH = os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin", "assets", "hrtf", "HRIR_L2702.sofa")
+
+
+def test_probe_cost_model():
+    print("Testing header probe and cost model...")
+    taps = sofa_filter_length(SOFA_PATH)
+    assert taps == 128
+    with tempfile.TemporaryDirectory() as tmp:
+        foa = os.path.join(tmp, "foa.wav")
+        toa = os.path.join(tmp, "toa.wav")
+        sf.write(foa, np.zeros((48000, 4), dtype=np.float32), 48000)
+        sf.write(toa, np.zeros((24000, 16), dtype=np.float32), 48000)
+        a = probe_job(foa, taps=taps)
+        b = probe_job(toa, taps=taps)
+        assert a["samples"] == 48000 and a["channels"] == 4 and abs(a["duration_s"] - 1.0) < 1e-9
+        assert a["cost"] == 48000 * 4 * taps * 2
+        # Half the length but 4x the SH channels
+        assert b["cost"] == 2 * a["cost"]
+        assert probe_job(foa, gain_db=-3, taps=taps)["cost"] == a["cost"] / 2
+        assert probe_job(os.path.join(tmp, "missing.wav")) is None
+    print("PASS: Probe")
+
+
+def test_schedule_small_first_without_long_tail():
+    print("Testing SJF/LPT schedule...")
+    rng = np.random.default_rng(1)
+    costs = list(rng.uniform(1, 10, 40)) + [200.0]
+    for workers in (1, 2, 4):
+        order = schedule_jobs(costs, workers)
+        assert sorted(order) == list(range(len(costs)))
+        lpt = _makespan(costs, sorted(range(len(costs)), key=lambda i: -costs[i]), workers)
+        assert _makespan(costs, order, workers) <= lpt * 1.05
+        # Apart from the jobs pulled forward, small files still go first
+        small = [costs[i] for i in order if costs[i] < 100]
+        assert small == sorted(small)
+    # Four workers: the 200-unit file must start immediately instead of last
+    assert schedule_jobs(costs, 4)[0] == len(costs) - 1
+    # One worker: pure shortest-job-first
+    assert schedule_jobs(costs, 1)[-1] == len(costs) - 1
+    print("PASS: Schedule")
+
+
+def test_eta_self_corrects():
+    print("Testing throughput-corrected ETA...")
+    eta = BatchETA({"a": 100.0, "b": 100.0, "c": 200.0}, n_workers=1, smoothing_s=2.0, start=0.0)
+    assert eta.remaining_s() is None
+    # 10 units/s at first
+    for t in range(1, 11):
+        eta.update("a", t / 10, now=float(t))
+    assert abs(eta.remaining_s() - 30.0) < 1.0
+    # Throughput halves; the estimate follows within a few smoothing periods
+    for t in range(1, 21):
+        eta.update("b", t / 20, now=10.0 + t)
+    assert abs(eta.remaining_s() - 40.0) < 4.0
+    eta.discard("c")
+    assert eta.remaining_s() == 0.0
+    assert format_eta(75) == "1:15" and format_eta(3725) == "1:02:05" and format_eta(None) == "--:--"
+    print("PASS: ETA")
+
+
+def test_scheduling_stays_light():
+    print("Testing that scheduling a batch loads no SAF stack...")
+    with tempfile.TemporaryDirectory() as tmp:
+        wav = os.path.join(tmp, "foa.wav")
+        sf.write(wav, np.zeros((480, 4), dtype=np.float32), 48000)
+        # What the GUI does at submit time, in a fresh interpreter
+        code = ("import sys, json; sys.path.append(sys.argv[1]); "
+                "from scheduling import estimate_job_costs, schedule_jobs, BatchETA; "
+                "costs = estimate_job_costs([{'input': sys.argv[2], 'mode': 'binaural'}]); "
+                "schedule_jobs(costs, 2); BatchETA(dict(enumerate(costs)), 2); "
+                "print(json.dumps([costs, [m for m in ('saf_wrapper', 'scipy', 'netCDF4', 'soundfile') "
+                "if m in sys.modules]]))")
+        app_dir = os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin")
+        env = dict(os.environ, AMBIX2BIN_PROBE_CACHE="off")
+        proc = subprocess.run([sys.executable, "-c", code, app_dir, wav], capture_output=True, text=True,
+                              env=env, timeout=60)
+        costs, heavy = json.loads(proc.stdout.strip().splitlines()[-1])
+        assert costs == [480 * 4 * 2] and heavy == [], (costs, heavy, proc.stderr)
+    print("PASS: Scheduling loads no SAF stack")
+
+
+if __name__ == "__main__":
+    test_probe_cost_model()
+    test_schedule_small_first_without_long_tail()
+    test_eta_self_corrects()
+    test_scheduling_stays_light()
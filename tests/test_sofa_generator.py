@@ -0,0 +1,88 @@
+import sys
+import os
+import time
+import tempfile
+import numpy as np
+import netCDF4
+
+# Add Ambix2Bin to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin"))
+sys.path.append(os.path.dirname(__file__))
+
+from saf_wrapper import SAFRenderer
+from gen_test_sofa import generate_sofa, lebedev_grid, gaussian_grid, fibonacci_grid, LEBEDEV_RULES
+
+
+def _xyz(azi, ele):
+    azi, ele = np.deg2rad(azi), np.deg2rad(ele)
+    return np.stack([np.cos(ele) * np.cos(azi), np.cos(ele) * np.sin(azi), np.sin(ele)], axis=1)
+
+
+def _renderer(sofa):
+    renderer = SAFRenderer()
+    renderer.progress_callback = lambda v: None
+    renderer.load_sofa(sofa)
+    return renderer
+
+
+def test_grids():
+    print("Testing direction grids...")
+    for n in LEBEDEV_RULES:
+        xyz = _xyz(*lebedev_grid(n))
+        assert len(xyz) == n
+        assert len(np.unique(np.round(xyz, 9), axis=0)) == n
+        # Octahedral symmetry: the rules are closed under sign flips, so they balance out
+        assert np.allclose(xyz.sum(axis=0), 0, atol=1e-12)
+        assert np.allclose(xyz.T @ xyz, np.eye(3) * n / 3, atol=1e-9)
+    azi, ele = gaussian_grid(6)
+    assert len(azi) == 72 and len(np.unique(ele)) == 6
+    assert np.allclose(np.sort(np.unique(ele)), -np.sort(np.unique(ele))[::-1])
+    azi, ele = fibonacci_grid(1000)
+    assert np.abs(np.mean(np.sin(np.deg2rad(ele)))) < 1e-3
+    print("PASS: Grids")
+
+
+def test_units_and_delays():
+    print("Testing SOFA conventions (radians, Data.Delay)...")
+    with tempfile.TemporaryDirectory() as tmp:
+        deg = generate_sofa(os.path.join(tmp, "deg.sofa"), 26, 64, grid="lebedev")
+        rad = generate_sofa(os.path.join(tmp, "rad.sofa"), 26, 64, grid="lebedev", units="radian")
+        with netCDF4.Dataset(rad) as ds:
+            assert ds.SOFAConventions == "SimpleFreeFieldHRIR"
+            assert ds.variables["SourcePosition"].Units.startswith("radian")
+        a, b = _renderer(deg), _renderer(rad)
+        a.prepare(1)
+        b.prepare(1)
+        assert np.allclose(a.sh_hrtfs, b.sh_hrtfs, atol=1e-6)
+
+        dly = generate_sofa(os.path.join(tmp, "dly.sofa"), 8, 64, fs=44100, grid="gaussian", delays=True)
+        r = _renderer(dly)
+        assert r.sofa_data["fs"] == 44100 and r.sofa_data["ir"].shape == (128, 2, 64)
+        d = r.sofa_data["delay"]
+        assert d is not None and d.shape == (128, 2)
+        left = np.abs(r.sofa_data["pos"][:, 0] - 90) < 30
+        assert np.all(d[left, 1] > d[left, 0])  # Far (right) ear is late for left sources
+    print("PASS: Conventions")
+
+
+def test_10k_directions_load_and_prepare():
+    print("Testing 10k-direction SOFA scaling...")
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        sofa = generate_sofa(os.path.join(tmp, "big.sofa"), 10000, 256)
+        t1 = time.perf_counter()
+        renderer = _renderer(sofa)
+        t2 = time.perf_counter()
+        renderer.prepare(3)
+        t3 = time.perf_counter()
+        print(f"  generate {t1 - t0:.2f}s, load_sofa {t2 - t1:.2f}s, prepare(3) {t3 - t2:.2f}s")
+        assert renderer.sofa_data["ir"].shape == (10000, 2, 256)
+        assert renderer.sh_hrtfs.shape == (16, 2, 256)
+        assert t1 - t0 < 10.0
+    print("PASS: 10k Directions")
+
+
+if __name__ == "__main__":
+    test_grids()
+    test_units_and_delays()
+    test_10k_directions_load_and_prepare()
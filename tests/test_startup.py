@@ -0,0 +1,82 @@
+import sys
+import os
+import stat
+import time
+import tempfile
+
+# Add Ambix2Bin to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin"))
+sys.path.append(os.path.dirname(__file__))
+
+from PyQt6.QtCore import QSettings
+from preflight import cached_ffmpeg_probe, ffmpeg_fingerprint, scan_hrtf_dir
+from benchmark_startup import run_benchmark
+
+HRTF_DIR = os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin", "assets", "hrtf")
+
+
+def _fake_ffmpeg(tmp, filters="sofalizer"):
+    path = os.path.join(tmp, "ffmpeg")
+    with open(path, "w") as f:
+        f.write(f"#!/bin/sh\necho '... {filters} ...'\necho probed >> '{path}.calls'\n")
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    return path
+
+
+def _calls(path):
+    try:
+        with open(path + ".calls") as f:
+            return len(f.readlines())
+    except OSError:
+        return 0
+
+
+def test_ffmpeg_probe_cache():
+    print("Testing cached FFmpeg probe...")
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = QSettings(os.path.join(tmp, "settings.ini"), QSettings.Format.IniFormat)
+        ffmpeg = _fake_ffmpeg(tmp)
+        result, cached = cached_ffmpeg_probe(settings, ffmpeg)
+        assert result == {'found': True, 'sofalizer': True, 'error': None} and not cached
+        result, cached = cached_ffmpeg_probe(settings, ffmpeg)
+        assert result['sofalizer'] and cached and _calls(ffmpeg) == 1
+
+        # A new build at the same path (different mtime) is probed again
+        key = ffmpeg_fingerprint(ffmpeg)
+        _fake_ffmpeg(tmp, filters="aecho")
+        os.utime(ffmpeg, ns=(time.time_ns(), time.time_ns() + 10**9))
+        assert ffmpeg_fingerprint(ffmpeg) != key
+        result, cached = cached_ffmpeg_probe(settings, ffmpeg)
+        assert not cached and not result['sofalizer']
+
+        # A missing binary is reported but never cached
+        missing = os.path.join(tmp, "no-ffmpeg")
+        result, cached = cached_ffmpeg_probe(settings, missing)
+        assert not result['found'] and not cached and ffmpeg_fingerprint(missing) is None
+    print("PASS: Cached FFmpeg probe")
+
+
+def test_scan_hrtf_dir():
+    print("Testing HRTF folder scan...")
+    files, default = scan_hrtf_dir(HRTF_DIR)
+    assert files == sorted(files) and os.path.basename(files[default]) == "HRIR_L2702.sofa"
+    assert scan_hrtf_dir(os.path.join(HRTF_DIR, "missing")) == (None, 0)
+    with tempfile.TemporaryDirectory() as tmp:
+        assert scan_hrtf_dir(tmp) == ([], 0)
+    print("PASS: HRTF folder scan")
+
+
+def test_startup_benchmark():
+    print("Testing GUI startup benchmark...")
+    report = run_benchmark(runs=2, timeout_s=20)
+    for run in report['runs']:
+        assert run['first_frame_ms'] is not None and run['preflight_ms'] is not None
+        assert run['heavy_before_first_frame'] == [], run['heavy_before_first_frame']
+        assert run['first_frame_ms'] >= run['window_ms']
+    print(f"PASS: First frame after {report['warm_median']['launch_to_first_frame_ms']} ms")
+
+
+if __name__ == "__main__":
+    test_ffmpeg_probe_cache()
+    test_scan_hrtf_dir()
+    test_startup_benchmark()
@@ -0,0 +1,122 @@
+import sys
+import os
+import tempfile
+import numpy as np
+import soundfile as sf
+
+# Add Ambix2Bin to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin"))
+
+from saf_wrapper import SAFRenderer
+import saf_stream
+from saf_stream import StreamingBinauralRenderer, run_offline_harness
+from sh_rotation import SHRotator
+
+SOFA_PATH = os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin", "assets", "hrtf", "HRIR_L2702.sofa")
+
+
+def test_stream_matches_render():
+    print("Testing StreamingBinauralRenderer against render()...")
+    rng = np.random.default_rng(0)
+    x = (rng.standard_normal((30000, 16)) * 0.05).astype(np.float32)  # Quiet: render() gain stays 1.0
+
+    renderer = SAFRenderer()
+    renderer.load_sofa(SOFA_PATH)
+    with tempfile.TemporaryDirectory() as tmp:
+        in_wav = os.path.join(tmp, "in.wav")
+        out_wav = os.path.join(tmp, "out.wav")
+        sf.write(in_wav, x, 48000, subtype="FLOAT")
+        renderer.render(in_wav, out_wav)
+        ref, _ = sf.read(out_wav, dtype="float32")
+
+    stream = StreamingBinauralRenderer(renderer.sh_hrtfs, block_size=512)
+    y, stats = run_offline_harness(stream, x, host_block=200)  # Host block not a divisor of the block
+
+    assert stats['latency_frames'] == 512
+    err = np.max(np.abs(y - ref)) * 32768
+    assert err <= 1.5, f"Stream deviates from render() by {err:.2f} LSB"
+    print(f"PASS: Stream ({err:.2f} LSB, worst callback {stats['worst_ms']:.3f} ms)")
+
+
+def test_orientation_swap_between_callbacks():
+    print("Testing orientation swap...")
+    renderer = SAFRenderer()
+    renderer.load_sofa(SOFA_PATH)
+    renderer.prepare(1)
+    stream = StreamingBinauralRenderer(renderer.sh_hrtfs, block_size=256)
+
+    # Frontal noise source; a 90 degree head turn should move it to the right ear
+    rng = np.random.default_rng(2)
+    sig = (rng.standard_normal(256 * 8) * 0.1).astype(np.float32)
+    front = np.outer(sig, [1.0, 0.0, 0.0, 1.0]).astype(np.float32)
+    y = np.concatenate([stream.process(front[i:i + 256]).copy() for i in range(0, front.shape[0], 256)])
+    stream.set_orientation(90.0)
+    y_rot = np.concatenate([stream.process(front[i:i + 256]).copy() for i in range(0, front.shape[0], 256)])
+    y, y_rot = y[512:], y_rot[512:]  # Skip latency and the crossfade block
+
+    rms = lambda s: np.sqrt(np.mean(s ** 2))
+    assert rms(y_rot[:, 1]) > rms(y_rot[:, 0]), "Right ear should dominate after turning left"
+    assert abs(rms(y[:, 0]) - rms(y[:, 1])) < abs(rms(y_rot[:, 0]) - rms(y_rot[:, 1]))
+    print("PASS: Orientation Swap")
+
+
+def test_first_orientation_fades_in():
+    print("Testing crossfade into the first orientation...")
+    renderer = SAFRenderer()
+    renderer.load_sofa(SOFA_PATH)
+    renderer.prepare(1)
+    stream = StreamingBinauralRenderer(renderer.sh_hrtfs, block_size=256)
+    x = np.tile(np.array([[1.0, 0.0, 0.0, 1.0]], dtype=np.float32), (256, 1))
+    stream.set_orientation(90.0)
+    stream.process(x)
+    target = SHRotator.apply(x.T.copy(), stream._rotator.blocks(90.0, 0.0, 0.0))
+    # Starts (almost) unrotated and ends on the target: no step at the block edge
+    assert np.allclose(stream._x_rot[:, 0], x[0], atol=0.02)
+    assert np.allclose(stream._x_rot[:, -1], target[:, -1], atol=1e-5)
+    print("PASS: Crossfade into the first orientation")
+
+
+def test_reset_matches_fresh_stream():
+    print("Testing reset() against a fresh stream...")
+    renderer = SAFRenderer()
+    renderer.load_sofa(SOFA_PATH)
+    renderer.prepare(1)
+    rng = np.random.default_rng(4)
+    x = (rng.standard_normal((256 * 6, 4)) * 0.1).astype(np.float32)
+
+    def play(stream):
+        stream.set_orientation(45.0)
+        return np.concatenate([stream.process(x[i:i + 200]).copy() for i in range(0, x.shape[0], 200)])
+
+    used = StreamingBinauralRenderer(renderer.sh_hrtfs, block_size=256)
+    play(used)
+    used.set_orientation(120.0)
+    used.process(x[:300])  # Stop in the middle of a crossfade, with a partly filled FIFO
+    used.reset()
+    fresh = StreamingBinauralRenderer(renderer.sh_hrtfs, block_size=256)
+    assert np.array_equal(play(used), play(fresh))
+    print("PASS: reset() against a fresh stream")
+
+
+def test_fft_without_out_argument():
+    print("Testing the NumPy 1.x FFT path...")
+    renderer = SAFRenderer()
+    renderer.load_sofa(SOFA_PATH)
+    renderer.prepare(1)
+    x = (np.random.default_rng(5).standard_normal((256 * 4, 4)) * 0.1).astype(np.float32)
+    y = StreamingBinauralRenderer(renderer.sh_hrtfs, block_size=256).process(x).copy()
+    fft_out, saf_stream.FFT_OUT = saf_stream.FFT_OUT, False  # As on NumPy < 2.0, where out= raises TypeError
+    try:
+        y_old = StreamingBinauralRenderer(renderer.sh_hrtfs, block_size=256).process(x).copy()
+    finally:
+        saf_stream.FFT_OUT = fft_out
+    assert np.allclose(y, y_old, atol=1e-6)
+    print("PASS: NumPy 1.x FFT path")
+
+
+if __name__ == "__main__":
+    test_stream_matches_render()
+    test_orientation_swap_between_callbacks()
+    test_first_orientation_fades_in()
+    test_reset_matches_fresh_stream()
+    test_fft_without_out_argument()
@@ -0,0 +1,105 @@
+import sys
+import os
+import time
+import tempfile
+import numpy as np
+import soundfile as sf
+
+# Add Ambix2Bin to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin"))
+
+import watch_folder
+from watch_folder import WatchFolder
+
+SOFA_PATH = os.path.join(os.path.dirname(__file__), "..", "apps", "Ambix2Bin", "assets", "hrtf", "HRIR_L2702.sofa")
+
+
+def test_watch_folder_debounce_and_routing():
+    print("Testing watch folder (polling fallback)...")
+    rng = np.random.default_rng(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        inbox = os.path.join(tmp, "inbox")
+        watcher = WatchFolder(inbox, SOFA_PATH, settle_s=0.3, poll_s=0.05, use_watchdog=False).start()
+        try:
+            os.makedirs(os.path.join(inbox, "session"))
+            sf.write(os.path.join(inbox, "a.wav"), (rng.standard_normal((9600, 4)) * 0.1).astype(np.float32), 48000)
+            sf.write(os.path.join(inbox, "session", "b.amb"), (rng.standard_normal((9600, 4)) * 0.1).astype(np.float32), 48000, format="WAV")
+            # Named like an output, but dropped by the user: rendered like any input
+            sf.write(os.path.join(inbox, "take_binaural.wav"), (rng.standard_normal((4800, 4)) * 0.1).astype(np.float32), 48000)
+            with open(os.path.join(inbox, "broken.wav"), "wb") as f:
+                f.write(b"not audio")
+            open(os.path.join(inbox, "readme.txt"), "w").close()
+
+            # A file that keeps growing must not be picked up until it settles
+            growing = os.path.join(inbox, "growing.wav")
+            with open(growing, "wb") as f:
+                for _ in range(8):
+                    f.write(b"\0" * 1024)
+                    f.flush()
+                    watcher.poll()
+                    time.sleep(0.1)
+                    assert growing not in watcher._in_flight
+            os.remove(growing)
+
+            deadline = time.monotonic() + 30
+            while len(watcher.processed) < 4 and time.monotonic() < deadline:
+                watcher.poll()
+                time.sleep(0.05)
+        finally:
+            watcher.stop()
+
+        status = {os.path.basename(p): s for p, s, _ in watcher.processed}
+        assert status == {"a.wav": "ok", "b.amb": "ok", "take_binaural.wav": "ok", "broken.wav": "error"}, status
+        assert os.path.exists(os.path.join(tmp, "inbox_done", "a.wav"))
+        assert sf.info(os.path.join(tmp, "inbox_done", "session", "b_binaural.wav")).channels == 2
+        assert os.path.exists(os.path.join(tmp, "inbox_error", "broken.wav.error.txt"))
+        assert sorted(os.listdir(inbox)) == ["readme.txt", "session"]
+    print("PASS: Watch Folder")
+
+
+def test_watch_folder_notifications():
+    print("Testing watch folder (watchdog notifications)...")
+    if not watch_folder.WATCHDOG_AVAILABLE:
+        print("Skipping notification test (watchdog not installed)")
+        return
+    rng = np.random.default_rng(8)
+    with tempfile.TemporaryDirectory() as tmp:
+        inbox = os.path.join(tmp, "inbox")
+        os.makedirs(inbox)
+        sf.write(os.path.join(inbox, "waiting.wav"), (rng.standard_normal((4800, 4)) * 0.1).astype(np.float32), 48000)
+        # Done folder inside the inbox: its renders and moved inputs raise events too
+        watcher = WatchFolder(inbox, SOFA_PATH, done_dir=os.path.join(inbox, "done"), settle_s=0.3, poll_s=0.05,
+                              use_watchdog=True, rescan_s=3600).start()
+        scans = []
+        full_scan = watcher._scan
+        watcher._scan = lambda: (scans.append(time.monotonic()), full_scan())[1]
+        try:
+            watcher.poll()  # First poll: full scan for files that were already waiting
+            sf.write(os.path.join(inbox, "a.wav"), (rng.standard_normal((4800, 4)) * 0.1).astype(np.float32), 48000)
+            # A folder moved in whole: only the folder itself raises an event
+            staged = os.path.join(tmp, "staged")
+            os.makedirs(staged)
+            sf.write(os.path.join(staged, "b.wav"), (rng.standard_normal((4800, 4)) * 0.1).astype(np.float32), 48000)
+            os.rename(staged, os.path.join(inbox, "session"))
+
+            deadline = time.monotonic() + 30
+            while len(watcher.processed) < 3 and time.monotonic() < deadline:
+                watcher.poll()
+                time.sleep(0.05)
+            for _ in range(10):  # Events from our own renders and moves are ignored
+                watcher.poll()
+                time.sleep(0.05)
+        finally:
+            watcher.stop()
+
+        status = {os.path.relpath(p, inbox): s for p, s, _ in watcher.processed}
+        assert status == {"waiting.wav": "ok", "a.wav": "ok", os.path.join("session", "b.wav"): "ok"}, status
+        assert len(scans) == 1, scans
+        assert not watcher._candidates
+        assert os.path.exists(os.path.join(inbox, "done", "session", "b_binaural.wav"))
+    print("PASS: Watch Folder notifications")
+
+
+if __name__ == "__main__":
+    test_watch_folder_debounce_and_routing()
+    test_watch_folder_notifications()